@@ -4,6 +4,10 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import matplotlib.font_manager as fm
 from collections import defaultdict
+from db_pool import ConnectionPool
+from league_page import LeaguePage
+from portfolio import Portfolio
+from volume_rollup import DailyVolumeRollup
 
 # Retrieve secrets from Streamlit
 db_host = st.secrets["DB_HOST"]
@@ -11,2091 +15,524 @@ db_user = st.secrets["DB_USER"]
 db_password = st.secrets["DB_PASSWORD"]
 db_name = st.secrets["DB_NAME"]
 
+# Process-wide connection pool shared by every session and rerun
+@st.cache_resource
+def get_db_pool():
+    return ConnectionPool(
+        size=st.secrets.get("DB_POOL_SIZE", 5),
+        host=db_host,
+        user=db_user,
+        password=db_password,
+        database=db_name
+    )
+
+# Query results are cached in memory, keyed on the betting data's version, so
+# identical queries are served from memory until bets/legs actually change
+@st.cache_data(max_entries=512, show_spinner=False)
+def _cached_query(query, params, data_version):
+    return get_db_pool().query(query, list(params) if params is not None else None)
+
 # Function to get data from MySQL database
 def get_data_from_db(query, params=None):
     try:
-        conn = mysql.connector.connect(
-            host=db_host,
-            user=db_user,
-            password=db_password,
-            database=db_name
-        )
-        cursor = conn.cursor(dictionary=True)
-        cursor.execute(query, params)
-        data = cursor.fetchall()
-        cursor.close()
-        conn.close()
-        return data
+        params = tuple(params) if params is not None else None
+        if data_version is None:
+            return get_db_pool().query(query, params)
+        return _cached_query(query, params, data_version)
     except mysql.connector.Error as err:
         st.error(f"Error: {err}")
         return None
 
-# Fetch the most recent update time
-update_time_query = "SELECT MAX(DateTimePlaced) as LastUpdateTime FROM bets"
-update_time_data = get_data_from_db(update_time_query)
+# Fetch the most recent update time, plus a cheap fingerprint of bets/legs:
+# new wagers bump the counts/high-water marks, settlements move WLCA/NetProfit
+update_time_query = """
+SELECT 
+    MAX(DateTimePlaced) AS LastUpdateTime,
+    COUNT(*) AS BetCount,
+    MAX(WagerID) AS MaxWagerID,
+    SUM(WLCA = 'Active') AS ActiveCount,
+    SUM(NetProfit) AS TotalNetProfit,
+    (SELECT COUNT(*) FROM legs) AS LegCount
+FROM bets
+"""
+try:
+    update_time_data = get_db_pool().query(update_time_query)
+except mysql.connector.Error as err:
+    st.error(f"Error: {err}")
+    update_time_data = None
 
 if update_time_data:
     last_update_time = update_time_data[0]['LastUpdateTime']
+    data_version = tuple(str(v) for v in update_time_data[0].values())
 else:
     last_update_time = "Unknown"
+    data_version = None  # can't tell whether data changed, so bypass the cache
 
-# Sidebar for navigation
-st.sidebar.title("Navigation")
-page = st.sidebar.radio("Go to", ["Main Page", "Principal Volume", "Betting Frequency", "NBA Charts", "NCAAB Charts", "NHL Charts", "NFL Charts", "NFL Playoffs EV", "Tennis Charts", "MLB Charts", "MLB Principal Tables", "NBA Participant Positions", "NFL Participant Positions"])
-
+# Bets + legs of a bankroll, loaded once per data version and shared (not copied)
+# across sessions; pages aggregate from this in memory
+@st.cache_resource(max_entries=4, show_spinner=False)
+def _load_portfolio(bankroll, data_version):
+    return Portfolio.load(get_db_pool().query, bankroll)
 
-# Check if the user is on the "Main Page" page
-if page == "Main Page":
-    # Page title and update time display
-    st.title('Principal Dashboard - GreenAleph II')
-    st.markdown(f"**Last Update:** {last_update_time}", unsafe_allow_html=True)
+def get_portfolio(bankroll='GreenAleph II'):
+    try:
+        if data_version is None:
+            return Portfolio.load(get_db_pool().query, bankroll)
+        return _load_portfolio(bankroll, data_version)
+    except mysql.connector.Error as err:
+        st.error(f"Error: {err}")
+        st.stop()
 
-          # SQL query for Active Principal by League bar chart
-    data_query = """
-    WITH DistinctBets AS (
-        SELECT DISTINCT WagerID, DollarsAtStake, NetProfit
-        FROM bets
-        WHERE WhichBankroll = 'GreenAleph II'
-          AND WLCA = 'Active'
-          AND LegCount = 1
-    )
-    SELECT 
-        l.LeagueName,
-        ROUND(SUM(DollarsAtStake)) AS TotalDollarsAtStake
-    FROM 
-        DistinctBets db
-    JOIN 
-        (SELECT DISTINCT WagerID, LeagueName FROM legs) l ON db.WagerID = l.WagerID
-    GROUP BY 
-        l.LeagueName
-    UNION ALL
-    SELECT 
-        'Total' AS LeagueName,
-        ROUND(SUM(DollarsAtStake)) AS TotalDollarsAtStake
-    FROM 
-        DistinctBets;
-    """
+# Daily (bankroll, league, day, WLCA) volume rollup, kept for the process and
+# topped up from the newest rolled-up day whenever the betting data changes
+@st.cache_resource(show_spinner=False)
+def _volume_rollup():
+    return DailyVolumeRollup()
 
-    # Fetch and process data for Active Principal by League
-    active_principal_data = get_data_from_db(data_query)
-    if active_principal_data is None:
-        st.error("Failed to fetch active principal data from the database.")
-    else:
-        active_principal_df = pd.DataFrame(active_principal_data)
-        active_principal_df['TotalDollarsAtStake'] = active_principal_df['TotalDollarsAtStake'].astype(float)
-        active_principal_df = active_principal_df.sort_values(by='TotalDollarsAtStake')
-        
-        colors = ['#77dd77', '#89cff0', '#fdfd96', '#ffb347', '#aec6cf', '#cfcfc4', '#ffb6c1', '#b39eb5']
-        total_color = 'lightblue'
-        bar_colors = [total_color if name == 'Total' else colors[i % len(colors)] for i, name in enumerate(active_principal_df['LeagueName'])]
-        
-        fig, ax = plt.subplots(figsize=(15, 10))
-        bars = ax.bar(active_principal_df['LeagueName'], active_principal_df['TotalDollarsAtStake'], color=bar_colors, width=0.6, edgecolor='black')
-        ax.set_title('GAII: Total Active Principal', fontsize=18, fontweight='bold')
-        ax.set_ylabel('Total Dollars At Stake ($)', fontsize=14, fontweight='bold')
-        for bar in bars:
-            height = bar.get_height()
-            ax.annotate(f'${height:,.0f}', xy=(bar.get_x() + bar.get_width() / 2, height),
-                        xytext=(0, 3), textcoords="offset points",
-                        ha='center', va='bottom', fontsize=12, fontweight='bold', color='black')
-        plt.xticks(rotation=45, ha='right', fontsize=14, fontweight='bold')
-        ax.axhline(0, color='black', linewidth=0.8)
-        ax.set_facecolor('white')
-        for spine in ax.spines.values():
-            spine.set_edgecolor('black')
-            spine.set_linewidth(1.2)
-        plt.tight_layout()
-        st.pyplot(fig)
-
-    # Add extra spacing
-    st.markdown("<br><br><br>", unsafe_allow_html=True)
+def get_volume_rollup():
+    try:
+        return _volume_rollup().refresh(get_db_pool().query, data_version)
+    except mysql.connector.Error as err:
+        st.error(f"Error: {err}")
+        st.stop()
 
-    # SQL query for Total Dollars Deployed
-    deployed_query = """
-    WITH ActiveBets AS (
-        SELECT DollarsAtStake, NetProfit
-        FROM bets
-        WHERE WhichBankroll = 'GreenAleph II'
-          AND WLCA = 'Active'
+# --- teams to EXCLUDE from the NBA “Championship” / “Conference Winner” parlay charts ---
+EXCLUDED_NBA_TEAMS = [
+    'Brooklyn Nets', 'Chicago Bulls', 'Dallas Mavericks',
+    'New Orleans Pelicans', 'Philadelphia 76ers', 'Phoenix Suns',
+    'Portland Trail Blazers', 'Sacramento Kings', 'San Antonio Spurs',
+    'Toronto Raptors', 'Utah Jazz', 'Washington Wizards',
+    'Atlanta Hawks', 'Charlotte Hornets', 'Los Angeles Clippers', 'Milwaukee Bucks',
+    'Memphis Grizzlies', 'Orlando Magic', 'Miami Heat', 'Detroit Pistons',
+    'Houston Rockets', 'Los Angeles Lakers', 'Boston Celtics', 'Denver Nuggets',
+    'Golden State Warriors', 'Cleveland Cavaliers'
+]
+
+# League chart pages: same layout, parameterized by LeagueName
+LEAGUE_PAGES = {
+    "NBA Charts": LeaguePage(
+        'NBA', 'NBA Active Bets - GAII', parlay_header="NBA Parlays - GAII",
+        parlay_excluded={'Championship': EXCLUDED_NBA_TEAMS, 'Conference Winner': EXCLUDED_NBA_TEAMS},
+        stop_on_empty=True,
     ),
-    TotalBets AS (
-        SELECT SUM(DollarsAtStake) AS TotalDollarsAtStake
-        FROM ActiveBets
+    "NCAAB Charts": LeaguePage(
+        'NCAA Mens Basketball 2026', 'NCAAB Active Bets - GAII', parlay_header="NCAAB Parlays - GAII",
     ),
-    TotalNetProfit AS (
-        SELECT SUM(NetProfit) AS TotalNetProfit
-        FROM bets
-        WHERE WhichBankroll = 'GreenAleph II'
-    )
-    SELECT 
-        (TotalBets.TotalDollarsAtStake - COALESCE(TotalNetProfit.TotalNetProfit, 0)) AS TotalDollarsDeployed
-    FROM 
-        TotalBets, TotalNetProfit;
-    """
-
-    # Fetch and process data for Total Dollars Deployed
-    deployed_data = get_data_from_db(deployed_query)
-    if deployed_data and len(deployed_data) > 0 and 'TotalDollarsDeployed' in deployed_data[0]:
-        total_dollars_deployed = deployed_data[0]['TotalDollarsDeployed']
-        total_dollars_deployed = round(float(total_dollars_deployed)) if total_dollars_deployed is not None else 0
-        total_dollars_deployed += 15000
-        goal_amount = 500000
-        progress_percentage = min(total_dollars_deployed / goal_amount, 1)
-        label_position_percentage = progress_percentage * 50
-        
-        # Display Total $ Deployed progress bar between the charts
-        st.markdown(f"<h4 style='text-align: center; font-weight: bold; color: black;'>Total $ Deployed (Total Active Principal - Realized Profit)</h4>", unsafe_allow_html=True)
-        st.markdown(f"""
-        <div style='width: 80%; margin: 0 auto;'>
-            <div style='background-color: lightgray; height: 40px; position: relative; border-radius: 5px;'>
-                <div style='background: linear-gradient(to right, lightblue {progress_percentage * 100}%, lightgray 0%); width: 100%; height: 100%; border-radius: 5px; position: relative;'>
-                    <span style='position: absolute; left: {label_position_percentage}%; top: 50%; transform: translate(-50%, -50%); color: white; font-weight: bold;'>${total_dollars_deployed:,}</span>
-                </div>
-            </div>
-        </div>
-        """, unsafe_allow_html=True)
-        st.markdown(f"<h5 style='text-align: center; font-weight: bold; color: gray;'>$500k Initial Deployment Goal</h5>", unsafe_allow_html=True)
-    else:
-        st.error("No data available for Total Dollars Deployed.")
-
-    # Add extra spacing
-    st.markdown("<br><br><br>", unsafe_allow_html=True)
-
-    # SQL query for Profit by League bar chart
-    league_profit_query = """
-    WITH DistinctBets AS (
-        SELECT DISTINCT b.WagerID, b.NetProfit, l.LeagueName
-        FROM bets b
-        JOIN legs l ON b.WagerID = l.WagerID
-        WHERE b.WhichBankroll = 'GreenAleph II'
-        AND b.LegCount = 1
+    "NHL Charts": LeaguePage(
+        'NHL', 'NHL Active Bets - GAII', parlay_header="NHL Parlays - GAII",
     ),
-    LeagueSums AS (
-        SELECT 
-            db.LeagueName,
-            ROUND(SUM(db.NetProfit), 0) AS NetProfit
-        FROM 
-            DistinctBets db
-        GROUP BY 
-            db.LeagueName
-    )
-    SELECT * FROM LeagueSums
-    UNION ALL
-    SELECT 
-        'Total' AS LeagueName,
-        ROUND(SUM(b.NetProfit), 0) AS NetProfit
-    FROM 
-        bets b
-    WHERE 
-        b.WhichBankroll = 'GreenAleph II'
-    AND b.WagerID IN (SELECT DISTINCT WagerID FROM legs);
-    """
-
-    # Fetch and process data for Profit by League
-    league_profit_data = get_data_from_db(league_profit_query)
-    if league_profit_data is None:
-        st.error("Failed to fetch league profit data from the database.")
-    else:
-        league_profit_df = pd.DataFrame(league_profit_data)
-        league_profit_df['LeagueName'] = league_profit_df['LeagueName'].astype(str)
-        league_profit_df['NetProfit'] = pd.to_numeric(league_profit_df['NetProfit'], errors='coerce')
-        league_profit_df = league_profit_df.dropna(subset=['LeagueName', 'NetProfit'])
-
-        if not league_profit_df.empty:
-            fig, ax = plt.subplots(figsize=(15, 8))
-            bar_colors = league_profit_df['NetProfit'].apply(lambda x: 'green' if x > 0 else 'red')
-            bars = ax.bar(league_profit_df['LeagueName'], league_profit_df['NetProfit'], color=bar_colors, edgecolor='black')
-            ax.set_title('Realized Profit by League', fontsize=18, fontweight='bold')
-            ax.set_ylabel('Realized Profit ($)', fontsize=16, fontweight='bold')
-            for bar in bars:
-                height = bar.get_height()
-                ax.annotate(f'${height:,.0f}', xy=(bar.get_x() + bar.get_width() / 2, height),
-                            xytext=(0, 3), textcoords="offset points",
-                            ha='center', va='bottom', fontsize=12, fontweight='bold', color='black')
-            plt.xticks(rotation=45, ha='right', fontsize=14, fontweight='bold')
-            ax.set_facecolor('white')
-            for spine in ax.spines.values():
-                spine.set_edgecolor('black')
-                spine.set_linewidth(1.2)
-            ymin = league_profit_df['NetProfit'].min() - 500
-            ymax = league_profit_df['NetProfit'].max() + 1500
-            ax.set_ylim(ymin, ymax)
-            plt.tight_layout()
-            st.pyplot(fig)
-
-    # SQL query for Realized Profit by Month without excluding 'Cashout'
-    monthly_profit_query = """
-        SELECT 
-            DATE_FORMAT(DateTimePlaced, '%Y-%m') AS Month,
-            SUM(NetProfit) AS TotalNetProfit
-        FROM bets
-        WHERE WhichBankroll = 'GreenAleph II'
-        GROUP BY Month
-        ORDER BY Month;
-    """
-    
-    # Fetch and process data for Cumulative Realized Profit by Month
-    monthly_profit_data = get_data_from_db(monthly_profit_query)
-    if monthly_profit_data is None:
-        st.error("Failed to fetch monthly realized profit data from the database.")
-    else:
-        # Convert data to DataFrame
-        monthly_profit_df = pd.DataFrame(monthly_profit_data)
-    
-        # Ensure the DataFrame is not empty
-        if not monthly_profit_df.empty:
-            # Convert Month column to datetime and set as index
-            monthly_profit_df['Month'] = pd.to_datetime(monthly_profit_df['Month'])
-            monthly_profit_df.set_index('Month', inplace=True)
-            monthly_profit_df.sort_index(inplace=True)
-    
-            # Calculate cumulative sum for the TotalNetProfit column
-            monthly_profit_df['CumulativeNetProfit'] = monthly_profit_df['TotalNetProfit'].cumsum()
-    
-            # Determine y-axis limits with a buffer around min and max values
-            y_min = monthly_profit_df['CumulativeNetProfit'].min() - 6000
-            y_max = monthly_profit_df['CumulativeNetProfit'].max() + 6000
-    
-            # Plot the Cumulative Realized Profit by Month line graph
-            #st.subheader("Cumulative Realized Profit by Month for 'GreenAleph II'")
-            fig, ax = plt.subplots(figsize=(14, 8))
-    
-            # Separate data for segments above and below zero
-            months = monthly_profit_df.index.strftime('%Y-%m')
-            cumulative_profits = monthly_profit_df['CumulativeNetProfit']
-    
-            # Plot segments of the line with color based on whether cumulative profit is above or below zero
-            for i in range(1, len(cumulative_profits)):
-                color = 'green' if cumulative_profits[i] >= 0 else 'red'
-                ax.plot(months[i-1:i+1], cumulative_profits[i-1:i+1], color=color, linewidth=3)
-    
-            # Enhancing the plot aesthetics
-            ax.set_ylabel('Cumulative Realized Profit ($)', fontsize=16, fontweight='bold')
-            ax.set_title('Cumulative Realized Profit by Month', fontsize=20, fontweight='bold')
-            ax.axhline(0, color='black', linewidth=1)  # Add horizontal line at y=0
-            ax.set_ylim(y_min, y_max)  # Set y-axis limits
-    
-            # Set x-axis labels with rotation and larger font size
-            plt.xticks(rotation=45, ha='right', fontsize=14, fontweight='bold')
-            plt.yticks(fontsize=14, fontweight='bold')
-    
-            # Add only the final value label on the right side
-            final_month = months[-1]
-            final_profit = cumulative_profits.iloc[-1]
-            ax.annotate(f"${final_profit:,.0f}", xy=(final_month, final_profit),
-                        xytext=(0, 8), textcoords="offset points",
-                        ha='center', fontsize=14, fontweight='bold', color='black')
-    
-            plt.tight_layout()
-            st.pyplot(fig)
-        else:
-            st.warning("No data available for monthly cumulative realized profit.")
-
-
-
-
-
-
-
-
-
-
-if page == "Principal Volume":
-    st.title("Principal Volume (GAII)")
-
-    # Define custom color mapping
-    league_colors = {
-        'ATP': 'green',
-        'WTA': 'yellow',
-        'NBA': 'darkorange',
-        'NCAA Men\'s Basketball': 'lightcoral',  # Light orange
-        'Olympics': 'black',
-        'NFL 2026': 'purple',
-        'MLB 2025': 'gray'
-    }
-    
-
-    # SQL queries
-    stacked_principal_volume_query = """
-        WITH DistinctBets AS (
-            SELECT DISTINCT WagerID, DollarsAtStake, DateTimePlaced
-            FROM bets
-            WHERE WLCA != 'Cashout'
-              AND WhichBankroll = 'GreenAleph II'
-        ),
-        MonthlySums AS (
-            SELECT 
-                DATE_FORMAT(db.DateTimePlaced, '%Y-%m') AS Month,
-                l.LeagueName,
-                SUM(db.DollarsAtStake) AS TotalDollarsAtStake
-            FROM 
-                DistinctBets db
-            JOIN 
-                (SELECT DISTINCT WagerID, LeagueName FROM legs) l ON db.WagerID = l.WagerID
-            GROUP BY 
-                Month, l.LeagueName
-        )
-        SELECT * FROM MonthlySums
-        ORDER BY Month, LeagueName;
-    """
-
-    stacked_principal_volume_weekly_query = """
-        WITH DistinctBets AS (
-            SELECT DISTINCT WagerID, DollarsAtStake, DateTimePlaced
-            FROM bets
-            WHERE WLCA != 'Cashout'
-              AND WhichBankroll = 'GreenAleph II'
-        ),
-        WeeklySums AS (
-            SELECT 
-                STR_TO_DATE(CONCAT(YEAR(db.DateTimePlaced), ' ', WEEK(db.DateTimePlaced, 3), ' 1'), '%X %V %w') AS WeekStart, 
-                l.LeagueName,
-                SUM(db.DollarsAtStake) AS TotalDollarsAtStake
-            FROM 
-                DistinctBets db
-            JOIN 
-                (SELECT DISTINCT WagerID, LeagueName FROM legs) l ON db.WagerID = l.WagerID
-            GROUP BY 
-                WeekStart, l.LeagueName
-        )
-        SELECT * FROM WeeklySums
-        ORDER BY WeekStart, LeagueName;
-    """
-
-    stacked_principal_volume_daily_query = """
-        WITH DistinctBets AS (
-            SELECT DISTINCT WagerID, DollarsAtStake, DateTimePlaced
-            FROM bets
-            WHERE WLCA != 'Cashout'
-              AND WhichBankroll = 'GreenAleph II'
-        ),
-        DailySums AS (
-            SELECT 
-                DATE_FORMAT(db.DateTimePlaced, '%Y-%m-%d') AS Day,
-                l.LeagueName,
-                SUM(db.DollarsAtStake) AS TotalDollarsAtStake
-            FROM 
-                DistinctBets db
-            JOIN 
-                (SELECT DISTINCT WagerID, LeagueName FROM legs) l ON db.WagerID = l.WagerID
-            GROUP BY 
-                Day, l.LeagueName
-        )
-        SELECT * FROM DailySums
-        ORDER BY Day, LeagueName;
-    """
-
-    league_principal_volume_query = """
-        WITH DistinctBets AS (
-            SELECT DISTINCT WagerID, DollarsAtStake
-            FROM bets
-            WHERE WLCA != 'Cashout'
-              AND WhichBankroll = 'GreenAleph II'
-        )
-        SELECT 
-            l.LeagueName,
-            SUM(db.DollarsAtStake) AS TotalDollarsAtStake
-        FROM 
-            DistinctBets db
-        JOIN 
-            (SELECT DISTINCT WagerID, LeagueName FROM legs) l ON db.WagerID = l.WagerID
-        GROUP BY l.LeagueName
-        ORDER BY TotalDollarsAtStake DESC;
-    """
-
-    # Fetch data
-    stacked_principal_volume_data = get_data_from_db(stacked_principal_volume_query)
-    weekly_principal_volume_data = get_data_from_db(stacked_principal_volume_weekly_query)
-    daily_principal_volume_data = get_data_from_db(stacked_principal_volume_daily_query)
-    league_principal_volume_data = get_data_from_db(league_principal_volume_query)
-
-    # Helper function to ensure data is numeric
-    def ensure_numeric(df, column_list):
-        for column in column_list:
-            df[column] = pd.to_numeric(df[column], errors='coerce').fillna(0)
-        return df
-
-    # Helper function to assign colors
-    def assign_colors(columns):
-        return [league_colors.get(col, 'blue') for col in columns]
-
-    # Monthly plot
-    if stacked_principal_volume_data:
-        df_monthly = pd.DataFrame(stacked_principal_volume_data)
-        if not df_monthly.empty:
-            df_monthly = ensure_numeric(df_monthly, ['TotalDollarsAtStake'])
-            df_pivot_monthly = df_monthly.pivot_table(
-                index='Month',
-                columns='LeagueName',
-                values='TotalDollarsAtStake',
-                aggfunc='sum'
-            ).fillna(0)
-
-            df_pivot_monthly.index = pd.to_datetime(df_pivot_monthly.index, format='%Y-%m', errors='coerce')
-            df_pivot_monthly.sort_index(inplace=True)
-
-            st.subheader("Principal Volume by Month")
-            plt.figure(figsize=(12, 6))
-            ax = df_pivot_monthly.plot(
-                kind='bar', 
-                stacked=True, 
-                figsize=(12, 6), 
-                color=assign_colors(df_pivot_monthly.columns)
-            )
+    "NFL Charts": LeaguePage(
+        'NFL 2026', 'NFL 2026 Active Bets - GAII', parlay_header="NFL Parlays - GAII",
+        wlca_filter=True, payout_color='orange', payout_label_rotation=0,
+        ylabel='USD ($)', ylim_pad=(60000, 80000),
+    ),
+    "MLB Charts": LeaguePage(
+        'MLB 2025', 'MLB 2025 Active Bets - GAII', straight_only=True,
+        event_type_title='Total Active Principal by EventType (GAII)',
+        straight_title='Total Active Principal & Potential Payout (Straight Bets Only)',
+        stake_labels="stake", payout_label_rotation=0, ylabel='USD ($)', ylim_pad=(5000, 5000),
+    ),
+}
 
-            plt.ylabel('Total Principal ($)')
-            plt.title('Principal Volume by Month')
-            plt.xticks(ticks=range(len(df_pivot_monthly.index)), labels=df_pivot_monthly.index.strftime('%Y-%m'), rotation=45, ha='right')
-            plt.legend(title='LeagueName', bbox_to_anchor=(1.05, 1), loc='upper left')
-            plt.tight_layout()
-            st.pyplot(plt)
-        else:
-            st.warning("No data available for 'GreenAleph II' principal volume by month.")
-    else:
-        st.error("Failed to retrieve monthly data from the database.")
+# Sidebar for navigation
+st.sidebar.title("Navigation")
+page = st.sidebar.radio("Go to", ["Main Page", "Principal Volume", "Betting Frequency", "NBA Charts", "NCAAB Charts", "NHL Charts", "NFL Charts", "NFL Playoffs EV", "Tennis Charts", "MLB Charts", "MLB Principal Tables", "NBA Participant Positions", "NFL Participant Positions", "Futures Scanner"])
 
-    # Weekly plot
-    if weekly_principal_volume_data:
-        df_weekly = pd.DataFrame(weekly_principal_volume_data)
-        if not df_weekly.empty:
-            df_weekly = ensure_numeric(df_weekly, ['TotalDollarsAtStake'])
-            df_pivot_weekly = df_weekly.pivot_table(
-                index='WeekStart',
-                columns='LeagueName',
-                values='TotalDollarsAtStake',
-                aggfunc='sum'
-            ).fillna(0)
-    
-            # Ensure the index is datetime and sort
-            df_pivot_weekly.index = pd.to_datetime(df_pivot_weekly.index, errors='coerce').strftime('%Y-%m')
-            df_pivot_weekly.sort_index(inplace=True)
-    
-            st.subheader("Principal Volume by Week")
-            plt.figure(figsize=(12, 6))
-            ax = df_pivot_weekly.plot(
-                kind='bar',
-                stacked=True,
-                figsize=(12, 6),
-                color=assign_colors(df_pivot_weekly.columns)
-            )
-    
-            plt.ylabel('Total Principal ($)')
-            plt.title('Total Principal Volume by Week (Stacked by LeagueName)')
-            plt.xticks(
-                ticks=range(len(df_pivot_weekly.index)),
-                labels=df_pivot_weekly.index,
-                rotation=45,
-                ha='right'
-            )
-            plt.legend(title='LeagueName', bbox_to_anchor=(1.05, 1), loc='upper left')
-            plt.tight_layout()
-            st.pyplot(plt)
-        else:
-            st.warning("No data available for 'GreenAleph II' principal volume by week.")
-    else:
-        st.error("Failed to retrieve weekly data from the database.")
+# Connection pool health (hit/miss, checkout wait)
+with st.sidebar.expander("DB Pool Stats"):
+    pool_stats = get_db_pool().stats()
+    st.write(f"Open: {pool_stats['open']} / {pool_stats['size']} (idle {pool_stats['idle']})")
+    st.write(f"Hits / Misses: {pool_stats['hits']} / {pool_stats['misses']} ({pool_stats['hit_rate']:.0%} hit rate)")
+    st.write(f"Waits: {pool_stats['waits']}, avg checkout {pool_stats['wait_seconds_avg'] * 1000:.1f} ms, max {pool_stats['wait_seconds_max'] * 1000:.1f} ms")
+    st.write(f"Reconnects: {pool_stats['reconnects']}, discarded: {pool_stats['discarded']}")
 
 
-    # Daily plot
-    if daily_principal_volume_data:
-        df_daily = pd.DataFrame(daily_principal_volume_data)
-        if not df_daily.empty:
-            df_daily = ensure_numeric(df_daily, ['TotalDollarsAtStake'])
-            df_pivot_daily = df_daily.pivot_table(
-                index='Day',
-                columns='LeagueName',
-                values='TotalDollarsAtStake',
-                aggfunc='sum'
-            ).fillna(0)
-
-            df_pivot_daily.index = pd.to_datetime(df_pivot_daily.index, format='%Y-%m-%d', errors='coerce')
-            df_pivot_daily.sort_index(inplace=True)
-
-            st.subheader("Total Principal Volume by Day (Stacked by LeagueName)")
-            plt.figure(figsize=(12, 6))
-            ax = df_pivot_daily.plot(
-                kind='bar', 
-                stacked=True, 
-                figsize=(12, 6), 
-                color=assign_colors(df_pivot_daily.columns)
-            )
+# Check if the user is on the "Main Page" page
+if page == "Main Page":
+    # Page title and update time display
+    st.title('Principal Dashboard - GreenAleph II')
+    st.markdown(f"**Last Update:** {last_update_time}", unsafe_allow_html=True)
 
-            plt.ylabel('Total Principal ($)')
-            plt.title('Total Principal Volume by Day (Stacked by LeagueName)')
-            monthly_labels = [label if i % 30 == 0 else '' for i, label in enumerate(df_pivot_daily.index.strftime('%Y-%m-%d'))]
-            plt.xticks(ticks=range(len(df_pivot_daily.index)), labels=monthly_labels, rotation=45, ha='right')
-            plt.legend(title='LeagueName', bbox_to_anchor=(1.05, 1), loc='upper left')
-            plt.tight_layout()
-            st.pyplot(plt)
-        else:
-            st.warning("No data available for 'GreenAleph II' principal volume by day.")
-    else:
-        st.error("Failed to retrieve daily data from the database.")
+    # Every chart on this page is computed from the in-memory portfolio
+    portfolio = get_portfolio()
 
-    # Principal Volume by League plot
-    if league_principal_volume_data:
-        df_league = pd.DataFrame(league_principal_volume_data)
-        if not df_league.empty:
-            # Ensure the data is numeric and sort in ascending order
-            df_league = ensure_numeric(df_league, ['TotalDollarsAtStake'])
-            df_league = df_league.sort_values(by='TotalDollarsAtStake', ascending=True)
-    
-            st.subheader("Principal Volume by League")
-            plt.figure(figsize=(12, 6))
-            bar_colors = [league_colors.get(league, 'blue') for league in df_league['LeagueName']]
-            plt.bar(df_league['LeagueName'], df_league['TotalDollarsAtStake'], color=bar_colors, edgecolor='black')
+    # Active Principal by League bar chart (straight bets)
+    active_principal_df = portfolio.active_principal_by_league()
+    active_principal_df['TotalDollarsAtStake'] = active_principal_df['TotalDollarsAtStake'].astype(float)
+    active_principal_df = active_principal_df.sort_values(by='TotalDollarsAtStake')
     
-            plt.ylabel('Total Principal ($)')
-            plt.title('Total Principal Volume by LeagueName')
-            plt.xticks(rotation=45, ha='right')
+    colors = ['#77dd77', '#89cff0', '#fdfd96', '#ffb347', '#aec6cf', '#cfcfc4', '#ffb6c1', '#b39eb5']
+    total_color = 'lightblue'
+    bar_colors = [total_color if name == 'Total' else colors[i % len(colors)] for i, name in enumerate(active_principal_df['LeagueName'])]
     
-            st.pyplot(plt)
-        else:
-            st.warning("No data available for 'GreenAleph II' principal volume by league.")
-    else:
-        st.error("Failed to retrieve league data from the database.")
-
-
-
-
-
-
-
-
-# Adding the new "Betting Frequency" page
-if page == "Betting Frequency":
-    st.title("Betting Frequency (GAII)")
-
-    # SQL query to get the number of bets by month for 'GreenAleph II'
-    frequency_query = """
-        SELECT 
-            DATE_FORMAT(DateTimePlaced, '%Y-%m') AS Month,
-            COUNT(WagerID) AS NumberOfBets
-        FROM bets
-        WHERE WhichBankroll = 'GreenAleph II'
-        GROUP BY Month
-        ORDER BY Month;
-    """
-
-    # SQL query to get the total betting frequency by LeagueName for 'GreenAleph II', counting each WagerID only once
-    league_frequency_query = """
-        SELECT 
-            l.LeagueName,
-            COUNT(DISTINCT b.WagerID) AS NumberOfBets
-        FROM bets b
-        JOIN legs l ON b.WagerID = l.WagerID
-        WHERE b.WhichBankroll = 'GreenAleph II'
-        GROUP BY l.LeagueName
-        ORDER BY NumberOfBets DESC;
-    """
-
-    # Get data from the database for the first chart
-    frequency_data = get_data_from_db(frequency_query)
-
-    if frequency_data:
-        # Convert the data to a DataFrame for plotting
-        df_frequency = pd.DataFrame(frequency_data)
-
-        # Check if the DataFrame is not empty
-        if not df_frequency.empty:
-            df_frequency['Month'] = pd.to_datetime(df_frequency['Month'])
-            df_frequency.set_index('Month', inplace=True)
-            df_frequency.sort_index(inplace=True)
-
-            # Calculate the total number of bets
-            total_bets = df_frequency['NumberOfBets'].sum()
-            total_row = pd.DataFrame({'NumberOfBets': [total_bets]}, index=['Total'])
-            df_frequency = pd.concat([df_frequency, total_row])
-
-            # Prepare x-axis labels
-            x_labels = [date.strftime('%Y-%m') if isinstance(date, pd.Timestamp) else date for date in df_frequency.index]
-
-            # Plot the first bar chart
-            st.subheader("Number of Bets Placed by Month")
-            plt.figure(figsize=(12, 6))
-            bars = plt.bar(x_labels, df_frequency['NumberOfBets'])
-            plt.ylabel('Number of Bets')
-            plt.title('Number of Bets Placed by Month (GreenAleph II)')
-            plt.xticks(rotation=45, ha='right')
-
-            # Add value labels above each bar
-            for bar in bars:
-                yval = bar.get_height()
-                plt.text(bar.get_x() + bar.get_width()/2, yval, int(yval), ha='center', va='bottom')
-
-            st.pyplot(plt)
-        else:
-            st.warning("No data available for 'GreenAleph II' betting frequency.")
-    else:
-        st.error("Failed to retrieve data from the database.")
-
-    # Get data from the database for the second chart
-    league_frequency_data = get_data_from_db(league_frequency_query)
-
-    if league_frequency_data:
-        # Convert the data to a DataFrame for plotting
-        df_league_frequency = pd.DataFrame(league_frequency_data)
-
-        # Ensure correct data types for plotting
-        df_league_frequency['LeagueName'] = df_league_frequency['LeagueName'].astype(str)
-        df_league_frequency['NumberOfBets'] = df_league_frequency['NumberOfBets'].astype(int)
-
-        # Sort by NumberOfBets in ascending order
-        df_league_frequency = df_league_frequency.sort_values(by='NumberOfBets', ascending=True)
-
-        # Check if the DataFrame is not empty
-        if not df_league_frequency.empty:
-            # Plot the second bar chart
-            st.subheader("Betting Frequency by League")
-            plt.figure(figsize=(12, 6))
-            plt.bar(df_league_frequency['LeagueName'], df_league_frequency['NumberOfBets'])
-            plt.ylabel('Number of Bets')
-            plt.title('Number of Bets Placed by League (GreenAleph II)')
-            plt.xticks(rotation=45, ha='right')
-
-            # Add value labels above each bar
-            for index, value in enumerate(df_league_frequency['NumberOfBets']):
-                plt.text(index, value, int(value), ha='center', va='bottom')
-
-            st.pyplot(plt)
-        else:
-            st.warning("No data available for 'GreenAleph II' betting frequency by league.")
-    else:
-        st.error("Failed to retrieve data from the database.")
-
-
-
-
-
-
-
-elif page == "NBA Charts":
-    # NBA Charts
-    st.title('NBA Active Bets - GAII')
-
-    # --- teams to EXCLUDE for “Championship” / “Conference Winner” ---
-    EXCLUDED_NBA_TEAMS = [
-        'Brooklyn Nets', 'Chicago Bulls', 'Dallas Mavericks',
-        'New Orleans Pelicans', 'Philadelphia 76ers', 'Phoenix Suns',
-        'Portland Trail Blazers', 'Sacramento Kings', 'San Antonio Spurs',
-        'Toronto Raptors', 'Utah Jazz', 'Washington Wizards',
-        'Atlanta Hawks', 'Charlotte Hornets', 'Los Angeles Clippers', 'Milwaukee Bucks',
-        'Memphis Grizzlies', 'Orlando Magic', 'Miami Heat', 'Detroit Pistons',
-        'Houston Rockets', 'Los Angeles Lakers', 'Boston Celtics', 'Denver Nuggets', 
-        'Golden State Warriors', 'Cleveland Cavaliers'
-    ]
-
-    # 1️⃣  Active-principal by EventType  ───────────────────────────
-    first_chart_query = """
-    WITH DistinctBets AS (
-        SELECT DISTINCT WagerID, DollarsAtStake
-        FROM bets
-        WHERE WhichBankroll = 'GreenAleph II'
-          AND WLCA = 'Active'
-    ),
-    EventTypeSums AS (
-        SELECT l.EventType,
-               ROUND(SUM(db.DollarsAtStake), 0) AS TotalDollarsAtStake
-        FROM DistinctBets db
-        JOIN (SELECT DISTINCT WagerID, EventType, LeagueName
-              FROM legs) l ON db.WagerID = l.WagerID
-        WHERE l.LeagueName = 'NBA'
-        GROUP BY l.EventType
-    )
-    SELECT * FROM EventTypeSums
-    UNION ALL
-    SELECT 'Total' AS EventType,
-           ROUND(SUM(db.DollarsAtStake), 0) AS TotalDollarsAtStake
-    FROM DistinctBets db
-    JOIN (SELECT DISTINCT WagerID, LeagueName
-          FROM legs) l ON db.WagerID = l.WagerID
-    WHERE l.LeagueName = 'NBA';
-    """
-    first_chart_df = pd.DataFrame(get_data_from_db(first_chart_query))
-    first_chart_df['TotalDollarsAtStake'] = first_chart_df['TotalDollarsAtStake'].astype(float).round(0)
-    first_chart_df = first_chart_df.sort_values('TotalDollarsAtStake')
-
-    pastel = ['#a0d8f1', '#f4a261', '#e76f51', '#8ecae6', '#219ebc',
-              '#023047', '#ffb703', '#fb8500', '#d4a5a5', '#9ab0a8']
     fig, ax = plt.subplots(figsize=(15, 10))
-    ax.bar(first_chart_df['EventType'], first_chart_df['TotalDollarsAtStake'],
-           color=[pastel[i % len(pastel)] for i in range(len(first_chart_df))],
-           width=0.6, edgecolor='black')
-    ax.set_title('Active Principal by EventType (GAII)', fontsize=18, fontweight='bold')
+    bars = ax.bar(active_principal_df['LeagueName'], active_principal_df['TotalDollarsAtStake'], color=bar_colors, width=0.6, edgecolor='black')
+    ax.set_title('GAII: Total Active Principal', fontsize=18, fontweight='bold')
     ax.set_ylabel('Total Dollars At Stake ($)', fontsize=14, fontweight='bold')
-    for bar in ax.patches:
-        ax.annotate(f'{bar.get_height():,.0f}',
-                    (bar.get_x() + bar.get_width()/2, bar.get_height()),
-                    xytext=(0, 3), textcoords='offset points',
-                    ha='center', va='bottom', fontsize=14, fontweight='bold')
+    for bar in bars:
+        height = bar.get_height()
+        ax.annotate(f'${height:,.0f}', xy=(bar.get_x() + bar.get_width() / 2, height),
+                    xytext=(0, 3), textcoords="offset points",
+                    ha='center', va='bottom', fontsize=12, fontweight='bold', color='black')
     plt.xticks(rotation=45, ha='right', fontsize=14, fontweight='bold')
     ax.axhline(0, color='black', linewidth=0.8)
-    for s in ax.spines.values():
-        s.set_edgecolor('black'); s.set_linewidth(1.2)
+    ax.set_facecolor('white')
+    for spine in ax.spines.values():
+        spine.set_edgecolor('black')
+        spine.set_linewidth(1.2)
+    plt.tight_layout()
     st.pyplot(fig)
 
-    # 2️⃣  Dropdowns  ───────────────────────────────────────────────
-    event_type_option = st.selectbox(
-        'Select EventType',
-        sorted(first_chart_df[first_chart_df['EventType'] != 'Total']['EventType'].unique())
-    )
-    if not event_type_option:
-        st.stop()
-
-    event_label_query = f"""
-    SELECT DISTINCT l.EventLabel
-    FROM bets b
-    JOIN legs l ON b.WagerID = l.WagerID
-    WHERE l.LeagueName = 'NBA'
-      AND l.EventType = '{event_type_option}'
-      AND b.WhichBankroll = 'GreenAleph II'
-      AND b.WLCA = 'Active';
-    """
-    event_label_option = st.selectbox(
-        'Select EventLabel',
-        sorted(row['EventLabel'] for row in get_data_from_db(event_label_query))
-    )
-    if not event_label_option:
-        st.stop()
-
-    # 3️⃣  Active-principal & potential-payout chart (straight bets) ─
-    combined_query = f"""
-    WITH DistinctBets AS (
-        SELECT DISTINCT WagerID, DollarsAtStake, PotentialPayout
-        FROM bets
-        WHERE WhichBankroll = 'GreenAleph II'
-          AND WLCA = 'Active'
-          AND LegCount = 1
-    )
-    SELECT l.ParticipantName,
-           SUM(db.DollarsAtStake)  AS TotalDollarsAtStake,
-           SUM(db.PotentialPayout) AS TotalPotentialPayout
-    FROM DistinctBets db
-    JOIN legs l ON db.WagerID = l.WagerID
-    WHERE l.LeagueName = 'NBA'
-      AND l.EventType = '{event_type_option}'
-      AND l.EventLabel = '{event_label_option}'
-    GROUP BY l.ParticipantName;
-    """
-    combined_df = pd.DataFrame(get_data_from_db(combined_query))
-
-    # ▸ exclude unwanted teams for title / conference markets
-
-
-    if combined_df.empty:
-        st.warning("No data for selected filters.")
-        st.stop()
-
-    combined_df['ImpliedProbability'] = (
-        combined_df['TotalDollarsAtStake'] / combined_df['TotalPotentialPayout']
-    ) * 100
-
-    # 🔧  cast BEFORE round to avoid TypeError
-    combined_df['TotalDollarsAtStake']  = -combined_df['TotalDollarsAtStake'].astype(float).round(0)
-    combined_df['TotalPotentialPayout'] =  combined_df['TotalPotentialPayout'].astype(float).round(0)
-    combined_df = combined_df.sort_values('TotalDollarsAtStake')
-
-    fig, ax = plt.subplots(figsize=(18, 12))
-    bars1 = ax.bar(combined_df['ParticipantName'], combined_df['TotalDollarsAtStake'],
-                   color='lightblue', width=0.4, edgecolor='black')
-    bars2 = ax.bar(combined_df['ParticipantName'], combined_df['TotalPotentialPayout'],
-                   color='beige', width=0.4, edgecolor='black')
-    ax.set_ylabel('USD ($) in MM', fontsize=16, fontweight='bold')
-    ax.set_title('Active Principal & Potential Payout (Straight Bets Only)',
-                 fontsize=18, fontweight='bold')
-    for i, bar1 in enumerate(bars1):
-        ax.annotate(f"{combined_df.iloc[i]['ImpliedProbability']:.1f}%",
-                    (bar1.get_x()+bar1.get_width()/2, bar1.get_height()),
-                    xytext=(0, -15), textcoords='offset points',
-                    ha='center', va='bottom', fontsize=12, fontweight='bold')
-    for bar2 in bars2:
-        ax.annotate(f"{bar2.get_height():,.0f}",
-                    (bar2.get_x()+bar2.get_width()/2, bar2.get_height()),
-                    xytext=(0, 3), textcoords='offset points',
-                    ha='center', va='bottom', fontsize=12, fontweight='bold', rotation=45)
-    plt.xticks(rotation=45, ha='right', fontsize=14, fontweight='bold')
-    ax.legend([bars2, bars1], ['Potential Payout', 'Implied Probability (%)'])
-    ax.axhline(0, color='black', linewidth=0.8)
-    for s in ax.spines.values():
-        s.set_edgecolor('black'); s.set_linewidth(1.2)
-    ax.set_ylim(min(combined_df['TotalDollarsAtStake']) - 35000,
-                max(combined_df['TotalPotentialPayout']) + 80000)
-    st.pyplot(fig)
-
-    # 4️⃣  Parlays section  ────────────────────────────────────────
-    st.header("NBA Parlays - GAII")
-    parlay_count_query = f"""
-    SELECT l.ParticipantName,
-           COUNT(DISTINCT b.WagerID) AS NumberOfParlays
-    FROM bets b
-    JOIN legs l ON b.WagerID = l.WagerID
-    WHERE b.WhichBankroll = 'GreenAleph II'
-      AND b.WLCA = 'Active'
-      AND b.LegCount > 1
-      AND l.LeagueName = 'NBA'
-      AND l.EventType = %s
-    GROUP BY l.ParticipantName
-    ORDER BY NumberOfParlays DESC;
-    """
-    parlay_df = pd.DataFrame(get_data_from_db(parlay_count_query, [event_type_option]))
-    if event_type_option in ('Championship', 'Conference Winner'):
-        parlay_df = parlay_df[~parlay_df['ParticipantName'].isin(EXCLUDED_NBA_TEAMS)]
-
-    if not parlay_df.empty:
-        st.subheader(f"Number of Parlays by Participant for {event_type_option}")
-        fig, ax = plt.subplots(figsize=(14, 8))
-        bars = ax.bar(parlay_df['ParticipantName'], parlay_df['NumberOfParlays'],
-                      color='skyblue', edgecolor='black')
-        ax.set_title(f"Parlay Involvement by Participant for {event_type_option} (GAII)",
-                     fontsize=18, fontweight='bold')
-        ax.set_ylabel("Number of Parlays", fontsize=14, fontweight='bold')
-        plt.xticks(rotation=45, ha='right', fontsize=12, fontweight='bold')
-        for bar in bars:
-            ax.annotate(f"{bar.get_height()}",
-                        (bar.get_x()+bar.get_width()/2, bar.get_height()),
-                        xytext=(0, 5), textcoords='offset points',
-                        ha='center', va='bottom', fontsize=12)
-        ax.axhline(0, color='black', linewidth=0.8)
-        for s in ax.spines.values():
-            s.set_edgecolor('black'); s.set_linewidth(1.2)
-        st.pyplot(fig)
-
-    parlay_dollars_query = f"""
-    SELECT l.ParticipantName,
-           SUM(b.DollarsAtStake) AS TotalDollarsAtStake
-    FROM bets b
-    JOIN legs l ON b.WagerID = l.WagerID
-    WHERE b.WhichBankroll = 'GreenAleph II'
-      AND b.WLCA = 'Active'
-      AND b.LegCount > 1
-      AND l.LeagueName = 'NBA'
-      AND l.EventType = %s
-    GROUP BY l.ParticipantName
-    ORDER BY TotalDollarsAtStake DESC;
-    """
-    parlay_dollars_df = pd.DataFrame(get_data_from_db(parlay_dollars_query, [event_type_option]))
-    if event_type_option in ('Championship', 'Conference Winner'):
-        parlay_dollars_df = parlay_dollars_df[
-            ~parlay_dollars_df['ParticipantName'].isin(EXCLUDED_NBA_TEAMS)
-        ]
-
-    if not parlay_dollars_df.empty:
-        st.subheader(f"Total Dollars At Stake in Parlays by Participant for {event_type_option}")
-        fig, ax = plt.subplots(figsize=(14, 8))
-        bars = ax.bar(parlay_dollars_df['ParticipantName'],
-                      parlay_dollars_df['TotalDollarsAtStake'],
-                      color='lightblue', edgecolor='black')
-        ax.set_title(f"Total Dollars At Stake in Parlays by Participant for {event_type_option} (GAII)",
-                     fontsize=18, fontweight='bold')
-        ax.set_ylabel("Total Dollars At Stake ($)", fontsize=14, fontweight='bold')
-        plt.xticks(rotation=45, ha='right', fontsize=12, fontweight='bold')
-        for bar in bars:
-            ax.annotate(f"${bar.get_height():,.0f}",
-                        (bar.get_x()+bar.get_width()/2, bar.get_height()),
-                        xytext=(0, 5), textcoords='offset points',
-                        ha='center', va='bottom', fontsize=12)
-        ax.axhline(0, color='black', linewidth=0.8)
-        for s in ax.spines.values():
-            s.set_edgecolor('black'); s.set_linewidth(1.2)
-        st.pyplot(fig)
-
-
-
-
-elif page == "NCAAB Charts":
-    # NCAAB Charts
-    st.title('NCAAB Active Bets - GAII')
-
-    # SQL query to fetch data for the first bar chart
-    first_chart_query = """
-    WITH DistinctBets AS (
-        SELECT DISTINCT WagerID, DollarsAtStake
-        FROM bets
-        WHERE WhichBankroll = 'GreenAleph II'
-          AND WLCA = 'Active'
-    ),
-    EventTypeSums AS (
-        SELECT 
-            l.EventType,
-            ROUND(SUM(db.DollarsAtStake), 0) AS TotalDollarsAtStake
-        FROM 
-            DistinctBets db
-        JOIN 
-            (SELECT DISTINCT WagerID, EventType, LeagueName FROM legs) l ON db.WagerID = l.WagerID
-        WHERE
-            l.LeagueName = 'NCAA Mens Basketball 2026'
-        GROUP BY 
-            l.EventType
-    )
-    SELECT * FROM EventTypeSums
-
-    UNION ALL
-
-    SELECT 
-        'Total' AS EventType,
-        ROUND(SUM(db.DollarsAtStake), 0) AS TotalDollarsAtStake
-    FROM 
-        DistinctBets db
-    JOIN 
-        (SELECT DISTINCT WagerID, LeagueName FROM legs) l ON db.WagerID = l.WagerID
-    WHERE
-        l.LeagueName = 'NCAA Mens Basketball 2026';
-    """
-
-    # Fetch the data for the first bar chart
-    first_chart_data = get_data_from_db(first_chart_query)
-
-    # Check if data is fetched successfully
-    if first_chart_data is None:
-        st.error("Failed to fetch data from the database.")
-    else:
-        # Create a DataFrame from the fetched data
-        first_chart_df = pd.DataFrame(first_chart_data)
-
-        # Display the fetched data
-        first_chart_df['TotalDollarsAtStake'] = first_chart_df['TotalDollarsAtStake'].astype(float).round(0)
-
-        # Sort the DataFrame by 'TotalDollarsAtStake' in ascending order
-        first_chart_df = first_chart_df.sort_values('TotalDollarsAtStake', ascending=True)
-
-        # Define pastel colors for the first chart
-        pastel_colors = ['#a0d8f1', '#f4a261', '#e76f51', '#8ecae6', '#219ebc', '#023047', '#ffb703', '#fb8500', '#d4a5a5', '#9ab0a8']
+    # Add extra spacing
+    st.markdown("<br><br><br>", unsafe_allow_html=True)
 
-        # Plot the first bar chart
-        fig, ax = plt.subplots(figsize=(15, 10))
-        bars = ax.bar(first_chart_df['EventType'], first_chart_df['TotalDollarsAtStake'], color=[pastel_colors[i % len(pastel_colors)] for i in range(len(first_chart_df['EventType']))], width=0.6, edgecolor='black')
+    # Total Dollars Deployed (active principal - realized profit)
+    total_dollars_deployed = portfolio.total_dollars_deployed()
+    total_dollars_deployed = round(float(total_dollars_deployed)) if total_dollars_deployed is not None else 0
+    total_dollars_deployed += 15000
+    goal_amount = 500000
+    progress_percentage = min(total_dollars_deployed / goal_amount, 1)
+    label_position_percentage = progress_percentage * 50
+    
+    # Display Total $ Deployed progress bar between the charts
+    st.markdown(f"<h4 style='text-align: center; font-weight: bold; color: black;'>Total $ Deployed (Total Active Principal - Realized Profit)</h4>", unsafe_allow_html=True)
+    st.markdown(f"""
+    <div style='width: 80%; margin: 0 auto;'>
+        <div style='background-color: lightgray; height: 40px; position: relative; border-radius: 5px;'>
+            <div style='background: linear-gradient(to right, lightblue {progress_percentage * 100}%, lightgray 0%); width: 100%; height: 100%; border-radius: 5px; position: relative;'>
+                <span style='position: absolute; left: {label_position_percentage}%; top: 50%; transform: translate(-50%, -50%); color: white; font-weight: bold;'>${total_dollars_deployed:,}</span>
+            </div>
+        </div>
+    </div>
+    """, unsafe_allow_html=True)
+    st.markdown(f"<h5 style='text-align: center; font-weight: bold; color: gray;'>$500k Initial Deployment Goal</h5>", unsafe_allow_html=True)
 
-        # Add labels and title
-        ax.set_title('Active Principal by EventType (GAII)', fontsize=18, fontweight='bold')
-        ax.set_ylabel('Total Dollars At Stake ($)', fontsize=14, fontweight='bold')
+    # Add extra spacing
+    st.markdown("<br><br><br>", unsafe_allow_html=True)
 
-        # Annotate each bar with the value (no dollar sign)
+    # Profit by League bar chart
+    league_profit_df = portfolio.realized_profit_by_league()
+    league_profit_df['LeagueName'] = league_profit_df['LeagueName'].astype(str)
+    league_profit_df['NetProfit'] = pd.to_numeric(league_profit_df['NetProfit'], errors='coerce')
+    league_profit_df = league_profit_df.dropna(subset=['LeagueName', 'NetProfit'])
+
+    if not league_profit_df.empty:
+        fig, ax = plt.subplots(figsize=(15, 8))
+        bar_colors = league_profit_df['NetProfit'].apply(lambda x: 'green' if x > 0 else 'red')
+        bars = ax.bar(league_profit_df['LeagueName'], league_profit_df['NetProfit'], color=bar_colors, edgecolor='black')
+        ax.set_title('Realized Profit by League', fontsize=18, fontweight='bold')
+        ax.set_ylabel('Realized Profit ($)', fontsize=16, fontweight='bold')
         for bar in bars:
             height = bar.get_height()
-            ax.annotate(f'{height:,.0f}', xy=(bar.get_x() + bar.get_width() / 2, height),
+            ax.annotate(f'${height:,.0f}', xy=(bar.get_x() + bar.get_width() / 2, height),
                         xytext=(0, 3), textcoords="offset points",
-                        ha='center', va='bottom', fontsize=14, fontweight='bold', color='black')
-
-        # Rotate the x-axis labels to 45 degrees
+                        ha='center', va='bottom', fontsize=12, fontweight='bold', color='black')
         plt.xticks(rotation=45, ha='right', fontsize=14, fontweight='bold')
-
-        # Add horizontal line at y=0 for reference
-        ax.axhline(0, color='black', linewidth=0.8)
-
-        # Set background color to white
         ax.set_facecolor('white')
-
-        # Add border around the plot
         for spine in ax.spines.values():
             spine.set_edgecolor('black')
             spine.set_linewidth(1.2)
-
-        # Adjust layout
+        ymin = league_profit_df['NetProfit'].min() - 500
+        ymax = league_profit_df['NetProfit'].max() + 1500
+        ax.set_ylim(ymin, ymax)
         plt.tight_layout()
-
-        # Use Streamlit to display the first chart
         st.pyplot(fig)
 
-        # Filter for EventType, sorted in alphabetical order
-        event_type_option = st.selectbox('Select EventType', sorted(first_chart_df[first_chart_df['EventType'] != 'Total']['EventType'].unique()))
+    # Cumulative Realized Profit by Month (all bets, including cashouts)
+    monthly_profit_df = portfolio.realized_profit_by_month()
 
-        if event_type_option:
-            # SQL query to fetch data for the EventLabel dropdown, sorted alphabetically
-            event_label_query = f"""
-            SELECT DISTINCT l.EventLabel
-            FROM 
-                bets b
-            JOIN 
-                legs l ON b.WagerID = l.WagerID
-            WHERE
-                l.LeagueName = 'NCAA Mens Basketball 2026'
-                AND l.EventType = '{event_type_option}'
-                AND b.WhichBankroll = 'GreenAleph II'
-                AND b.WLCA = 'Active'
-                ;
-            """
-
-            # Fetch the EventLabel data
-            event_label_data = get_data_from_db(event_label_query)
-
-            if event_label_data is None:
-                st.error("Failed to fetch data from the database.")
-            else:
-                event_labels = [row['EventLabel'] for row in event_label_data]
-                event_label_option = st.selectbox('Select EventLabel', sorted(event_labels))
-
-                if event_label_option:
-                    # SQL query to fetch data for the combined bar chart (DollarsAtStake and PotentialPayout)
-                    combined_query = f"""
-                    WITH DistinctBets AS (
-                        SELECT DISTINCT WagerID, DollarsAtStake, PotentialPayout
-                        FROM bets
-                        WHERE WhichBankroll = 'GreenAleph II'
-                          AND WLCA = 'Active'
-                          AND LegCount = 1
-                    )
-                    SELECT 
-                        l.ParticipantName,
-                        SUM(db.DollarsAtStake) AS TotalDollarsAtStake,
-                        SUM(db.PotentialPayout) AS TotalPotentialPayout
-                    FROM 
-                        DistinctBets db
-                    JOIN 
-                        legs l ON db.WagerID = l.WagerID
-                    WHERE
-                        l.LeagueName = 'NCAA Mens Basketball 2026'
-                        AND l.EventType = '{event_type_option}'
-                        AND l.EventLabel = '{event_label_option}'
-                    GROUP BY 
-                        l.ParticipantName;
-                    """
-                
-                    # Fetch the combined data
-                    combined_data = get_data_from_db(combined_query)
-                    
-                    # Check if data is fetched successfully
-                    if combined_data is None:
-                        st.error("Failed to fetch data from the database.")
-                    else:
-                        # Create a DataFrame from the fetched data
-                        combined_df = pd.DataFrame(combined_data)
-                    
-                        # Calculate Implied Probability
-                        combined_df['ImpliedProbability'] = (combined_df['TotalDollarsAtStake'] / combined_df['TotalPotentialPayout']) * 100
-                    
-                        # Modify TotalDollarsAtStake for the chart (to show negative values)
-                        combined_df['TotalDollarsAtStake'] = -combined_df['TotalDollarsAtStake'].astype(float).round(0)
-                        combined_df['TotalPotentialPayout'] = combined_df['TotalPotentialPayout'].astype(float).round(0)
-                    
-                        # Sort the DataFrame by 'TotalDollarsAtStake' in ascending order
-                        combined_df = combined_df.sort_values('TotalDollarsAtStake', ascending=True)
-                    
-                        # Define colors for DollarsAtStake and PotentialPayout
-                        color_dollars_at_stake = 'lightblue'  # Light blue for DollarsAtStake
-                        color_potential_payout = 'beige'  # Beige for PotentialPayout
-                    
-                        # Plot the combined bar chart
-                        fig, ax = plt.subplots(figsize=(18, 12))
-                    
-                        # Plot TotalDollarsAtStake moving downward from the x-axis
-                        bars1 = ax.bar(combined_df['ParticipantName'], combined_df['TotalDollarsAtStake'], 
-                                       color=color_dollars_at_stake, width=0.4, edgecolor='black')
-                    
-                        # Plot TotalPotentialPayout moving upward from the x-axis
-                        bars2 = ax.bar(combined_df['ParticipantName'], combined_df['TotalPotentialPayout'], 
-                                       color=color_potential_payout, width=0.4, edgecolor='black')
-                    
-                        # Add labels and title
-                        ax.set_ylabel('USD ($) in MM', fontsize=16, fontweight='bold')
-                        ax.set_title(f'Active Principal & Potential Payout (Straight Bets Only)', fontsize=18, fontweight='bold')
-                    
-                        # Annotate Implied Probability on TotalDollarsAtStake bars
-                        for i, bar1 in enumerate(bars1):
-                            implied_prob = combined_df.iloc[i]['ImpliedProbability']
-                            height = bar1.get_height()
-                            ax.annotate(f'{implied_prob:.1f}%', xy=(bar1.get_x() + bar1.get_width() / 2, height),
-                                        xytext=(0, -15),  # Move the labels further down below the bars
-                                        textcoords="offset points",
-                                        ha='center', va='bottom', fontsize=12, fontweight='bold', color='black')
-                    
-                        # Annotate TotalPotentialPayout above bars
-                        for bar2 in bars2:
-                            height2 = bar2.get_height()
-                            ax.annotate(f'{height2:,.0f}', xy=(bar2.get_x() + bar2.get_width() / 2, height2),
-                                        xytext=(0, 3), textcoords="offset points",
-                                        ha='center', va='bottom', fontsize=12, fontweight='bold', color='black', rotation = 45)
-                    
-                        # Rotate x-axis labels to 45 degrees
-                        plt.xticks(rotation=45, ha='right', fontsize=14, fontweight='bold')
-                    
-                        # Add legend
-                        ax.legend([bars2, bars1], ['Potential Payout', 'Implied Probability (%)'])
-                    
-                        # Add horizontal line at y=0 for reference
-                        ax.axhline(0, color='black', linewidth=0.8)
-                    
-                        # Set background color to white
-                        ax.set_facecolor('white')
-                    
-                        # Add border around the plot
-                        for spine in ax.spines.values():
-                            spine.set_edgecolor('black')
-                            spine.set_linewidth(1.2)
-                    
-                        # Extend y-axis range
-                        ax.set_ylim(min(combined_df['TotalDollarsAtStake']) - 35000, max(combined_df['TotalPotentialPayout']) + 80000)
-                    
-                        # Adjust layout
-                        plt.tight_layout()
-                    
-                        # Use Streamlit to display the combined chart
-                        st.pyplot(fig)
-
-
-            # Add a new section at the bottom for tracking the number of parlays by participant
-            st.header("NCAAB Parlays - GAII")
-
-            # SQL query to count the number of parlays each participant is involved in for the selected EventType
-            parlay_count_query = f"""
-            SELECT 
-                l.ParticipantName,
-                COUNT(DISTINCT b.WagerID) AS NumberOfParlays
-            FROM 
-                bets b
-            JOIN 
-                legs l ON b.WagerID = l.WagerID
-            WHERE 
-                b.WhichBankroll = 'GreenAleph II'
-                AND b.WLCA = 'Active'
-                AND b.LegCount > 1  -- Only count parlays
-                AND l.LeagueName = 'NCAA Mens Basketball 2026'
-                AND l.EventType = %s
-            GROUP BY 
-                l.ParticipantName
-            ORDER BY 
-                NumberOfParlays DESC;
-            """
-
-            # Fetch the data for the parlay counts
-            parlay_data = get_data_from_db(parlay_count_query, [event_type_option])
-
-            # Display the data if available
-            if parlay_data is None:
-                st.error("Failed to fetch parlay data from the database.")
-            else:
-                parlay_df = pd.DataFrame(parlay_data)
-
-                if parlay_df.empty:
-                    st.warning("No parlay data found for the selected EventType.")
-                else:
-                    # Plot the parlay count bar chart
-                    st.subheader(f"Number of Parlays by Participant for {event_type_option}")
-                    fig, ax = plt.subplots(figsize=(14, 8))
-                    
-                    # Plot bar chart for NumberOfParlays
-                    bars = ax.bar(parlay_df['ParticipantName'], parlay_df['NumberOfParlays'], color='skyblue', edgecolor='black')
-                    
-                    # Set title and labels
-                    ax.set_title(f"Parlay Involvement by Participant for {event_type_option} (GAII)", fontsize=18, fontweight='bold')
-                    ax.set_ylabel("Number of Parlays", fontsize=14, fontweight='bold')
-                    
-                    # Rotate x-axis labels
-                    plt.xticks(rotation=45, ha='right', fontsize=12, fontweight='bold')
-                    
-                    # Annotate each bar with the count of parlays
-                    for bar in bars:
-                        height = bar.get_height()
-                        ax.annotate(f"{height}", xy=(bar.get_x() + bar.get_width() / 2, height),
-                                    xytext=(0, 5), textcoords="offset points",
-                                    ha='center', va='bottom', fontsize=12, color='black')
-
-                    # Add horizontal line at y=0
-                    ax.axhline(0, color='black', linewidth=0.8)
-
-                    # Set background color to white
-                    ax.set_facecolor('white')
-
-                    # Add border around the plot
-                    for spine in ax.spines.values():
-                        spine.set_edgecolor('black')
-                        spine.set_linewidth(1.2)
-
-                    # Adjust layout
-                    plt.tight_layout()
-
-                    # Display the plot in Streamlit
-                    st.pyplot(fig)
-
-                    # Additional chart for Total Dollars At Stake associated with Parlays by Participant
-                    # SQL query to fetch the sum of DollarsAtStake for parlays by participant
-                    parlay_dollars_query = f"""
-                    SELECT 
-                        l.ParticipantName,
-                        SUM(b.DollarsAtStake) AS TotalDollarsAtStake
-                    FROM 
-                        bets b
-                    JOIN 
-                        legs l ON b.WagerID = l.WagerID
-                    WHERE 
-                        b.WhichBankroll = 'GreenAleph II'
-                        AND b.WLCA = 'Active'
-                        AND b.LegCount > 1  -- Only count parlays
-                        AND l.LeagueName = 'NCAA Mens Basketball 2026'
-                        AND l.EventType = %s
-                    GROUP BY 
-                        l.ParticipantName
-                    ORDER BY 
-                        TotalDollarsAtStake DESC;
-                    """
-
-                    # Fetch the data for the total dollars at stake in parlays
-                    parlay_dollars_data = get_data_from_db(parlay_dollars_query, [event_type_option])
-
-                    # Display the data if available
-                    if parlay_dollars_data is None:
-                        st.error("Failed to fetch total dollars at stake in parlays data from the database.")
-                    else:
-                        parlay_dollars_df = pd.DataFrame(parlay_dollars_data)
-
-                        if parlay_dollars_df.empty:
-                            st.warning("No parlay dollar data found for the selected EventType.")
-                        else:
-                            # Plot the total dollars at stake bar chart
-                            st.subheader(f"Total Dollars At Stake in Parlays by Participant for {event_type_option}")
-                            fig, ax = plt.subplots(figsize=(14, 8))
-                            
-                            # Plot bar chart for TotalDollarsAtStake
-                            bars = ax.bar(parlay_dollars_df['ParticipantName'], parlay_dollars_df['TotalDollarsAtStake'], color='lightblue', edgecolor='black')
-                            
-                            # Set title and labels
-                            ax.set_title(f"Total Dollars At Stake in Parlays by Participant for {event_type_option} (GAII)", fontsize=18, fontweight='bold')
-                            ax.set_ylabel("Total Dollars At Stake ($)", fontsize=14, fontweight='bold')
-                            
-                            # Rotate x-axis labels
-                            plt.xticks(rotation=45, ha='right', fontsize=12, fontweight='bold')
-                            
-                            # Annotate each bar with the dollar value
-                            for bar in bars:
-                                height = bar.get_height()
-                                ax.annotate(f"${height:,.0f}", xy=(bar.get_x() + bar.get_width() / 2, height),
-                                            xytext=(0, 5), textcoords="offset points",
-                                            ha='center', va='bottom', fontsize=12, color='black')
-
-                            # Add horizontal line at y=0
-                            ax.axhline(0, color='black', linewidth=0.8)
-
-                            # Set background color to white
-                            ax.set_facecolor('white')
-
-                            # Add border around the plot
-                            for spine in ax.spines.values():
-                                spine.set_edgecolor('black')
-                                spine.set_linewidth(1.2)
-
-                            # Adjust layout
-                            plt.tight_layout()
-
-                            # Display the plot in Streamlit
-                            st.pyplot(fig)
-
-
-
-
-
-elif page == "NHL Charts":
-    # NHL Charts
-    st.title('NHL Active Bets - GAII')
-
-    # SQL query to fetch data for the first bar chart
-    first_chart_query = """
-    WITH DistinctBets AS (
-        SELECT DISTINCT WagerID, DollarsAtStake
-        FROM bets
-        WHERE WhichBankroll = 'GreenAleph II'
-          AND WLCA = 'Active'
-    ),
-    EventTypeSums AS (
-        SELECT 
-            l.EventType,
-            ROUND(SUM(db.DollarsAtStake), 0) AS TotalDollarsAtStake
-        FROM 
-            DistinctBets db
-        JOIN 
-            (SELECT DISTINCT WagerID, EventType, LeagueName FROM legs) l ON db.WagerID = l.WagerID
-        WHERE
-            l.LeagueName = 'NHL'
-        GROUP BY 
-            l.EventType
-    )
-    SELECT * FROM EventTypeSums
-
-    UNION ALL
-
-    SELECT 
-        'Total' AS EventType,
-        ROUND(SUM(db.DollarsAtStake), 0) AS TotalDollarsAtStake
-    FROM 
-        DistinctBets db
-    JOIN 
-        (SELECT DISTINCT WagerID, LeagueName FROM legs) l ON db.WagerID = l.WagerID
-    WHERE
-        l.LeagueName = 'NHL';
-    """
-
-    # Fetch the data for the first bar chart
-    first_chart_data = get_data_from_db(first_chart_query)
-
-    # Check if data is fetched successfully
-    if first_chart_data is None:
-        st.error("Failed to fetch data from the database.")
-    else:
-        # Create a DataFrame from the fetched data
-        first_chart_df = pd.DataFrame(first_chart_data)
-
-        # Display the fetched data
-        first_chart_df['TotalDollarsAtStake'] = first_chart_df['TotalDollarsAtStake'].astype(float).round(0)
-
-        # Sort the DataFrame by 'TotalDollarsAtStake' in ascending order
-        first_chart_df = first_chart_df.sort_values('TotalDollarsAtStake', ascending=True)
-
-        # Define pastel colors for the first chart
-        pastel_colors = ['#a0d8f1', '#f4a261', '#e76f51', '#8ecae6', '#219ebc', '#023047', '#ffb703', '#fb8500', '#d4a5a5', '#9ab0a8']
-
-        # Plot the first bar chart
-        fig, ax = plt.subplots(figsize=(15, 10))
-        bars = ax.bar(first_chart_df['EventType'], first_chart_df['TotalDollarsAtStake'], color=[pastel_colors[i % len(pastel_colors)] for i in range(len(first_chart_df['EventType']))], width=0.6, edgecolor='black')
-
-        # Add labels and title
-        ax.set_title('Active Principal by EventType (GAII)', fontsize=18, fontweight='bold')
-        ax.set_ylabel('Total Dollars At Stake ($)', fontsize=14, fontweight='bold')
-
-        # Annotate each bar with the value (no dollar sign)
-        for bar in bars:
-            height = bar.get_height()
-            ax.annotate(f'{height:,.0f}', xy=(bar.get_x() + bar.get_width() / 2, height),
-                        xytext=(0, 3), textcoords="offset points",
-                        ha='center', va='bottom', fontsize=14, fontweight='bold', color='black')
-
-        # Rotate the x-axis labels to 45 degrees
-        plt.xticks(rotation=45, ha='right', fontsize=14, fontweight='bold')
-
-        # Add horizontal line at y=0 for reference
-        ax.axhline(0, color='black', linewidth=0.8)
-
-        # Set background color to white
-        ax.set_facecolor('white')
-
-        # Add border around the plot
-        for spine in ax.spines.values():
-            spine.set_edgecolor('black')
-            spine.set_linewidth(1.2)
-
-        # Adjust layout
-        plt.tight_layout()
-
-        # Use Streamlit to display the first chart
-        st.pyplot(fig)
-
-        # Filter for EventType, sorted in alphabetical order
-        event_type_option = st.selectbox('Select EventType', sorted(first_chart_df[first_chart_df['EventType'] != 'Total']['EventType'].unique()))
-
-        if event_type_option:
-            # SQL query to fetch data for the EventLabel dropdown, sorted alphabetically
-            event_label_query = f"""
-            SELECT DISTINCT l.EventLabel
-            FROM 
-                bets b
-            JOIN 
-                legs l ON b.WagerID = l.WagerID
-            WHERE
-                l.LeagueName = 'NHL'
-                AND l.EventType = '{event_type_option}'
-                AND b.WhichBankroll = 'GreenAleph II'
-                AND b.WLCA = 'Active'
-                ;
-            """
-
-            # Fetch the EventLabel data
-            event_label_data = get_data_from_db(event_label_query)
-
-            if event_label_data is None:
-                st.error("Failed to fetch data from the database.")
-            else:
-                event_labels = [row['EventLabel'] for row in event_label_data]
-                event_label_option = st.selectbox('Select EventLabel', sorted(event_labels))
-
-                if event_label_option:
-                    # SQL query to fetch data for the combined bar chart (DollarsAtStake and PotentialPayout)
-                    combined_query = f"""
-                    WITH DistinctBets AS (
-                        SELECT DISTINCT WagerID, DollarsAtStake, PotentialPayout
-                        FROM bets
-                        WHERE WhichBankroll = 'GreenAleph II'
-                          AND WLCA = 'Active'
-                          AND LegCount = 1
-                    )
-                    SELECT 
-                        l.ParticipantName,
-                        SUM(db.DollarsAtStake) AS TotalDollarsAtStake,
-                        SUM(db.PotentialPayout) AS TotalPotentialPayout
-                    FROM 
-                        DistinctBets db
-                    JOIN 
-                        legs l ON db.WagerID = l.WagerID
-                    WHERE
-                        l.LeagueName = 'NHL'
-                        AND l.EventType = '{event_type_option}'
-                        AND l.EventLabel = '{event_label_option}'
-                    GROUP BY 
-                        l.ParticipantName;
-                    """
-                
-                    # Fetch the combined data
-                    combined_data = get_data_from_db(combined_query)
-                    
-                    # Check if data is fetched successfully
-                    if combined_data is None:
-                        st.error("Failed to fetch data from the database.")
-                    else:
-                        # Create a DataFrame from the fetched data
-                        combined_df = pd.DataFrame(combined_data)
-                    
-                        # Calculate Implied Probability
-                        combined_df['ImpliedProbability'] = (combined_df['TotalDollarsAtStake'] / combined_df['TotalPotentialPayout']) * 100
-                    
-                        # Modify TotalDollarsAtStake for the chart (to show negative values)
-                        combined_df['TotalDollarsAtStake'] = -combined_df['TotalDollarsAtStake'].astype(float).round(0)
-                        combined_df['TotalPotentialPayout'] = combined_df['TotalPotentialPayout'].astype(float).round(0)
-                    
-                        # Sort the DataFrame by 'TotalDollarsAtStake' in ascending order
-                        combined_df = combined_df.sort_values('TotalDollarsAtStake', ascending=True)
-                    
-                        # Define colors for DollarsAtStake and PotentialPayout
-                        color_dollars_at_stake = 'lightblue'  # Light blue for DollarsAtStake
-                        color_potential_payout = 'beige'  # Beige for PotentialPayout
-                    
-                        # Plot the combined bar chart
-                        fig, ax = plt.subplots(figsize=(18, 12))
-                    
-                        # Plot TotalDollarsAtStake moving downward from the x-axis
-                        bars1 = ax.bar(combined_df['ParticipantName'], combined_df['TotalDollarsAtStake'], 
-                                       color=color_dollars_at_stake, width=0.4, edgecolor='black')
-                    
-                        # Plot TotalPotentialPayout moving upward from the x-axis
-                        bars2 = ax.bar(combined_df['ParticipantName'], combined_df['TotalPotentialPayout'], 
-                                       color=color_potential_payout, width=0.4, edgecolor='black')
-                    
-                        # Add labels and title
-                        ax.set_ylabel('USD ($) in MM', fontsize=16, fontweight='bold')
-                        ax.set_title(f'Active Principal & Potential Payout (Straight Bets Only)', fontsize=18, fontweight='bold')
-                    
-                        # Annotate Implied Probability on TotalDollarsAtStake bars
-                        for i, bar1 in enumerate(bars1):
-                            implied_prob = combined_df.iloc[i]['ImpliedProbability']
-                            height = bar1.get_height()
-                            ax.annotate(f'{implied_prob:.1f}%', xy=(bar1.get_x() + bar1.get_width() / 2, height),
-                                        xytext=(0, -15),  # Move the labels further down below the bars
-                                        textcoords="offset points",
-                                        ha='center', va='bottom', fontsize=12, fontweight='bold', color='black')
-                    
-                        # Annotate TotalPotentialPayout above bars
-                        for bar2 in bars2:
-                            height2 = bar2.get_height()
-                            ax.annotate(f'{height2:,.0f}', xy=(bar2.get_x() + bar2.get_width() / 2, height2),
-                                        xytext=(0, 3), textcoords="offset points",
-                                        ha='center', va='bottom', fontsize=12, fontweight='bold', color='black', rotation = 45)
-                    
-                        # Rotate x-axis labels to 45 degrees
-                        plt.xticks(rotation=45, ha='right', fontsize=14, fontweight='bold')
-                    
-                        # Add legend
-                        ax.legend([bars2, bars1], ['Potential Payout', 'Implied Probability (%)'])
-                    
-                        # Add horizontal line at y=0 for reference
-                        ax.axhline(0, color='black', linewidth=0.8)
-                    
-                        # Set background color to white
-                        ax.set_facecolor('white')
-                    
-                        # Add border around the plot
-                        for spine in ax.spines.values():
-                            spine.set_edgecolor('black')
-                            spine.set_linewidth(1.2)
-                    
-                        # Extend y-axis range
-                        ax.set_ylim(min(combined_df['TotalDollarsAtStake']) - 35000, max(combined_df['TotalPotentialPayout']) + 80000)
-                    
-                        # Adjust layout
-                        plt.tight_layout()
-                    
-                        # Use Streamlit to display the combined chart
-                        st.pyplot(fig)
-
-
-            # Add a new section at the bottom for tracking the number of parlays by participant
-            st.header("NHL Parlays - GAII")
-
-            # SQL query to count the number of parlays each participant is involved in for the selected EventType
-            parlay_count_query = f"""
-            SELECT 
-                l.ParticipantName,
-                COUNT(DISTINCT b.WagerID) AS NumberOfParlays
-            FROM 
-                bets b
-            JOIN 
-                legs l ON b.WagerID = l.WagerID
-            WHERE 
-                b.WhichBankroll = 'GreenAleph II'
-                AND b.WLCA = 'Active'
-                AND b.LegCount > 1  -- Only count parlays
-                AND l.LeagueName = 'NHL'
-                AND l.EventType = %s
-            GROUP BY 
-                l.ParticipantName
-            ORDER BY 
-                NumberOfParlays DESC;
-            """
-
-            # Fetch the data for the parlay counts
-            parlay_data = get_data_from_db(parlay_count_query, [event_type_option])
-
-            # Display the data if available
-            if parlay_data is None:
-                st.error("Failed to fetch parlay data from the database.")
-            else:
-                parlay_df = pd.DataFrame(parlay_data)
-
-                if parlay_df.empty:
-                    st.warning("No parlay data found for the selected EventType.")
-                else:
-                    # Plot the parlay count bar chart
-                    st.subheader(f"Number of Parlays by Participant for {event_type_option}")
-                    fig, ax = plt.subplots(figsize=(14, 8))
-                    
-                    # Plot bar chart for NumberOfParlays
-                    bars = ax.bar(parlay_df['ParticipantName'], parlay_df['NumberOfParlays'], color='skyblue', edgecolor='black')
-                    
-                    # Set title and labels
-                    ax.set_title(f"Parlay Involvement by Participant for {event_type_option} (GAII)", fontsize=18, fontweight='bold')
-                    ax.set_ylabel("Number of Parlays", fontsize=14, fontweight='bold')
-                    
-                    # Rotate x-axis labels
-                    plt.xticks(rotation=45, ha='right', fontsize=12, fontweight='bold')
-                    
-                    # Annotate each bar with the count of parlays
-                    for bar in bars:
-                        height = bar.get_height()
-                        ax.annotate(f"{height}", xy=(bar.get_x() + bar.get_width() / 2, height),
-                                    xytext=(0, 5), textcoords="offset points",
-                                    ha='center', va='bottom', fontsize=12, color='black')
-
-                    # Add horizontal line at y=0
-                    ax.axhline(0, color='black', linewidth=0.8)
-
-                    # Set background color to white
-                    ax.set_facecolor('white')
-
-                    # Add border around the plot
-                    for spine in ax.spines.values():
-                        spine.set_edgecolor('black')
-                        spine.set_linewidth(1.2)
-
-                    # Adjust layout
-                    plt.tight_layout()
-
-                    # Display the plot in Streamlit
-                    st.pyplot(fig)
-
-                    # Additional chart for Total Dollars At Stake associated with Parlays by Participant
-                    # SQL query to fetch the sum of DollarsAtStake for parlays by participant
-                    parlay_dollars_query = f"""
-                    SELECT 
-                        l.ParticipantName,
-                        SUM(b.DollarsAtStake) AS TotalDollarsAtStake
-                    FROM 
-                        bets b
-                    JOIN 
-                        legs l ON b.WagerID = l.WagerID
-                    WHERE 
-                        b.WhichBankroll = 'GreenAleph II'
-                        AND b.WLCA = 'Active'
-                        AND b.LegCount > 1  -- Only count parlays
-                        AND l.LeagueName = 'NHL'
-                        AND l.EventType = %s
-                    GROUP BY 
-                        l.ParticipantName
-                    ORDER BY 
-                        TotalDollarsAtStake DESC;
-                    """
-
-                    # Fetch the data for the total dollars at stake in parlays
-                    parlay_dollars_data = get_data_from_db(parlay_dollars_query, [event_type_option])
-
-                    # Display the data if available
-                    if parlay_dollars_data is None:
-                        st.error("Failed to fetch total dollars at stake in parlays data from the database.")
-                    else:
-                        parlay_dollars_df = pd.DataFrame(parlay_dollars_data)
-
-                        if parlay_dollars_df.empty:
-                            st.warning("No parlay dollar data found for the selected EventType.")
-                        else:
-                            # Plot the total dollars at stake bar chart
-                            st.subheader(f"Total Dollars At Stake in Parlays by Participant for {event_type_option}")
-                            fig, ax = plt.subplots(figsize=(14, 8))
-                            
-                            # Plot bar chart for TotalDollarsAtStake
-                            bars = ax.bar(parlay_dollars_df['ParticipantName'], parlay_dollars_df['TotalDollarsAtStake'], color='lightblue', edgecolor='black')
-                            
-                            # Set title and labels
-                            ax.set_title(f"Total Dollars At Stake in Parlays by Participant for {event_type_option} (GAII)", fontsize=18, fontweight='bold')
-                            ax.set_ylabel("Total Dollars At Stake ($)", fontsize=14, fontweight='bold')
-                            
-                            # Rotate x-axis labels
-                            plt.xticks(rotation=45, ha='right', fontsize=12, fontweight='bold')
-                            
-                            # Annotate each bar with the dollar value
-                            for bar in bars:
-                                height = bar.get_height()
-                                ax.annotate(f"${height:,.0f}", xy=(bar.get_x() + bar.get_width() / 2, height),
-                                            xytext=(0, 5), textcoords="offset points",
-                                            ha='center', va='bottom', fontsize=12, color='black')
-
-                            # Add horizontal line at y=0
-                            ax.axhline(0, color='black', linewidth=0.8)
-
-                            # Set background color to white
-                            ax.set_facecolor('white')
-
-                            # Add border around the plot
-                            for spine in ax.spines.values():
-                                spine.set_edgecolor('black')
-                                spine.set_linewidth(1.2)
-
-                            # Adjust layout
-                            plt.tight_layout()
-
-                            # Display the plot in Streamlit
-                            st.pyplot(fig)
+    # Ensure the DataFrame is not empty
+    if not monthly_profit_df.empty:
+        # Convert Month column to datetime and set as index
+        monthly_profit_df['Month'] = pd.to_datetime(monthly_profit_df['Month'])
+        monthly_profit_df.set_index('Month', inplace=True)
+        monthly_profit_df.sort_index(inplace=True)
 
+        # Calculate cumulative sum for the TotalNetProfit column
+        monthly_profit_df['CumulativeNetProfit'] = monthly_profit_df['TotalNetProfit'].cumsum()
 
+        # Determine y-axis limits with a buffer around min and max values
+        y_min = monthly_profit_df['CumulativeNetProfit'].min() - 6000
+        y_max = monthly_profit_df['CumulativeNetProfit'].max() + 6000
 
+        # Plot the Cumulative Realized Profit by Month line graph
+        #st.subheader("Cumulative Realized Profit by Month for 'GreenAleph II'")
+        fig, ax = plt.subplots(figsize=(14, 8))
 
+        # Separate data for segments above and below zero
+        months = monthly_profit_df.index.strftime('%Y-%m')
+        cumulative_profits = monthly_profit_df['CumulativeNetProfit']
 
+        # Plot segments of the line with color based on whether cumulative profit is above or below zero
+        for i in range(1, len(cumulative_profits)):
+            color = 'green' if cumulative_profits[i] >= 0 else 'red'
+            ax.plot(months[i-1:i+1], cumulative_profits[i-1:i+1], color=color, linewidth=3)
 
+        # Enhancing the plot aesthetics
+        ax.set_ylabel('Cumulative Realized Profit ($)', fontsize=16, fontweight='bold')
+        ax.set_title('Cumulative Realized Profit by Month', fontsize=20, fontweight='bold')
+        ax.axhline(0, color='black', linewidth=1)  # Add horizontal line at y=0
+        ax.set_ylim(y_min, y_max)  # Set y-axis limits
 
+        # Set x-axis labels with rotation and larger font size
+        plt.xticks(rotation=45, ha='right', fontsize=14, fontweight='bold')
+        plt.yticks(fontsize=14, fontweight='bold')
 
+        # Add only the final value label on the right side
+        final_month = months[-1]
+        final_profit = cumulative_profits.iloc[-1]
+        ax.annotate(f"${final_profit:,.0f}", xy=(final_month, final_profit),
+                    xytext=(0, 8), textcoords="offset points",
+                    ha='center', fontsize=14, fontweight='bold', color='black')
 
+        plt.tight_layout()
+        st.pyplot(fig)
+    else:
+        st.warning("No data available for monthly cumulative realized profit.")
 
 
 
 
-elif page == "NFL Charts":
-    # NFL Charts
-    st.title('NFL 2026 Active Bets - GAII')
 
-    # SQL query to fetch data for the first bar chart
-    first_chart_query = """
-    WITH DistinctBets AS (
-        SELECT DISTINCT WagerID, DollarsAtStake
-        FROM bets
-        WHERE WhichBankroll = 'GreenAleph II'
-          AND WLCA = 'Active'
-    ),
-    EventTypeSums AS (
-        SELECT 
-            l.EventType,
-            ROUND(SUM(db.DollarsAtStake), 0) AS TotalDollarsAtStake
-        FROM 
-            DistinctBets db
-        JOIN 
-            (SELECT DISTINCT WagerID, EventType, LeagueName FROM legs) l ON db.WagerID = l.WagerID
-        WHERE
-            l.LeagueName = 'NFL 2026'
-        GROUP BY 
-            l.EventType
-    )
-    SELECT * FROM EventTypeSums
 
-    UNION ALL
 
-    SELECT 
-        'Total' AS EventType,
-        ROUND(SUM(db.DollarsAtStake), 0) AS TotalDollarsAtStake
-    FROM 
-        DistinctBets db
-    JOIN 
-        (SELECT DISTINCT WagerID, LeagueName FROM legs) l ON db.WagerID = l.WagerID
-    WHERE
-        l.LeagueName = 'NFL 2026';
-    """
 
-    # Fetch the data for the first bar chart
-    first_chart_data = get_data_from_db(first_chart_query)
 
-    # Check if data is fetched successfully
-    if first_chart_data is None:
-        st.error("Failed to fetch data from the database.")
-    else:
-        # Create a DataFrame from the fetched data
-        first_chart_df = pd.DataFrame(first_chart_data)
 
-        # Display the fetched data
-        first_chart_df['TotalDollarsAtStake'] = first_chart_df['TotalDollarsAtStake'].astype(float).round(0)
+if page == "Principal Volume":
+    st.title("Principal Volume (GAII)")
 
-        # Sort the DataFrame by 'TotalDollarsAtStake' in ascending order
-        first_chart_df = first_chart_df.sort_values('TotalDollarsAtStake', ascending=True)
+    # Define custom color mapping
+    league_colors = {
+        'ATP': 'green',
+        'WTA': 'yellow',
+        'NBA': 'darkorange',
+        'NCAA Men\'s Basketball': 'lightcoral',  # Light orange
+        'Olympics': 'black',
+        'NFL 2026': 'purple',
+        'MLB 2025': 'gray'
+    }
+    
 
-        # Define pastel colors for the first chart
-        pastel_colors = ['#a0d8f1', '#f4a261', '#e76f51', '#8ecae6', '#219ebc', '#023047', '#ffb703', '#fb8500', '#d4a5a5', '#9ab0a8']
+    # Month, week, day and league views are all grouped from the daily rollup
+    rollup = get_volume_rollup()
+    df_monthly = rollup.principal_volume('GreenAleph II', "Month")
+    df_weekly = rollup.principal_volume('GreenAleph II', "WeekStart")
+    df_daily = rollup.principal_volume('GreenAleph II', "Day")
+    df_league = rollup.principal_volume('GreenAleph II', "League")
 
-        # Plot the first bar chart
-        fig, ax = plt.subplots(figsize=(15, 10))
-        bars = ax.bar(first_chart_df['EventType'], first_chart_df['TotalDollarsAtStake'], color=[pastel_colors[i % len(pastel_colors)] for i in range(len(first_chart_df['EventType']))], width=0.6, edgecolor='black')
+    # Helper function to ensure data is numeric
+    def ensure_numeric(df, column_list):
+        for column in column_list:
+            df[column] = pd.to_numeric(df[column], errors='coerce').fillna(0)
+        return df
 
-        # Add labels and title
-        ax.set_title('Active Principal by EventType (GAII)', fontsize=18, fontweight='bold')
-        ax.set_ylabel('Total Dollars At Stake ($)', fontsize=14, fontweight='bold')
+    # Helper function to assign colors
+    def assign_colors(columns):
+        return [league_colors.get(col, 'blue') for col in columns]
 
-        # Annotate each bar with the value (no dollar sign)
-        for bar in bars:
-            height = bar.get_height()
-            ax.annotate(f'{height:,.0f}', xy=(bar.get_x() + bar.get_width() / 2, height),
-                        xytext=(0, 3), textcoords="offset points",
-                        ha='center', va='bottom', fontsize=14, fontweight='bold', color='black')
+    # Monthly plot
+    if not df_monthly.empty:
+        df_monthly = ensure_numeric(df_monthly, ['TotalDollarsAtStake'])
+        df_pivot_monthly = df_monthly.pivot_table(
+            index='Month',
+            columns='LeagueName',
+            values='TotalDollarsAtStake',
+            aggfunc='sum'
+        ).fillna(0)
+
+        df_pivot_monthly.index = pd.to_datetime(df_pivot_monthly.index, format='%Y-%m', errors='coerce')
+        df_pivot_monthly.sort_index(inplace=True)
+
+        st.subheader("Principal Volume by Month")
+        plt.figure(figsize=(12, 6))
+        ax = df_pivot_monthly.plot(
+            kind='bar', 
+            stacked=True, 
+            figsize=(12, 6), 
+            color=assign_colors(df_pivot_monthly.columns)
+        )
 
-        # Rotate the x-axis labels to 45 degrees
-        plt.xticks(rotation=45, ha='right', fontsize=14, fontweight='bold')
+        plt.ylabel('Total Principal ($)')
+        plt.title('Principal Volume by Month')
+        plt.xticks(ticks=range(len(df_pivot_monthly.index)), labels=df_pivot_monthly.index.strftime('%Y-%m'), rotation=45, ha='right')
+        plt.legend(title='LeagueName', bbox_to_anchor=(1.05, 1), loc='upper left')
+        plt.tight_layout()
+        st.pyplot(plt)
+    else:
+        st.warning("No data available for 'GreenAleph II' principal volume by month.")
 
-        # Add horizontal line at y=0 for reference
-        ax.axhline(0, color='black', linewidth=0.8)
+    # Weekly plot
+    if not df_weekly.empty:
+        df_weekly = ensure_numeric(df_weekly, ['TotalDollarsAtStake'])
+        df_pivot_weekly = df_weekly.pivot_table(
+            index='WeekStart',
+            columns='LeagueName',
+            values='TotalDollarsAtStake',
+            aggfunc='sum'
+        ).fillna(0)
+
+        # Ensure the index is datetime and sort
+        df_pivot_weekly.index = pd.to_datetime(df_pivot_weekly.index, errors='coerce').strftime('%Y-%m')
+        df_pivot_weekly.sort_index(inplace=True)
+
+        st.subheader("Principal Volume by Week")
+        plt.figure(figsize=(12, 6))
+        ax = df_pivot_weekly.plot(
+            kind='bar',
+            stacked=True,
+            figsize=(12, 6),
+            color=assign_colors(df_pivot_weekly.columns)
+        )
 
-        # Set background color to white
-        ax.set_facecolor('white')
+        plt.ylabel('Total Principal ($)')
+        plt.title('Total Principal Volume by Week (Stacked by LeagueName)')
+        plt.xticks(
+            ticks=range(len(df_pivot_weekly.index)),
+            labels=df_pivot_weekly.index,
+            rotation=45,
+            ha='right'
+        )
+        plt.legend(title='LeagueName', bbox_to_anchor=(1.05, 1), loc='upper left')
+        plt.tight_layout()
+        st.pyplot(plt)
+    else:
+        st.warning("No data available for 'GreenAleph II' principal volume by week.")
 
-        # Add border around the plot
-        for spine in ax.spines.values():
-            spine.set_edgecolor('black')
-            spine.set_linewidth(1.2)
 
-        # Adjust layout
+    # Daily plot
+    if not df_daily.empty:
+        df_daily = ensure_numeric(df_daily, ['TotalDollarsAtStake'])
+        df_pivot_daily = df_daily.pivot_table(
+            index='Day',
+            columns='LeagueName',
+            values='TotalDollarsAtStake',
+            aggfunc='sum'
+        ).fillna(0)
+
+        df_pivot_daily.index = pd.to_datetime(df_pivot_daily.index, format='%Y-%m-%d', errors='coerce')
+        df_pivot_daily.sort_index(inplace=True)
+
+        st.subheader("Total Principal Volume by Day (Stacked by LeagueName)")
+        plt.figure(figsize=(12, 6))
+        ax = df_pivot_daily.plot(
+            kind='bar', 
+            stacked=True, 
+            figsize=(12, 6), 
+            color=assign_colors(df_pivot_daily.columns)
+        )
+
+        plt.ylabel('Total Principal ($)')
+        plt.title('Total Principal Volume by Day (Stacked by LeagueName)')
+        monthly_labels = [label if i % 30 == 0 else '' for i, label in enumerate(df_pivot_daily.index.strftime('%Y-%m-%d'))]
+        plt.xticks(ticks=range(len(df_pivot_daily.index)), labels=monthly_labels, rotation=45, ha='right')
+        plt.legend(title='LeagueName', bbox_to_anchor=(1.05, 1), loc='upper left')
         plt.tight_layout()
+        st.pyplot(plt)
+    else:
+        st.warning("No data available for 'GreenAleph II' principal volume by day.")
 
-        # Use Streamlit to display the first chart
-        st.pyplot(fig)
+    # Principal Volume by League plot
+    if not df_league.empty:
+        # Ensure the data is numeric and sort in ascending order
+        df_league = ensure_numeric(df_league, ['TotalDollarsAtStake'])
+        df_league = df_league.sort_values(by='TotalDollarsAtStake', ascending=True)
 
-    # Fetch all unique EventType values from the database
-    all_event_types_query = """
-    SELECT DISTINCT EventType
-    FROM legs
-    WHERE LeagueName = 'NFL 2026';
-    """
-    all_event_types_data = get_data_from_db(all_event_types_query)
+        st.subheader("Principal Volume by League")
+        plt.figure(figsize=(12, 6))
+        bar_colors = [league_colors.get(league, 'blue') for league in df_league['LeagueName']]
+        plt.bar(df_league['LeagueName'], df_league['TotalDollarsAtStake'], color=bar_colors, edgecolor='black')
 
-    if all_event_types_data is None:
-        st.error("Failed to fetch EventType data from the database.")
+        plt.ylabel('Total Principal ($)')
+        plt.title('Total Principal Volume by LeagueName')
+        plt.xticks(rotation=45, ha='right')
+
+        st.pyplot(plt)
     else:
-        all_event_types = [row['EventType'] for row in all_event_types_data]
-
-        # Add a filter for WLCA status
-        wlca_filter = st.radio(
-            "Filter by Bet Status",
-            options=["Active", "All"],
-            index=0,  # Default to "Active"
-            help="Choose whether to display Active bets only or include bets with Win, Loss, and Active statuses."
-        )
+        st.warning("No data available for 'GreenAleph II' principal volume by league.")
 
-        # Adjust the WLCA condition based on the filter
-        wlca_condition = (
-            "WLCA = 'Active'" if wlca_filter == "Active" else "WLCA IN ('Win', 'Loss', 'Active')"
-        )
 
-        # Filter for EventType
-        event_type_option = st.selectbox('Select EventType', sorted(all_event_types))
 
-        if event_type_option:
-            # SQL query to calculate breakeven value
-            breakeven_query = f"""
-            SELECT
-                -1 * SUM(CASE WHEN WLCA = 'Cashout' THEN NetProfit ELSE 0 END)
-                + -1 * SUM(CASE WHEN WLCA = 'Loss' THEN NetProfit ELSE 0 END)
-                + SUM(CASE WHEN WLCA = 'Active' THEN DollarsAtStake ELSE 0 END) AS Breakeven
-            FROM bets b
-            JOIN legs l ON b.WagerID = l.WagerID
-            WHERE 
-                b.WhichBankroll = 'GreenAleph II'
-                AND l.LeagueName = 'NFL 2026'
-                AND l.EventType = '{event_type_option}'
-                AND b.LegCount = 1
-            """
-
-            # Fetch breakeven value
-            breakeven_data = get_data_from_db(breakeven_query)
-            breakeven_value = breakeven_data[0]['Breakeven'] if breakeven_data else 0
-
-            # SQL query to fetch data for EventLabel dropdown
-            event_label_query = f"""
-            SELECT DISTINCT l.EventLabel
-            FROM 
-                bets b
-            JOIN 
-                legs l ON b.WagerID = l.WagerID
-            WHERE
-                l.LeagueName = 'NFL 2026'
-                AND l.EventType = '{event_type_option}'
-                AND b.WhichBankroll = 'GreenAleph II'
-                AND {wlca_condition}
-                ;
-            """
-
-            # Fetch EventLabel data
-            event_label_data = get_data_from_db(event_label_query)
-            if event_label_data is None:
-                st.error("Failed to fetch EventLabel data from the database.")
-            else:
-                event_labels = [row['EventLabel'] for row in event_label_data]
-                event_label_option = st.selectbox('Select EventLabel', sorted(event_labels))
-
-                if event_label_option:
-                    # Define the combined query with the adjusted WLCA condition
-                    combined_query = f"""
-                    WITH DistinctBets AS (
-                        SELECT DISTINCT WagerID, DollarsAtStake, PotentialPayout
-                        FROM bets
-                        WHERE WhichBankroll = 'GreenAleph II'
-                          AND {wlca_condition}
-                          AND LegCount = 1
-                    )
-                    SELECT 
-                        l.ParticipantName,
-                        SUM(db.DollarsAtStake) AS TotalDollarsAtStake,
-                        SUM(db.PotentialPayout) AS TotalPotentialPayout
-                    FROM 
-                        DistinctBets db
-                    JOIN 
-                        legs l ON db.WagerID = l.WagerID
-                    WHERE
-                        l.LeagueName = 'NFL 2026'
-                        AND l.EventType = '{event_type_option}'
-                        AND l.EventLabel = '{event_label_option}'
-                    GROUP BY 
-                        l.ParticipantName;
-                    """
-
-                    # Fetch the combined data
-                    combined_data = get_data_from_db(combined_query)
-
-                    # Check if data is fetched successfully
-                    if combined_data is None:
-                        st.error("Failed to fetch data from the database.")
-                    else:
-                        # Create a DataFrame from the fetched data
-                        combined_df = pd.DataFrame(combined_data)
-
-                        # Calculate Implied Probability
-                        combined_df['ImpliedProbability'] = (combined_df['TotalDollarsAtStake'] / combined_df['TotalPotentialPayout']) * 100
-
-                        # Modify TotalDollarsAtStake for the chart (to show negative values)
-                        combined_df['TotalDollarsAtStake'] = -combined_df['TotalDollarsAtStake'].astype(float).round(0)
-                                                # Sort the DataFrame by 'TotalDollarsAtStake' in ascending order
-                        combined_df = combined_df.sort_values('TotalDollarsAtStake', ascending=True)
-
-                        # Define colors for DollarsAtStake and PotentialPayout
-                        color_dollars_at_stake = 'lightblue'  # Light blue for DollarsAtStake
-                        color_potential_payout = 'orange'  # Orange for PotentialPayout
-
-                        # Plot the combined bar chart
-                        fig, ax = plt.subplots(figsize=(18, 12))
-
-                        # Plot TotalDollarsAtStake moving downward from the x-axis
-                        bars1 = ax.bar(combined_df['ParticipantName'], combined_df['TotalDollarsAtStake'],
-                                       color=color_dollars_at_stake, width=0.4, edgecolor='black')
-
-                        # Plot TotalPotentialPayout moving upward from the x-axis
-                        bars2 = ax.bar(combined_df['ParticipantName'], combined_df['TotalPotentialPayout'],
-                                       color=color_potential_payout, width=0.4, edgecolor='black')
-
-                        # Add labels and title
-                        ax.set_ylabel('USD ($)', fontsize=16, fontweight='bold')
-                        ax.set_title(f'Active Principal & Potential Payout (Straight Bets Only) - {wlca_filter}', fontsize=18, fontweight='bold')
-
-                        # Annotate Implied Probability on TotalDollarsAtStake bars
-                        for i, bar1 in enumerate(bars1):
-                            implied_prob = combined_df.iloc[i]['ImpliedProbability']
-                            height = bar1.get_height()
-                            ax.annotate(f'{implied_prob:.1f}%', xy=(bar1.get_x() + bar1.get_width() / 2, height),
-                                        xytext=(0, -15),  # Move the labels further down below the bars
-                                        textcoords="offset points",
-                                        ha='center', va='bottom', fontsize=12, fontweight='bold', color='black')
-
-                        # Annotate TotalPotentialPayout above bars
-                        for bar2 in bars2:
-                            height2 = bar2.get_height()
-                            ax.annotate(f'{height2:,.0f}', xy=(bar2.get_x() + bar2.get_width() / 2, height2),
-                                        xytext=(0, 3), textcoords="offset points",
-                                        ha='center', va='bottom', fontsize=12, fontweight='bold', color='black')
-
-                        # Rotate x-axis labels to 45 degrees
-                        plt.xticks(rotation=45, ha='right', fontsize=14, fontweight='bold')
-
-                        # Add legend
-                        ax.legend([bars2, bars1], ['Potential Payout', 'Implied Probability (%)'])
-
-                        # Add horizontal breakeven line
-                        ax.axhline(breakeven_value, color='blue', linestyle='dashed', linewidth=1.5, label=f'Breakeven: ${breakeven_value:,.0f}')
-                        ax.legend(loc='best', fontsize=18, title_fontsize=18)
-
-                        # Add horizontal line at y=0 for reference
-                        ax.axhline(0, color='black', linewidth=0.8)
-
-                        # Set background color to white
-                        ax.set_facecolor('white')
-
-                        # Add border around the plot
-                        for spine in ax.spines.values():
-                            spine.set_edgecolor('black')
-                            spine.set_linewidth(1.2)
-
-                        # Extend y-axis range
-                        ax.set_ylim(min(combined_df['TotalDollarsAtStake']) - 60000, max(combined_df['TotalPotentialPayout']) + 80000)
-
-                        # Adjust layout
-                        plt.tight_layout()
-
-                        # Use Streamlit to display the combined chart
-                        st.pyplot(fig)
-
-
-    # Add a new section at the bottom for tracking NFL parlays
-    st.header("NFL Parlays - GAII")
-    
-    # SQL query to count the number of parlays each participant is involved in for the selected EventType
-    parlay_count_query = f"""
-    SELECT 
-        l.ParticipantName,
-        COUNT(DISTINCT b.WagerID) AS NumberOfParlays
-    FROM 
-        bets b
-    JOIN 
-        legs l ON b.WagerID = l.WagerID
-    WHERE 
-        b.WhichBankroll = 'GreenAleph II'
-        AND b.WLCA = 'Active'
-        AND b.LegCount > 1  -- Only count parlays
-        AND l.LeagueName = 'NFL 2026'
-        AND l.EventType = %s
-    GROUP BY 
-        l.ParticipantName
-    ORDER BY 
-        NumberOfParlays DESC;
-    """
 
-    # Fetch the data for the parlay counts
-    parlay_data = get_data_from_db(parlay_count_query, [event_type_option])
 
-    # Display the data if available
-    if parlay_data is None:
-        st.error("Failed to fetch parlay data from the database.")
+
+
+
+# Adding the new "Betting Frequency" page
+if page == "Betting Frequency":
+    st.title("Betting Frequency (GAII)")
+
+    # Bets placed per month and per league, from the in-memory portfolio
+    portfolio = get_portfolio()
+    df_frequency = portfolio.bets_by_month()
+
+    # Check if the DataFrame is not empty
+    if not df_frequency.empty:
+        df_frequency['Month'] = pd.to_datetime(df_frequency['Month'])
+        df_frequency.set_index('Month', inplace=True)
+        df_frequency.sort_index(inplace=True)
+
+        # Calculate the total number of bets
+        total_bets = df_frequency['NumberOfBets'].sum()
+        total_row = pd.DataFrame({'NumberOfBets': [total_bets]}, index=['Total'])
+        df_frequency = pd.concat([df_frequency, total_row])
+
+        # Prepare x-axis labels
+        x_labels = [date.strftime('%Y-%m') if isinstance(date, pd.Timestamp) else date for date in df_frequency.index]
+
+        # Plot the first bar chart
+        st.subheader("Number of Bets Placed by Month")
+        plt.figure(figsize=(12, 6))
+        bars = plt.bar(x_labels, df_frequency['NumberOfBets'])
+        plt.ylabel('Number of Bets')
+        plt.title('Number of Bets Placed by Month (GreenAleph II)')
+        plt.xticks(rotation=45, ha='right')
+
+        # Add value labels above each bar
+        for bar in bars:
+            yval = bar.get_height()
+            plt.text(bar.get_x() + bar.get_width()/2, yval, int(yval), ha='center', va='bottom')
+
+        st.pyplot(plt)
     else:
-        parlay_df = pd.DataFrame(parlay_data)
+        st.warning("No data available for 'GreenAleph II' betting frequency.")
 
-        if parlay_df.empty:
-            st.warning("No parlay data found for the selected EventType.")
-        else:
-            # Plot the parlay count bar chart
-            st.subheader(f"Number of Parlays by Participant for {event_type_option}")
-            fig, ax = plt.subplots(figsize=(14, 8))
-            
-            # Plot bar chart for NumberOfParlays
-            bars = ax.bar(parlay_df['ParticipantName'], parlay_df['NumberOfParlays'], color='skyblue', edgecolor='black')
-            
-            # Set title and labels
-            ax.set_title(f"Parlay Involvement by Participant for {event_type_option} (GAII)", fontsize=18, fontweight='bold')
-            ax.set_ylabel("Number of Parlays", fontsize=14, fontweight='bold')
-            
-            # Rotate x-axis labels
-            plt.xticks(rotation=45, ha='right', fontsize=12, fontweight='bold')
-            
-            # Annotate each bar with the count of parlays
-            for bar in bars:
-                height = bar.get_height()
-                ax.annotate(f"{height}", xy=(bar.get_x() + bar.get_width() / 2, height),
-                            xytext=(0, 5), textcoords="offset points",
-                            ha='center', va='bottom', fontsize=12, color='black')
-
-            # Add horizontal line at y=0
-            ax.axhline(0, color='black', linewidth=0.8)
-
-            # Set background color to white
-            ax.set_facecolor('white')
-
-            # Add border around the plot
-            for spine in ax.spines.values():
-                spine.set_edgecolor('black')
-                spine.set_linewidth(1.2)
-
-            # Adjust layout
-            plt.tight_layout()
-
-            # Display the plot in Streamlit
-            st.pyplot(fig)
+    df_league_frequency = portfolio.bets_by_league()
 
-            # Additional chart for Total Dollars At Stake associated with Parlays by Participant
-            parlay_dollars_query = f"""
-            SELECT 
-                l.ParticipantName,
-                SUM(b.DollarsAtStake) AS TotalDollarsAtStake
-            FROM 
-                bets b
-            JOIN 
-                legs l ON b.WagerID = l.WagerID
-            WHERE 
-                b.WhichBankroll = 'GreenAleph II'
-                AND b.WLCA = 'Active'
-                AND b.LegCount > 1  -- Only count parlays
-                AND l.LeagueName = 'NFL 2026'
-                AND l.EventType = %s
-            GROUP BY 
-                l.ParticipantName
-            ORDER BY 
-                TotalDollarsAtStake DESC;
-            """
-
-            # Fetch the data for the total dollars at stake in parlays
-            parlay_dollars_data = get_data_from_db(parlay_dollars_query, [event_type_option])
-
-            # Display the data if available
-            if parlay_dollars_data is None:
-                st.error("Failed to fetch total dollars at stake in parlays data from the database.")
-            else:
-                parlay_dollars_df = pd.DataFrame(parlay_dollars_data)
-
-                if parlay_dollars_df.empty:
-                    st.warning("No parlay dollar data found for the selected EventType.")
-                else:
-                    # Plot the total dollars at stake bar chart
-                    st.subheader(f"Total Dollars At Stake in Parlays by Participant for {event_type_option}")
-                    fig, ax = plt.subplots(figsize=(14, 8))
-                    
-                    # Plot bar chart for TotalDollarsAtStake
-                    bars = ax.bar(parlay_dollars_df['ParticipantName'], parlay_dollars_df['TotalDollarsAtStake'], color='lightblue', edgecolor='black')
-                    
-                    # Set title and labels
-                    ax.set_title(f"Total Dollars At Stake in Parlays by Participant for {event_type_option} (GAII)", fontsize=18, fontweight='bold')
-                    ax.set_ylabel("Total Dollars At Stake ($)", fontsize=14, fontweight='bold')
-                    
-                    # Rotate x-axis labels
-                    plt.xticks(rotation=45, ha='right', fontsize=12, fontweight='bold')
-                    
-                    # Annotate each bar with the dollar value
-                    for bar in bars:
-                        height = bar.get_height()
-                        ax.annotate(f"${height:,.0f}", xy=(bar.get_x() + bar.get_width() / 2, height),
-                                    xytext=(0, 5), textcoords="offset points",
-                                    ha='center', va='bottom', fontsize=12, color='black')
+    # Ensure correct data types for plotting
+    df_league_frequency['LeagueName'] = df_league_frequency['LeagueName'].astype(str)
+    df_league_frequency['NumberOfBets'] = df_league_frequency['NumberOfBets'].astype(int)
 
-                    # Add horizontal line at y=0
-                    ax.axhline(0, color='black', linewidth=0.8)
+    # Sort by NumberOfBets in ascending order
+    df_league_frequency = df_league_frequency.sort_values(by='NumberOfBets', ascending=True)
 
-                    # Set background color to white
-                    ax.set_facecolor('white')
+    # Check if the DataFrame is not empty
+    if not df_league_frequency.empty:
+        # Plot the second bar chart
+        st.subheader("Betting Frequency by League")
+        plt.figure(figsize=(12, 6))
+        plt.bar(df_league_frequency['LeagueName'], df_league_frequency['NumberOfBets'])
+        plt.ylabel('Number of Bets')
+        plt.title('Number of Bets Placed by League (GreenAleph II)')
+        plt.xticks(rotation=45, ha='right')
 
-                    # Add border around the plot
-                    for spine in ax.spines.values():
-                        spine.set_edgecolor('black')
-                        spine.set_linewidth(1.2)
+        # Add value labels above each bar
+        for index, value in enumerate(df_league_frequency['NumberOfBets']):
+            plt.text(index, value, int(value), ha='center', va='bottom')
 
-                    # Adjust layout
-                    plt.tight_layout()
+        st.pyplot(plt)
+    else:
+        st.warning("No data available for 'GreenAleph II' betting frequency by league.")
 
-                    # Display the plot in Streamlit
-                    st.pyplot(fig)
 
 
 
 
 
 
+elif page in LEAGUE_PAGES:
+    # NBA / NCAAB / NHL / NFL / MLB chart pages, all rendered by one LeaguePage
+    LEAGUE_PAGES[page].render(get_portfolio())
 
 
 
@@ -2103,15 +540,6 @@ elif page == "NFL Charts":
 elif page == "NFL Playoffs EV":
     st.title("NFL Playoffs Expected Values")
 
-    # Establish database connection
-    conn = mysql.connector.connect(
-        host='betting-db.cp86ssaw6cm7.us-east-1.rds.amazonaws.com',
-        user='admin',
-        password='7nRB1i2&A-K>',
-        database='betting_db'
-    )
-    cursor = conn.cursor()
-
     # Query to fetch payouts
     query = """
         SELECT 
@@ -2128,18 +556,14 @@ elif page == "NFL Playoffs EV":
             AND legs.EventType IN ('Conference Winner', 'Championship', 'Quarterfinals')
         GROUP BY legs.ParticipantName, legs.EventType;
     """
-    cursor.execute(query)
+    payout_rows = get_data_from_db(query) or []
 
     # Create payouts dictionary
     payouts = defaultdict(lambda: {'payout_conference': 0, 'payout_championship': 0, 'payout_quarterfinals': 0})
-    for participant_name, event_type, total_payout in cursor.fetchall():
-        normalized_name = participant_name.strip().lower()
-        normalized_event_type = event_type.strip().lower().replace(" ", "_")
-        payouts[normalized_name][f'payout_{normalized_event_type}'] = float(total_payout)
-
-    # Close database connection
-    cursor.close()
-    conn.close()
+    for row in payout_rows:
+        normalized_name = row['ParticipantName'].strip().lower()
+        normalized_event_type = row['EventType'].strip().lower().replace(" ", "_")
+        payouts[normalized_name][f'payout_{normalized_event_type}'] = float(row['total_payout'])
 
     # Define matchups
     matchups = {
@@ -2260,6 +684,7 @@ elif page == "NFL Playoffs EV":
 elif page == "Tennis Charts":
     
     st.title('Tennis Futures and Active Bets - GAII')
+    portfolio = get_portfolio()
 
     # Function to fetch and plot bar charts
     def plot_bar_chart(data, title, ylabel):
@@ -2297,426 +722,108 @@ elif page == "Tennis Charts":
     # Filter for LeagueName
     league_name = st.selectbox('Select League', ['ATP', 'WTA'])
 
-    # SQL query for EventLabel breakdown (Futures)
-    event_label_query = f"""
-    WITH DistinctBets AS (
-        SELECT DISTINCT WagerID, DollarsAtStake
-        FROM bets
-        WHERE WhichBankroll = 'GreenAleph II'
-          AND WLCA = 'Active'
-          AND EXISTS (
-              SELECT 1 
-              FROM legs 
-              WHERE legs.WagerID = bets.WagerID 
-              AND legs.IsFuture = 'Yes'
-          )
-    )
-    SELECT 
-        l.EventLabel,
-        ROUND(SUM(db.DollarsAtStake), 0) AS TotalDollarsAtStake
-    FROM 
-        DistinctBets db
-    JOIN 
-        legs l ON db.WagerID = l.WagerID
-    WHERE
-        l.LeagueName = '{league_name}'
-        AND l.IsFuture = 'Yes'
-    GROUP BY 
-        l.EventLabel;
-    """
-
-    event_label_data = get_data_from_db(event_label_query)
-    if event_label_data is None:
-        st.error("Failed to fetch EventLabel data.")
-    else:
-        plot_bar_chart(event_label_data, f'Active Futures Principal by EventLabel ({league_name})', 'Total Dollars At Stake ($)')
-
-        # Filter for EventLabel
-        event_labels = sorted(set(row['EventLabel'] for row in event_label_data))
-        event_label_option = st.selectbox('Select EventLabel', event_labels)
-
-        if event_label_option:
-            # Filter for EventType
-            event_type_query = f"""
-            SELECT DISTINCT l.EventType
-            FROM 
-                bets b
-            JOIN 
-                legs l ON b.WagerID = l.WagerID
-            WHERE
-                l.LeagueName = '{league_name}'
-                AND l.EventLabel = '{event_label_option}'
-                AND b.WhichBankroll = 'GreenAleph II'
-                AND l.IsFuture = 'Yes'
-                AND b.WLCA = 'Active';
-            """
-            event_type_data = get_data_from_db(event_type_query)
-            if event_type_data is None:
-                st.error("Failed to fetch EventType data.")
-            else:
-                event_types = sorted(set(row['EventType'] for row in event_type_data))
-                event_type_option = st.selectbox('Select EventType', event_types)
-
-                if event_type_option:
-                    # Query for combined chart (DollarsAtStake and PotentialPayout for Active Bets)
-                    combined_query = f"""
-                    WITH DistinctBets AS (
-                        SELECT DISTINCT WagerID, DollarsAtStake, PotentialPayout
-                        FROM bets
-                        WHERE WhichBankroll = 'GreenAleph II'
-                          AND LegCount = 1
-                          AND WLCA = 'Active'
-                    )
-                    SELECT 
-                        l.ParticipantName,
-                        SUM(db.DollarsAtStake) AS TotalDollarsAtStake,
-                        SUM(db.PotentialPayout) AS TotalPotentialPayout
-                    FROM 
-                        DistinctBets db
-                    JOIN 
-                        legs l ON db.WagerID = l.WagerID
-                    WHERE
-                        l.LeagueName = '{league_name}'
-                        AND l.EventLabel = '{event_label_option}'
-                        AND l.EventType = '{event_type_option}'
-                    GROUP BY 
-                        l.ParticipantName;
-                    """
-                
-                    combined_data = get_data_from_db(combined_query)
-                    if combined_data is None:
-                        st.error("Failed to fetch combined data.")
-                    else:
-                        df = pd.DataFrame(combined_data)
-                        if not df.empty:
-                            # Modify to multiply TotalDollarsAtStake by -1 to move it in the negative direction
-                            df['TotalDollarsAtStake'] = -df['TotalDollarsAtStake'].astype(float).round(0)
-                            df['TotalPotentialPayout'] = df['TotalPotentialPayout'].astype(float).round(0)
-                
-                            # Sort values by TotalDollarsAtStake in ascending order
-                            df = df.sort_values('TotalDollarsAtStake', ascending=True)
-                
-                            # Define the colors (lightblue for DollarsAtStake, beige for PotentialPayout)
-                            color_dollars_at_stake = 'lightblue'
-                            color_potential_payout = 'beige'
-                
-                            # Create the plot
-                            fig, ax = plt.subplots(figsize=(18, 12))
-                
-                            # Plot TotalDollarsAtStake as a negative value (below the x-axis)
-                            bars1 = ax.bar(df['ParticipantName'], df['TotalDollarsAtStake'], 
-                                           color=color_dollars_at_stake, width=0.4, edgecolor='black')
-                
-                            # Plot TotalPotentialPayout as a positive value (above the x-axis)
-                            bars2 = ax.bar(df['ParticipantName'], df['TotalPotentialPayout'], 
-                                           color=color_potential_payout, width=0.4, edgecolor='black')
-                
-                            # Add labels and title
-                            ax.set_ylabel('Total Amount ($)', fontsize=20, fontweight='bold', color='black')
-                            ax.set_title(f'Active Futures Principal & Potential Payout by ParticipantName for {event_type_option} - {event_label_option} ({league_name}, Straight Bets Only', fontsize=24, fontweight='bold', color='black')
-                
-                            # Create FontProperties object for bold tick labels
-                            tick_label_font = fm.FontProperties(weight='bold', size=16)
-                
-                            # Increase font size and make tick labels bold; adjust the position of x-axis labels using labelpad
-                            ax.tick_params(axis='x', labelsize=16, labelcolor='black', labelrotation=45, pad=10)
-                            ax.tick_params(axis='y', labelsize=16, labelcolor='black')
-                
-                            # Apply bold font to x and y tick labels
-                            for label in ax.get_xticklabels():
-                                label.set_fontproperties(tick_label_font)
-                            for label in ax.get_yticklabels():
-                                label.set_fontproperties(tick_label_font)
-                
-                            # Annotate each bar for TotalDollarsAtStake (below the bar since it's negative)
-                            for bar1 in bars1:
-                                height = bar1.get_height()
-                                ax.annotate(f'{abs(height):,.0f}', xy=(bar1.get_x() + bar1.get_width() / 2, height),
-                                            xytext=(0, -15),  # Move label down
-                                            textcoords="offset points",
-                                            ha='center', va='bottom', fontsize=14, fontweight='bold', color='black')
-                
-                            # Annotate each bar for TotalPotentialPayout (above the bar)
-                            for bar2 in bars2:
-                                height2 = bar2.get_height()
-                                ax.annotate(f'{height2:,.0f}', 
-                                            xy=(bar2.get_x() + bar2.get_width() / 2, height2),
-                                            xytext=(0, 3), textcoords="offset points",
-                                            ha='center', va='bottom', fontsize=14, fontweight='bold', color='black')
-                
-                            # Add a horizontal line at y=0 for reference
-                            ax.axhline(0, color='black', linewidth=0.8)
-                
-                            # Set the background color to white
-                            ax.set_facecolor('white')
-                
-                            # Add a border around the plot
-                            for spine in ax.spines.values():
-                                spine.set_edgecolor('black')
-                                spine.set_linewidth(1.2)
-                
-                            # Add the legend with the correct order for the bars
-                            ax.legend([bars2, bars1], ['Potential Payout', 'Active Principal'], loc='upper right', fontsize=14)
-                
-                            # Adjust the layout
-                            plt.tight_layout()
-                
-                            # Use Streamlit to display the chart
-                            st.pyplot(fig)
-                        else:
-                            st.error("No data available for the selected filters.")
-
-
-                
-                                
-                                
-                
-                
-                
-                
-                
-elif page == "MLB Charts":
-    # MLB Charts
-    st.title('MLB 2025 Active Bets - GAII')
-
-    # SQL query to fetch data for the main bar chart
-    main_query = """
-    WITH DistinctBets AS (
-        SELECT DISTINCT WagerID, DollarsAtStake
-        FROM bets
-        WHERE WhichBankroll = 'GreenAleph II'
-          AND WLCA = 'Active'
-          AND LegCount = 1
-    ),
-    EventTypeSums AS (
-        SELECT 
-            l.EventType,
-            ROUND(SUM(db.DollarsAtStake), 0) AS TotalDollarsAtStake
-        FROM 
-            DistinctBets db
-        JOIN 
-            (SELECT DISTINCT WagerID, EventType, LeagueName FROM legs) l ON db.WagerID = l.WagerID
-        WHERE
-            l.LeagueName = 'MLB 2025'
-        GROUP BY 
-            l.EventType
-    )
-    SELECT * FROM EventTypeSums
-
-    UNION ALL
-
-    SELECT 
-        'Total' AS EventType,
-        ROUND(SUM(db.DollarsAtStake), 0) AS TotalDollarsAtStake
-    FROM 
-        DistinctBets db
-    JOIN 
-        (SELECT DISTINCT WagerID, LeagueName FROM legs) l ON db.WagerID = l.WagerID
-    WHERE
-        l.LeagueName = 'MLB 2025'
-    """
-
-    # Fetch the data for the main bar chart
-    main_data = get_data_from_db(main_query)
-
-    # Check if data is fetched successfully
-    if main_data is None:
-        st.error("Failed to fetch data from the database.")
-    else:
-        # Create a DataFrame from the fetched data
-        main_df = pd.DataFrame(main_data)
-
-        # Display the fetched data
-       # st.subheader('Total Dollars At Stake by EventType (GAII)')
-        
-        # Create data for visualization
-        main_df['TotalDollarsAtStake'] = main_df['TotalDollarsAtStake'].astype(float).round(0)
-
-        # Sort the DataFrame by 'TotalDollarsAtStake' in ascending order
-        main_df = main_df.sort_values('TotalDollarsAtStake', ascending=True)
-
-        # Define pastel colors for the main chart
-        pastel_colors = ['#a0d8f1', '#f4a261', '#e76f51', '#8ecae6', '#219ebc', '#023047', '#ffb703', '#fb8500', '#d4a5a5', '#9ab0a8']
-
-        # Plot the main bar chart
-        fig, ax = plt.subplots(figsize=(15, 10))
-        bars = ax.bar(main_df['EventType'], main_df['TotalDollarsAtStake'], color=[pastel_colors[i % len(pastel_colors)] for i in range(len(main_df['EventType']))], width=0.6, edgecolor='black')
-
-        # Add labels and title
-        ax.set_title('Total Active Principal by EventType (GAII)', fontsize=18, fontweight='bold')
-        ax.set_ylabel('Total Dollars At Stake ($)', fontsize=14, fontweight='bold')
-
-        # Annotate each bar with the value (no dollar sign)
-        for bar in bars:
-            height = bar.get_height()
-            ax.annotate(f'{height:,.0f}', xy=(bar.get_x() + bar.get_width() / 2, height),
-                        xytext=(0, 3), textcoords="offset points",
-                        ha='center', va='bottom', fontsize=14, fontweight='bold', color='black')
-
-        # Rotate the x-axis labels to 45 degrees
-        plt.xticks(rotation=45, ha='right', fontsize=14, fontweight='bold')
-
-        # Add horizontal line at y=0 for reference
-        ax.axhline(0, color='black', linewidth=0.8)
-
-        # Set background color to white
-        ax.set_facecolor('white')
-
-        # Add border around the plot
-        for spine in ax.spines.values():
-            spine.set_edgecolor('black')
-            spine.set_linewidth(1.2)
-
-        # Adjust layout
-        plt.tight_layout()
+    event_label_df = portfolio.futures_principal_by_event_label(league_name)
+    plot_bar_chart(event_label_df, f'Active Futures Principal by EventLabel ({league_name})', 'Total Dollars At Stake ($)')
 
-        # Use Streamlit to display the chart
-        st.pyplot(fig)
+    # Filter for EventLabel
+    event_labels = sorted(event_label_df['EventLabel'].unique())
+    event_label_option = st.selectbox('Select EventLabel', event_labels)
 
-        # Add filter for EventType, excluding "Total"
-        event_type_option = st.selectbox('Select EventType', sorted(main_df[main_df['EventType'] != 'Total']['EventType'].unique()))
+    if event_label_option:
+        # Filter for EventType
+        event_types = portfolio.futures_event_types(league_name, event_label_option)
+        event_type_option = st.selectbox('Select EventType', event_types)
 
         if event_type_option:
-            # SQL query to fetch data for the EventLabel dropdown
-            event_label_query = f"""
-            SELECT DISTINCT l.EventLabel
-            FROM 
-                bets b
-            JOIN 
-                legs l ON b.WagerID = l.WagerID
-            WHERE
-                l.LeagueName = 'MLB 2025'
-                AND l.EventType = '{event_type_option}'
-                AND b.WhichBankroll = 'GreenAleph II'
-                AND b.WLCA = 'Active';
-            """
-            
-            # Fetch the EventLabel data
-            event_label_data = get_data_from_db(event_label_query)
-
-            if event_label_data is None:
-                st.error("Failed to fetch data from the database.")
+            df = portfolio.straight_positions(league_name, EventLabel=event_label_option,
+                                              EventType=event_type_option)
+            if not df.empty:
+                # Modify to multiply TotalDollarsAtStake by -1 to move it in the negative direction
+                df['TotalDollarsAtStake'] = -df['TotalDollarsAtStake'].astype(float).round(0)
+                df['TotalPotentialPayout'] = df['TotalPotentialPayout'].astype(float).round(0)
+        
+                # Sort values by TotalDollarsAtStake in ascending order
+                df = df.sort_values('TotalDollarsAtStake', ascending=True)
+        
+                # Define the colors (lightblue for DollarsAtStake, beige for PotentialPayout)
+                color_dollars_at_stake = 'lightblue'
+                color_potential_payout = 'beige'
+        
+                # Create the plot
+                fig, ax = plt.subplots(figsize=(18, 12))
+        
+                # Plot TotalDollarsAtStake as a negative value (below the x-axis)
+                bars1 = ax.bar(df['ParticipantName'], df['TotalDollarsAtStake'], 
+                               color=color_dollars_at_stake, width=0.4, edgecolor='black')
+        
+                # Plot TotalPotentialPayout as a positive value (above the x-axis)
+                bars2 = ax.bar(df['ParticipantName'], df['TotalPotentialPayout'], 
+                               color=color_potential_payout, width=0.4, edgecolor='black')
+        
+                # Add labels and title
+                ax.set_ylabel('Total Amount ($)', fontsize=20, fontweight='bold', color='black')
+                ax.set_title(f'Active Futures Principal & Potential Payout by ParticipantName for {event_type_option} - {event_label_option} ({league_name}, Straight Bets Only', fontsize=24, fontweight='bold', color='black')
+        
+                # Create FontProperties object for bold tick labels
+                tick_label_font = fm.FontProperties(weight='bold', size=16)
+        
+                # Increase font size and make tick labels bold; adjust the position of x-axis labels using labelpad
+                ax.tick_params(axis='x', labelsize=16, labelcolor='black', labelrotation=45, pad=10)
+                ax.tick_params(axis='y', labelsize=16, labelcolor='black')
+        
+                # Apply bold font to x and y tick labels
+                for label in ax.get_xticklabels():
+                    label.set_fontproperties(tick_label_font)
+                for label in ax.get_yticklabels():
+                    label.set_fontproperties(tick_label_font)
+        
+                # Annotate each bar for TotalDollarsAtStake (below the bar since it's negative)
+                for bar1 in bars1:
+                    height = bar1.get_height()
+                    ax.annotate(f'{abs(height):,.0f}', xy=(bar1.get_x() + bar1.get_width() / 2, height),
+                                xytext=(0, -15),  # Move label down
+                                textcoords="offset points",
+                                ha='center', va='bottom', fontsize=14, fontweight='bold', color='black')
+        
+                # Annotate each bar for TotalPotentialPayout (above the bar)
+                for bar2 in bars2:
+                    height2 = bar2.get_height()
+                    ax.annotate(f'{height2:,.0f}', 
+                                xy=(bar2.get_x() + bar2.get_width() / 2, height2),
+                                xytext=(0, 3), textcoords="offset points",
+                                ha='center', va='bottom', fontsize=14, fontweight='bold', color='black')
+        
+                # Add a horizontal line at y=0 for reference
+                ax.axhline(0, color='black', linewidth=0.8)
+        
+                # Set the background color to white
+                ax.set_facecolor('white')
+        
+                # Add a border around the plot
+                for spine in ax.spines.values():
+                    spine.set_edgecolor('black')
+                    spine.set_linewidth(1.2)
+        
+                # Add the legend with the correct order for the bars
+                ax.legend([bars2, bars1], ['Potential Payout', 'Active Principal'], loc='upper right', fontsize=14)
+        
+                # Adjust the layout
+                plt.tight_layout()
+        
+                # Use Streamlit to display the chart
+                st.pyplot(fig)
             else:
-                event_labels = [row['EventLabel'] for row in event_label_data]
-                event_label_option = st.selectbox('Select EventLabel', sorted(event_labels))
-
-                if event_label_option:
-                    # SQL query to fetch data for the combined bar chart (DollarsAtStake and PotentialPayout)
-                    combined_query = f"""
-                    WITH DistinctBets AS (
-                        SELECT DISTINCT WagerID, DollarsAtStake, PotentialPayout
-                        FROM bets
-                        WHERE WhichBankroll = 'GreenAleph II'
-                          AND WLCA = 'Active'
-                          AND LegCount = 1
-                    )
-                    SELECT 
-                        l.ParticipantName,
-                        SUM(db.DollarsAtStake) AS TotalDollarsAtStake,
-                        SUM(db.PotentialPayout) AS TotalPotentialPayout
-                    FROM 
-                        DistinctBets db
-                    JOIN 
-                        legs l ON db.WagerID = l.WagerID
-                    WHERE
-                        l.LeagueName = 'MLB 2025'
-                        AND l.EventType = '{event_type_option}'
-                        AND l.EventLabel = '{event_label_option}'
-                    GROUP BY 
-                        l.ParticipantName;
-                    """
-                
-                    # Fetch the combined data
-                    combined_data = get_data_from_db(combined_query)
-                
-                    # Check if data is fetched successfully
-                    if combined_data is None:
-                        st.error("Failed to fetch data from the database.")
-                    else:
-                        # Create a DataFrame from the fetched data
-                        combined_df = pd.DataFrame(combined_data)
-                
-                        # Modify to multiply TotalDollarsAtStake by -1 for the chart (to show negative values)
-                        combined_df['TotalDollarsAtStake'] = -combined_df['TotalDollarsAtStake'].astype(float).round(0)
-                        combined_df['TotalPotentialPayout'] = combined_df['TotalPotentialPayout'].astype(float).round(0)
-                
-                        # Sort the DataFrame by 'TotalDollarsAtStake' in ascending order
-                        combined_df = combined_df.sort_values('TotalDollarsAtStake', ascending=True)
-                
-                        # Define colors for DollarsAtStake and PotentialPayout (same as NFL example)
-                        color_dollars_at_stake = 'lightblue'  # Light blue for DollarsAtStake
-                        color_potential_payout = 'beige'      # Beige for PotentialPayout
-                
-                        # Plot the combined bar chart
-                        fig, ax = plt.subplots(figsize=(18, 12))
-                
-                        # Plot TotalDollarsAtStake moving downward from the x-axis
-                        bars1 = ax.bar(combined_df['ParticipantName'], combined_df['TotalDollarsAtStake'], 
-                                       color=color_dollars_at_stake, width=0.4, edgecolor='black')
-                
-                        # Plot TotalPotentialPayout moving upward from the x-axis
-                        bars2 = ax.bar(combined_df['ParticipantName'], combined_df['TotalPotentialPayout'], 
-                                       color=color_potential_payout, width=0.4, edgecolor='black')
-                
-                        # Add labels and title
-                        ax.set_ylabel('USD ($)', fontsize=16, fontweight='bold')
-                        ax.set_title(f'Total Active Principal & Potential Payout (Straight Bets Only)', fontsize=18, fontweight='bold')
-                
-                        # Annotate each bar with the TotalDollarsAtStake value below the bar
-                        for bar1 in bars1:
-                            height = bar1.get_height()
-                            ax.annotate(f'{abs(height):,.0f}', xy=(bar1.get_x() + bar1.get_width() / 2, height),
-                                        xytext=(0, -15),  # Move the labels further down below the bars
-                                        textcoords="offset points",
-                                        ha='center', va='bottom', fontsize=12, fontweight='bold', color='black')
-                
-                        # Annotate each bar with the TotalPotentialPayout value above the bar
-                        for bar2 in bars2:
-                            height2 = bar2.get_height()
-                            ax.annotate(f'{height2:,.0f}', 
-                                        xy=(bar2.get_x() + bar2.get_width() / 2, height2),
-                                        xytext=(0, 3), textcoords="offset points",
-                                        ha='center', va='bottom', fontsize=12, fontweight='bold', color='black')
-                
-                        # Rotate the x-axis labels to 45 degrees for better readability
-                        plt.xticks(rotation=45, ha='right', fontsize=14, fontweight='bold')
-                
-                        # Add horizontal line at y=0 for reference
-                        ax.axhline(0, color='black', linewidth=0.8)
-                
-                        # Set background color to white
-                        ax.set_facecolor('white')
-                
-                        # Add border around the plot
-                        for spine in ax.spines.values():
-                            spine.set_edgecolor('black')
-                            spine.set_linewidth(1.2)
-                
-                        # Extend y-axis range
-                        ax.set_ylim(min(combined_df['TotalDollarsAtStake']) - 5000, max(combined_df['TotalPotentialPayout']) + 5000)
-                
-                        # Add legend
-                        ax.legend([bars2, bars1], ['Potential Payout', 'Active Principal'])
-                
-                        # Adjust layout
-                        plt.tight_layout()
-                
-                        # Use Streamlit to display the combined chart
-                        st.pyplot(fig)
-                
-
-                   
-                                                            
-
-
-
+                st.error("No data available for the selected filters.")
 
 
-
-
-
-
-                        
+        
+                    
+                    
+        
+        
+        
+        
+        
 elif page == "MLB Principal Tables":
     # MLB Principal Tables
     st.title('MLB 2025 Principal Tables - GAII')
@@ -2825,68 +932,26 @@ elif page == "NBA Participant Positions":
     # NBA Participant Positions
     st.title('NBA Participant Positions - GAII')
 
-    # Fetch the list of participant names for the dropdown
-    participants_query = """
-    SELECT DISTINCT ParticipantName 
-    FROM legs l
-    JOIN bets b ON l.WagerID = b.WagerID
-    WHERE l.LeagueName = 'NBA' AND b.WhichBankroll = 'GreenAleph II'
-    ORDER BY ParticipantName ASC;
-    """
-    participants = get_data_from_db(participants_query)
-
-    if participants is not None:
-        participant_names = [participant['ParticipantName'] for participant in participants]
-        participant_selected = st.selectbox('Select Participant', participant_names)
-
-        if participant_selected:
-            wlca_filter = st.selectbox('Select WLCA', ['All', 'Win', 'Loss', 'Cashout', 'Active'])
-            legcount_filter = st.selectbox('Select Bet Type', ['All', 'Straight', 'Parlay'])
-
-            # SQL query to fetch data for the selected participant
-            query = """
-            SELECT 
-                l.LegID,
-                l.EventType,
-                b.DollarsAtStake,
-                b.PotentialPayout,
-                b.NetProfit,
-                b.ImpliedOdds,
-                l.EventLabel,
-                l.LegDescription,
-                b.Sportsbook,
-                b.DateTimePlaced,
-                b.LegCount
-            FROM 
-                bets b
-            JOIN 
-                legs l ON b.WagerID = l.WagerID
-            WHERE 
-                l.ParticipantName = %s
-                AND b.WhichBankroll = 'GreenAleph II'
-                AND l.LeagueName = 'NBA'
-            """
-            params = [participant_selected]
-
-            if wlca_filter != 'All':
-                query += " AND b.WLCA = %s"
-                params.append(wlca_filter)
-            
-            if legcount_filter == 'Straight':
-                query += " AND b.LegCount = 1"
-            elif legcount_filter == 'Parlay':
-                query += " AND b.LegCount > 1"
-
-            # Fetch the data for the selected participant
-            data = get_data_from_db(query, params)
-
-            # Display the data
-            if data:
-                df = pd.DataFrame(data)
-                st.subheader(f'Bets and Legs for {participant_selected}')
-                st.table(df)
-            else:
-                st.warning('No data found for the selected filters.')
+    portfolio = get_portfolio()
+
+    # Participant names for the dropdown
+    participant_names = portfolio.participants('NBA')
+    participant_selected = st.selectbox('Select Participant', participant_names)
+
+    if participant_selected:
+        wlca_filter = st.selectbox('Select WLCA', ['All', 'Win', 'Loss', 'Cashout', 'Active'])
+        legcount_filter = st.selectbox('Select Bet Type', ['All', 'Straight', 'Parlay'])
+
+        # Bets and legs for the selected participant
+        df = portfolio.participant_positions('NBA', participant_selected,
+                                             wlca_filter, legcount_filter)
+
+        # Display the data
+        if not df.empty:
+            st.subheader(f'Bets and Legs for {participant_selected}')
+            st.table(df)
+        else:
+            st.warning('No data found for the selected filters.')
 
 
 
@@ -2896,68 +961,26 @@ elif page == "NFL Participant Positions":
     # NFL Participant Positions
     st.title('NFL Participant Positions - GAII')
 
-    # Fetch the list of participant names for the dropdown
-    participants_query = """
-    SELECT DISTINCT ParticipantName 
-    FROM legs l
-    JOIN bets b ON l.WagerID = b.WagerID
-    WHERE l.LeagueName = 'NFL' AND b.WhichBankroll = 'GreenAleph II'
-    ORDER BY ParticipantName ASC;
-    """
-    participants = get_data_from_db(participants_query)
-
-    if participants is not None:
-        participant_names = [participant['ParticipantName'] for participant in participants]
-        participant_selected = st.selectbox('Select Participant', participant_names)
-
-        if participant_selected:
-            wlca_filter = st.selectbox('Select WLCA', ['All', 'Win', 'Loss', 'Cashout', 'Active'])
-            legcount_filter = st.selectbox('Select Bet Type', ['All', 'Straight', 'Parlay'])
-
-            # SQL query to fetch data for the selected participant
-            query = """
-            SELECT 
-                l.LegID,
-                l.EventType,
-                b.DollarsAtStake,
-                b.PotentialPayout,
-                b.NetProfit,
-                b.ImpliedOdds,
-                l.EventLabel,
-                l.LegDescription,
-                b.Sportsbook,
-                b.DateTimePlaced,
-                b.LegCount
-            FROM 
-                bets b
-            JOIN 
-                legs l ON b.WagerID = l.WagerID
-            WHERE 
-                l.ParticipantName = %s
-                AND b.WhichBankroll = 'GreenAleph II'
-                AND l.LeagueName = 'NFL'
-            """
-            params = [participant_selected]
-
-            if wlca_filter != 'All':
-                query += " AND b.WLCA = %s"
-                params.append(wlca_filter)
-            
-            if legcount_filter == 'Straight':
-                query += " AND b.LegCount = 1"
-            elif legcount_filter == 'Parlay':
-                query += " AND b.LegCount > 1"
-
-            # Fetch the data for the selected participant
-            data = get_data_from_db(query, params)
-
-            # Display the data
-            if data:
-                df = pd.DataFrame(data)
-                st.subheader(f'Bets and Legs for {participant_selected}')
-                st.table(df)
-            else:
-                st.warning('No data found for the selected filters.')
+    portfolio = get_portfolio()
+
+    # Participant names for the dropdown
+    participant_names = portfolio.participants('NFL')
+    participant_selected = st.selectbox('Select Participant', participant_names)
+
+    if participant_selected:
+        wlca_filter = st.selectbox('Select WLCA', ['All', 'Win', 'Loss', 'Cashout', 'Active'])
+        legcount_filter = st.selectbox('Select Bet Type', ['All', 'Straight', 'Parlay'])
+
+        # Bets and legs for the selected participant
+        df = portfolio.participant_positions('NFL', participant_selected,
+                                             wlca_filter, legcount_filter)
+
+        # Display the data
+        if not df.empty:
+            st.subheader(f'Bets and Legs for {participant_selected}')
+            st.table(df)
+        else:
+            st.warning('No data found for the selected filters.')
 
 
 
@@ -2967,7 +990,54 @@ elif page == "NFL Participant Positions":
 
 
 
+elif page == "Futures Scanner":
+    # Latest run of futures_scanner.py: market overrounds, arbitrages and outlier books
+    st.title('Futures Scanner - Arbitrage & Outlier Books')
 
+    # read straight from the pool: the scan tables change independently of bets/legs
+    try:
+        markets = pd.DataFrame(get_db_pool().query("""
+            SELECT table_name, snapshot_ts, n_teams, overround, arb_margin, n_outliers, scan_ts
+              FROM futures_scan_markets
+             WHERE scan_ts = (SELECT MAX(scan_ts) FROM futures_scan_markets)
+             ORDER BY overround
+        """))
+        flags = pd.DataFrame(get_db_pool().query("""
+            SELECT table_name, team_name, book, kind, american, prob, consensus_prob,
+                   fair_prob, edge, stake_share
+              FROM futures_scan_flags
+             WHERE scan_ts = (SELECT MAX(scan_ts) FROM futures_scan_markets)
+             ORDER BY kind, edge DESC
+        """))
+    except mysql.connector.Error as err:
+        st.info(f"No scan yet - run futures_scanner.py ({err.msg}).")
+        st.stop()
 
+    if markets.empty:
+        st.info("No scan yet - run futures_scanner.py.")
+        st.stop()
 
-
+    arbs = markets[markets['overround'] < 0]
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Markets scanned", len(markets))
+    col2.metric("Arbitrage markets", len(arbs))
+    col3.metric("Outlier quotes", int(markets['n_outliers'].sum()))
+    st.caption(f"Scan at {markets['scan_ts'].iloc[0]} UTC")
+
+    st.subheader('Market Overround (best line per team)')
+    shown = markets.drop(columns='scan_ts').assign(
+        overround=lambda d: (d['overround'].astype(float) * 100).round(2),
+        arb_margin=lambda d: (d['arb_margin'].astype(float) * 100).round(2),
+    ).rename(columns={'overround': 'Overround %', 'arb_margin': 'Arb Margin %'})
+    st.dataframe(shown, use_container_width=True, hide_index=True)
+
+    if flags.empty:
+        st.info("No arbitrage legs or outlier books in the latest scan.")
+    else:
+        kinds = st.multiselect('Flag Kind', ['arbitrage', 'outlier'], default=['arbitrage', 'outlier'])
+        market_filter = st.selectbox('Market', ['All'] + sorted(flags['table_name'].unique().tolist()))
+        view = flags[flags['kind'].isin(kinds)]
+        if market_filter != 'All':
+            view = view[view['table_name'] == market_filter]
+        st.subheader('Flagged Quotes')
+        st.dataframe(view, use_container_width=True, hide_index=True)
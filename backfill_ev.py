@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Backfill ev_history (TOTAL EV) and ev_history_market (EV per market) for every
+day in a date range, with the same rules as update_ev.py's daily snapshot.
+
+    python backfill_ev.py --start 2025-01-01 --end 2025-06-30 [--dry-run]
+
+Instead of calling build_ev_table() once per day, bets/legs are read once, the
+odds come from one as-of index for the whole window, and the timeline is swept
+once: wagers enter the active book on the day they were placed and move to the
+realized book on the day they settled.
+
+betting_db has no settlement timestamp, so it is approximated from futuresdata:
+a leg "settles" at its participant's last snapshot in the market table; a Win
+settles when its last leg does, a Loss/Cashout when its first leg does. Wagers
+without a tracked leg settle on the day they were placed.
+"""
+import argparse
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import sqlalchemy
+
+from allocation import allocate, parlay_prob
+from ev_history import BATCH_SIZE, CREATE_MARKET_HISTORY
+from futures_loader import fetch_tables
+from odds import american_to_decimal, american_to_prob
+from odds_index import _alias_key
+from update_ev import (engine_bet, engine_fut, futures_table_map, load_odds_index,
+                       team_alias_map)
+from wager_store import ACTIVE, SETTLED, WagerStore
+
+VIG        = 0.05    # flat, as in build_ev_table
+LEG_KEY    = ["EventType", "EventLabel", "ParticipantName"]
+MKT_KEY    = ["LeagueName", "EventType", "EventLabel"]
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 1) One read of the betting state
+# ─────────────────────────────────────────────────────────────────────────────
+def load_bets():
+    bets = pd.read_sql("""
+        SELECT WagerID, DateTimePlaced, WLCA, PotentialPayout, DollarsAtStake, NetProfit
+          FROM bets
+         WHERE WhichBankroll='GreenAleph'
+    """, engine_bet, parse_dates=["DateTimePlaced"])
+    legs = pd.read_sql("""
+        SELECT l.WagerID, l.LeagueName, l.EventType, l.EventLabel, l.ParticipantName
+          FROM legs l JOIN bets b ON b.WagerID=l.WagerID
+         WHERE b.WhichBankroll='GreenAleph'
+    """, engine_bet)
+    for col in ("PotentialPayout", "DollarsAtStake", "NetProfit"):
+        bets[col] = pd.to_numeric(bets[col], errors="coerce").fillna(0.0)
+    return bets.drop_duplicates("WagerID"), legs
+
+
+def last_snapshots():
+    """(tbl, alias_key) -> time of that participant's last futures snapshot."""
+    def fetch(tbl):
+        with engine_fut.connect() as conn:
+            return conn.execute(sqlalchemy.text(
+                f"SELECT team_name, MAX(date_created) AS last_seen FROM {tbl} GROUP BY team_name"
+            )).mappings().all()
+
+    load = fetch_tables(fetch, futures_table_map.values())
+    load.raise_if_failed()
+    return {(tbl, _alias_key(r["team_name"])): pd.Timestamp(r["last_seen"])
+            for tbl, rows in load.results.items() for r in rows}
+
+
+def settlement_days(bets, legs, seen):
+    """Estimated settlement day per settled WagerID (see module docstring)."""
+    nba = legs[legs.LeagueName == "NBA"]
+    close = [
+        seen.get((futures_table_map.get((et, el)), _alias_key(team_alias_map.get(pn, pn))))
+        for et, el, pn in nba[LEG_KEY].itertuples(index=False, name=None)
+    ]
+    leg_close = pd.Series(pd.to_datetime(close), index=nba.WagerID.to_numpy())
+    first, last = leg_close.groupby(level=0).min(), leg_close.groupby(level=0).max()
+
+    settled = bets[bets.WLCA.isin(["Win", "Loss", "Cashout"])].set_index("WagerID")
+    est = pd.Series(np.where(settled.WLCA == "Win",
+                             last.reindex(settled.index), first.reindex(settled.index)),
+                    index=settled.index, dtype="datetime64[ns]")
+    est = est.fillna(settled.DateTimePlaced)
+    return est.where(est >= settled.DateTimePlaced, settled.DateTimePlaced).dt.normalize()
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 2) As-of odds for every NBA leg on every day of the window
+# ─────────────────────────────────────────────────────────────────────────────
+def leg_odds_by_day(nba_keys, days):
+    """
+    {(et, el, pn): (dec[day], prob[day])} under update_ev.py's same-day rule:
+    each day's line is the newest valid snapshot of that calendar day.
+    """
+    day_end = days + pd.Timedelta(days=1) - pd.Timedelta(microseconds=1)
+    index   = load_odds_index(days[0].to_pydatetime(), day_end[-1].to_pydatetime())
+    index.load_report.raise_if_failed()
+    odds = {}
+    for et, el, pn in nba_keys:
+        tbl = futures_table_map.get((et, el))
+        if tbl is None:
+            quotes = np.zeros(len(days), dtype=np.int64)
+        else:
+            quotes = index.quotes_asof(tbl, team_alias_map.get(pn, pn), day_end, not_before=days)
+        odds[(et, el, pn)] = (american_to_decimal(quotes), american_to_prob(quotes) * (1 - VIG))
+    return odds
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 3) One sweep over the timeline, on a WagerStore of the NBA legs
+# ─────────────────────────────────────────────────────────────────────────────
+def backfill(start, end):
+    days = pd.date_range(pd.Timestamp(start).normalize(), pd.Timestamp(end).normalize(), freq="D")
+    n_days = len(days)
+    bets, legs = load_bets()
+    settle_day = settlement_days(bets, legs, last_snapshots())
+
+    def day_slot(ts):
+        # day offset; anything before the window lands on day 0, unsettled bets never land
+        offset = (pd.DatetimeIndex(ts).normalize() - days[0]).days.to_numpy(float)
+        return np.where(np.isnan(offset), n_days, np.maximum(offset, 0)).astype(np.int64)
+
+    store = WagerStore.from_frame(legs[legs.LeagueName == "NBA"].merge(bets, on="WagerID"),
+                                  market_cols=MKT_KEY)
+    other = legs[legs.LeagueName != "NBA"].merge(bets[["WagerID", "NetProfit"]], on="WagerID")
+
+    # every market that can appear in the output, as one axis
+    markets = sorted(set(store.markets)
+                     | set(other[MKT_KEY].itertuples(index=False, name=None))
+                     | {("NBA", et, el) for et, el in futures_table_map})
+    market_code = {m: i for i, m in enumerate(markets)}
+    n_markets = len(markets)
+    leg_market = np.array([market_code[m] for m in store.markets], dtype=np.int64)[store.leg_market]
+
+    # (dec, prob) per distinct NBA leg and day
+    distinct = [(et, el, pn) for (_, et, el), pn in store.distinct_legs()]
+    odds = leg_odds_by_day(set(distinct), days)
+    dec  = np.array([odds[k][0] for k in distinct], dtype=float).reshape(-1, n_days)[store.leg_key]
+    prob = np.array([odds[k][1] for k in distinct], dtype=float).reshape(-1, n_days)[store.leg_key]
+
+    seg, n = store.seg, store.n_wagers
+    placed  = day_slot(store.placed)
+    settled = day_slot(settle_day.reindex(store.wager_id))
+    # update_ev.py's active book is WLCA = 'Active'; a settled wager was active
+    # before its settlement day. Any other WLCA is never on the book.
+    bookable = store.has_status(ACTIVE, *SETTLED)
+
+    # realized NBA book: weights frozen with the settlement day's lines, scattered
+    # into (settlement day, market) buckets and accumulated over the days
+    settle_leg = np.minimum(settled, n_days - 1)[seg]
+    frozen, touched = allocate(seg, dec[np.arange(store.n_legs), settle_leg],
+                               settle_leg * n_markets + leg_market, {"npv": store.net_profit},
+                               n, n_days * n_markets, keep=settled < n_days)
+    realized = frozen["npv"].reshape(n_days, n_markets)
+    touched  = touched.reshape(n_days, n_markets)
+
+    # other leagues' legs each book the whole NetProfit on settlement
+    other_slot = day_slot(settle_day.reindex(other.WagerID))
+    other_cell = other_slot * n_markets + np.array(
+        [market_code[m] for m in other[MKT_KEY].itertuples(index=False, name=None)], dtype=np.int64)
+    on_time    = other_slot < n_days
+    cells      = n_days * n_markets
+    realized  += np.bincount(other_cell[on_time], weights=other.NetProfit.to_numpy(float)[on_time],
+                             minlength=cells).reshape(n_days, n_markets)
+    touched   |= (np.bincount(other_cell[on_time], minlength=cells) > 0).reshape(n_days, n_markets)
+    realized = np.cumsum(realized, axis=0)
+    touched  = np.cumsum(touched, axis=0) > 0
+
+    # SUM(NetProfit) of everything realized so far, plus open bets' (normally zero) NetProfit
+    booked = np.where(bets.WagerID.isin(settle_day.index),
+                      day_slot(settle_day.reindex(bets.WagerID)), day_slot(bets.DateTimePlaced))
+    in_window = booked < n_days
+    total_net = np.cumsum(np.bincount(booked[in_window], weights=bets.NetProfit.to_numpy(float)[in_window],
+                                      minlength=n_days))
+
+    nba_markets = {market_code[("NBA", et, el)] for et, el in futures_table_map}
+    total_rows, market_rows = [], []
+    for i, day in enumerate(days):
+        # active book re-priced with the day's lines
+        parlay = parlay_prob(seg, prob[:, i], n)
+        book, _ = allocate(seg, dec[:, i], leg_market,
+                           {"stk": store.stake, "exp": store.payout * parlay}, n, n_markets,
+                           keep=bookable & (placed <= i) & (settled > i) & (parlay > 0))
+
+        snap = day.date()
+        for m in sorted(nba_markets | set(np.flatnonzero(touched[i]).tolist())):
+            lg, et, el = markets[m]
+            stk, exp, npv = float(book["stk"][m]), float(book["exp"][m]), float(realized[i, m])
+            market_rows.append({
+                "d": snap, "lg": lg, "et": et, "el": el,
+                "stk": round(stk, 2), "exp": round(exp, 2), "npv": round(npv, 2),
+                "ev": round(exp - stk + npv, 2),
+            })
+        total_ev = float(book["exp"].sum() - book["stk"].sum() + total_net[i])
+        total_rows.append({"d": snap, "ev": round(total_ev, 2)})
+    return total_rows, market_rows
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 4) Bulk write
+# ─────────────────────────────────────────────────────────────────────────────
+def write_history(total_rows, market_rows):
+    with engine_bet.begin() as conn:
+        conn.execute(sqlalchemy.text(CREATE_MARKET_HISTORY))
+        conn.execute(sqlalchemy.text("""
+            REPLACE INTO ev_history (snapshot_date, expected_value)
+            VALUES (:d, :ev)
+        """), total_rows)
+        market_sql = sqlalchemy.text("""
+            REPLACE INTO ev_history_market
+                (snapshot_date, LeagueName, EventType, EventLabel, ActiveDollarsAtStake,
+                 ActiveExpectedPayout, RealizedNetProfit, ExpectedValue)
+            VALUES (:d, :lg, :et, :el, :stk, :exp, :npv, :ev)
+        """)
+        for lo in range(0, len(market_rows), BATCH_SIZE):
+            conn.execute(market_sql, market_rows[lo:lo + BATCH_SIZE])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--start", required=True, help="first day, YYYY-MM-DD")
+    parser.add_argument("--end", default=datetime.utcnow().date().isoformat(),
+                        help="last day, YYYY-MM-DD (default: today, UTC)")
+    parser.add_argument("--dry-run", action="store_true", help="compute and print, don't write")
+    args = parser.parse_args()
+
+    total_rows, market_rows = backfill(args.start, args.end)
+    for r in total_rows:
+        print(f"🗓️  {r['d']} → TOTAL EV = ${r['ev']:,.2f}")
+    if not args.dry_run:
+        write_history(total_rows, market_rows)
+        print(f"✅  {len(total_rows)} ev_history and {len(market_rows)} ev_history_market rows written.")
@@ -0,0 +1,162 @@
+import threading
+from datetime import date, timedelta
+
+import pandas as pd
+
+from odds import american_to_prob, best_line, odds_matrix
+
+# ──────────────────────  DAILY CLOSING ODDS  ──────────────────────
+# The probability trackers chart one point per team per day: the day's last
+# snapshot. Rather than pulling every intraday row of the range and keeping the
+# last one in pandas, the database numbers each team-day's rows newest first
+# and only rn = 1 comes back, so a long range returns one row per team-day
+# however often the scrapers ran.
+#
+# The closes are then laid out as one date × team matrix of implied
+# probabilities, forward-filled over the whole date range in a single pass, so
+# a wide market (NBAMVP over a season) never loops over its teams.
+#
+# DailyCloseCache keeps the closes of every market table already read, with the
+# set of days each one holds, so a rerun of the page (market switch, date range,
+# top-K slider, manual selection) only reads the days it has not seen. Past
+# days are final; today is read once and then only re-read from its newest
+# held snapshot onwards when asked to (the page's Refresh button) or once the
+# day is over.
+
+DAILY_CLOSE_QUERY = """
+SELECT team_name, snapshot_date AS date, date_created, {cols}
+  FROM (
+        SELECT team_name, DATE(date_created) AS snapshot_date, date_created, {cols},
+               ROW_NUMBER() OVER (PARTITION BY team_name, DATE(date_created)
+                                  ORDER BY date_created DESC) AS rn
+          FROM {table}
+         WHERE date_created BETWEEN %s AND %s
+       ) daily
+ WHERE rn = 1
+ ORDER BY team_name, date
+"""
+
+
+def read_daily_close(conn, table, cols, start_date, end_date, since=None):
+    """
+    Last row per (team_name, day) of futures `table` between two dates
+    (inclusive), with team_name, date (datetime.date), date_created and `cols`.
+    With `since` (a timestamp) only snapshots from then on are considered.
+    `conn` is any DB-API connection pd.read_sql accepts with %s parameters.
+    """
+    query = DAILY_CLOSE_QUERY.format(table=table, cols=", ".join(cols))
+    lower = str(since) if since is not None else f"{start_date} 00:00:00"
+    df = pd.read_sql(query, conn, params=(lower, f"{end_date} 23:59:59"))
+    if not df.empty:
+        df["date"] = pd.to_datetime(df["date"]).dt.date
+    return df
+
+
+def _runs(days):
+    """Sorted dates -> [(first, last), ...] of consecutive days."""
+    runs = []
+    for day in days:
+        if runs and day == runs[-1][1] + timedelta(days=1):
+            runs[-1][1] = day
+        else:
+            runs.append([day, day])
+    return [tuple(run) for run in runs]
+
+
+def _keep_last(df):
+    """One row per (team_name, date): the newest date_created."""
+    return (df.sort_values("date_created", kind="stable")
+              .drop_duplicates(["team_name", "date"], keep="last")
+              .sort_values(["team_name", "date"])
+              .reset_index(drop=True))
+
+
+class DailyCloseCache:
+    """
+    Daily closes per market table, filled on demand. Share one instance per
+    process (the trackers wrap it in st.cache_resource) and read through
+    `closes()`.
+    """
+
+    def __init__(self, cols):
+        self.cols       = list(cols)
+        self._closes    = {}    # table -> DataFrame of closes (read_daily_close columns)
+        self._days      = {}    # table -> set of days fully read
+        self._open_day  = {}    # table -> the day that was still today when read
+        self._lock      = threading.Lock()
+        self.last_fetch = {"table": None, "ranges": [], "rows_read": 0}
+
+    def _read(self, conn, table, start, end, since=None):
+        return read_daily_close(conn, table, self.cols, start, end, since=since)
+
+    def closes(self, connect, table, start_date, end_date, refresh_tail=False, today=None):
+        """
+        Closes of `table` over [start_date, end_date], reading only the days
+        not held yet. `connect()` opens a DB-API connection and is only called
+        when something has to be read. `refresh_tail` also reads today's
+        snapshots newer than the ones held.
+        """
+        today = today or date.today()
+        with self._lock:
+            held = self._closes.get(table)
+            if held is None:
+                held = pd.DataFrame(columns=["team_name", "date", "date_created", *self.cols])
+            days = self._days.setdefault(table, set())
+            open_day = self._open_day.get(table)
+            if open_day is not None and open_day < today:
+                days.discard(open_day)   # it was read while still in progress
+                open_day = None
+
+            wanted = pd.date_range(start_date, min(end_date, today), freq="D").date
+            ranges = _runs([day for day in wanted if day not in days])
+            tail = refresh_tail and open_day is not None and start_date <= open_day <= end_date
+
+            fresh = []
+            if ranges or tail:
+                conn = connect()
+                try:
+                    for lo, hi in ranges:
+                        fresh.append(self._read(conn, table, lo, hi))
+                    if tail:
+                        newest = held.loc[held["date"] == open_day, "date_created"].max()
+                        fresh.append(self._read(conn, table, open_day, open_day,
+                                                since=None if pd.isna(newest) else newest))
+                finally:
+                    conn.close()
+                if any(not df.empty for df in fresh):
+                    held = _keep_last(pd.concat([df for df in (held, *fresh) if not df.empty],
+                                                ignore_index=True))
+                self._closes[table] = held
+                for lo, hi in ranges:
+                    days.update(pd.date_range(lo, hi, freq="D").date)
+                if today in days:
+                    open_day = today
+            self._open_day[table] = open_day
+            self.last_fetch = {"table": table, "ranges": ranges + ([(open_day, open_day)] if tail else []),
+                               "rows_read": sum(len(df) for df in fresh)}
+            return held[(held["date"] >= start_date) & (held["date"] <= end_date)].reset_index(drop=True)
+
+
+def daily_prob_matrix(latest, cols, start_date, end_date):
+    """
+    Implied probability of each team's best line (longest price over `cols`),
+    as a DataFrame indexed by every day of [start_date, end_date] with one
+    column per team. A day without a close carries the previous one forward;
+    days before a team's first close are NaN. Closes that already carry a
+    best_prob column are used as they are.
+    """
+    if "best_prob" in latest:
+        prob = latest["best_prob"].to_numpy(float)   # materialized (FuturesMirror.daily_best)
+    else:
+        best, _ = best_line(odds_matrix(latest, cols))
+        prob = american_to_prob(best)
+    wide = (pd.DataFrame({"date": pd.to_datetime(latest["date"]),
+                          "team_name": latest["team_name"].to_numpy(),
+                          "prob": prob})
+            .pivot(index="date", columns="team_name", values="prob"))
+    return wide.reindex(pd.date_range(start_date, end_date, freq="D")).ffill()
+
+
+def top_k_teams(wide, k):
+    """The `k` teams with the highest probability on the matrix's last day."""
+    return wide.iloc[-1].nlargest(k).index.tolist()
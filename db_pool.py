@@ -0,0 +1,172 @@
+import queue
+import threading
+import time
+from contextlib import contextmanager
+
+import mysql.connector
+
+# ──────────────────────  CONNECTION POOL  ──────────────────────
+# One pool per process (app.py wraps it in st.cache_resource) so every Streamlit
+# session/rerun reuses warm, already-authenticated connections instead of paying
+# the TLS + auth handshake on every query.
+
+
+class ConnectionPool:
+    """
+    Bounded pool of mysql.connector connections.
+
+    * at most `size` connections are ever open; extra callers wait up to
+      `checkout_timeout` seconds for one to be returned
+    * a connection idle for longer than `ping_after` seconds is pinged (and
+      reconnected if the server dropped it) before being handed out
+    * connections that lost their link to the server (OperationalError /
+      InterfaceError) are discarded; after a SQL-level error (bad query,
+      duplicate key, ...) the connection is rolled back and reused
+    """
+
+    def __init__(self, size=5, checkout_timeout=30.0, ping_after=30.0, **connect_kwargs):
+        self.size             = size
+        self.checkout_timeout = checkout_timeout
+        self.ping_after       = ping_after
+        self._connect_kwargs  = connect_kwargs
+        self._idle            = queue.LifoQueue()   # (conn, last_used) — LIFO keeps hot conns hot
+        self._lock            = threading.Lock()
+        self._open            = 0
+        self._stats = {
+            "hits": 0,            # checkout served by an idle pooled connection
+            "misses": 0,          # checkout had to open a new connection
+            "waits": 0,           # checkout blocked because the pool was exhausted
+            "reconnects": 0,      # health check found a dead connection
+            "discarded": 0,       # connection dropped after losing the server
+            "checkouts": 0,
+            "wait_seconds_total": 0.0,
+            "wait_seconds_max": 0.0,
+        }
+
+    # ───────────────  internals  ───────────────
+    def _new_connection(self):
+        return mysql.connector.connect(**self._connect_kwargs)
+
+    def _healthy(self, conn, last_used):
+        if time.monotonic() - last_used < self.ping_after:
+            return conn
+        try:
+            conn.ping(reconnect=True, attempts=2, delay=0)
+            if not conn.is_connected():
+                raise mysql.connector.InterfaceError("connection lost")
+        except mysql.connector.Error:
+            with self._lock:
+                self._stats["reconnects"] += 1
+            try:
+                conn.close()
+            except mysql.connector.Error:
+                pass
+            conn = self._new_connection()
+        return conn
+
+    def _checkout(self):
+        start = time.monotonic()
+        try:
+            conn, last_used = self._idle.get_nowait()
+            hit, waited = True, False
+        except queue.Empty:
+            with self._lock:
+                can_open = self._open < self.size
+                if can_open:
+                    self._open += 1
+            if can_open:
+                try:
+                    conn = self._new_connection()
+                except mysql.connector.Error:
+                    with self._lock:
+                        self._open -= 1
+                    raise
+                last_used, hit, waited = time.monotonic(), False, False
+            else:
+                try:
+                    conn, last_used = self._idle.get(timeout=self.checkout_timeout)
+                except queue.Empty:
+                    raise mysql.connector.PoolError(
+                        f"No connection available within {self.checkout_timeout}s "
+                        f"(pool size {self.size})"
+                    )
+                hit, waited = True, True
+
+        try:
+            conn = self._healthy(conn, last_used)
+        except mysql.connector.Error:
+            with self._lock:
+                self._open -= 1
+            raise
+
+        elapsed = time.monotonic() - start
+        with self._lock:
+            s = self._stats
+            s["checkouts"] += 1
+            s["hits" if hit else "misses"] += 1
+            if waited:
+                s["waits"] += 1
+            s["wait_seconds_total"] += elapsed
+            s["wait_seconds_max"] = max(s["wait_seconds_max"], elapsed)
+        return conn
+
+    def _release(self, conn):
+        self._idle.put((conn, time.monotonic()))
+
+    def _recover(self, conn):
+        """Return a connection whose statement failed but whose socket is fine."""
+        try:
+            conn.rollback()
+        except mysql.connector.Error:
+            self._discard(conn)
+        else:
+            self._release(conn)
+
+    def _discard(self, conn):
+        try:
+            conn.close()
+        except mysql.connector.Error:
+            pass
+        with self._lock:
+            self._open -= 1
+            self._stats["discarded"] += 1
+
+    # ───────────────  public API  ───────────────
+    @contextmanager
+    def connection(self):
+        """Check a connection out for the duration of the `with` block."""
+        conn = self._checkout()
+        try:
+            yield conn
+        except (mysql.connector.OperationalError, mysql.connector.InterfaceError):
+            self._discard(conn)
+            raise
+        except mysql.connector.Error:
+            self._recover(conn)
+            raise
+        except BaseException:
+            self._release(conn)
+            raise
+        else:
+            self._release(conn)
+
+    def query(self, query, params=None):
+        """Run `query` on a pooled connection and return all rows as dicts."""
+        with self.connection() as conn:
+            cursor = conn.cursor(dictionary=True)
+            try:
+                cursor.execute(query, params)
+                return cursor.fetchall()
+            finally:
+                cursor.close()
+
+    def stats(self):
+        with self._lock:
+            s = dict(self._stats)
+            s["open"] = self._open
+        s["idle"] = self._idle.qsize()
+        s["in_use"] = s["open"] - s["idle"]
+        s["size"] = self.size
+        s["hit_rate"] = s["hits"] / s["checkouts"] if s["checkouts"] else 0.0
+        s["wait_seconds_avg"] = s["wait_seconds_total"] / s["checkouts"] if s["checkouts"] else 0.0
+        return s
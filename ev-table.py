@@ -1,10 +1,12 @@
 import streamlit as st
 import pandas as pd
-import re
-from collections import defaultdict
 from datetime import datetime
 from typing import Dict, Tuple
 
+from ev_engine import EVEngine
+from futures_loader import READ_TIMEOUT
+from odds_index import OddsResolver
+
 # ──────────────────────  PAGE CONFIG  ──────────────────────
 st.set_page_config(page_title="Futures EV Table", layout="wide")
 st.title("🔮 Futures EV Table")
@@ -37,28 +39,24 @@ def new_futures_conn():
         cursorclass=pymysql.cursors.DictCursor,
         autocommit=True,
         connect_timeout=10,
+        read_timeout=READ_TIMEOUT,
     )
 
 def with_cursor(conn):
     conn.ping(reconnect=True)
     return conn.cursor()
 
-# ──────────────────────  ODDS HELPERS  ──────────────────────
-def american_odds_to_decimal(o: int) -> float:
-    if o > 0:   return 1.0 + o/100.0
-    if o < 0:   return 1.0 + 100.0/abs(o)
-    return 1.0
-
-def american_odds_to_prob(o: int) -> float:
-    if o > 0:   return 100.0/(o + 100.0)
-    if o < 0:   return abs(o)/(abs(o) + 100.0)
-    return 0.0
+def fetch_rows(conn, sql, params=None):
+    with with_cursor(conn) as cur:
+        cur.execute(sql, params)
+        return cur.fetchall()
 
-def cast_odds(v) -> int:
-    if v in (None, "", 0): return 0
-    if isinstance(v, (int,float)): return int(v)
-    m = re.search(r"[-+]?\d+", str(v))
-    return int(m.group()) if m else 0
+def execute_rows(conn, sql, rows=None):
+    with with_cursor(conn) as cur:
+        if rows is None:
+            cur.execute(sql)
+        else:
+            cur.executemany(sql, rows)
 
 # ──────────────────────  MAPPINGS  ──────────────────────
 futures_table_map: Dict[Tuple[str,str],str] = {
@@ -94,108 +92,51 @@ team_alias_map: Dict[str,str] = {
 sportsbook_cols = ["BetMGM","DraftKings","Caesars","ESPNBet","FanDuel","BallyBet","RiversCasino","Bet365"]
 
 # ──────────────────────  BEST-ODDS  ──────────────────────
-def best_odds_decimal_prob(event_type, event_label, participant,
-                           cutoff_dt, vig_map):
-    tbl = futures_table_map.get((event_type, event_label))
-    if not tbl:
-        return 1.0, 0.0
-
-    alias = team_alias_map.get(participant, participant)
+def _fut_query(sql, params):
+    # one connection per call: the resolver reads the tables on worker threads
     conn = new_futures_conn()
-    cur  = with_cursor(conn)
-    cur.execute(
-        f"SELECT {','.join(sportsbook_cols)} "
-        f"FROM {tbl} "
-        "WHERE team_name=%s AND date_created<=%s "
-        "ORDER BY date_created DESC LIMIT 100",
-        (alias, cutoff_dt),
-    )
-    rows = cur.fetchall()
-    cur.close(); conn.close()
-
-    for r in rows:
-        quotes = [cast_odds(r[c]) for c in sportsbook_cols]
-        quotes = [q for q in quotes if q]
-        if not quotes: continue
-        best = min(quotes, key=american_odds_to_prob)
-        dec  = american_odds_to_decimal(best)
-        prob = american_odds_to_prob(best) * (1 - vig_map.get((event_type, event_label), 0.05))
-        return dec, prob
-
-    return 1.0, 0.0
+    try:
+        return fetch_rows(conn, sql, params)
+    finally:
+        conn.close()
+
+ODDS = OddsResolver(_fut_query, futures_table_map, team_alias_map, sportsbook_cols)
+SETTLED_ODDS = ODDS.settlement()
+
+def resolve_best_odds(legs, cutoff_dt, vig_map, unread, resolver=ODDS):
+    """
+    ({leg: (dec, prob)}, legs left unpriced) for every (et, el, participant)
+    leg; see odds_index.OddsResolver. Futures tables that failed or timed out
+    are added to `unread` and their legs priced as unquoted.
+    """
+    resolved, load = resolver.resolve_partial(legs, cutoff_dt, vig_map)
+    unread.update(load.failed)
+    return resolved, resolver.missing_legs(legs, load)
 
 # ──────────────────────  BUILD EV TABLE  ──────────────────────
+@st.cache_resource
+def ev_engine():
+    return EVEngine()
+
 def build_ev_table():
     now = datetime.utcnow()
     vig = {k:0.05 for k in futures_table_map}
-    active_stake, active_exp = defaultdict(float), defaultdict(float)
-    realized_np = defaultdict(float)
 
     # connect once for betting_db queries
     bet_conn = new_betting_conn()
 
-    # --- ACTIVE NBA FUTURES ---
-    df_active = pd.read_sql("""
-        SELECT b.WagerID, b.PotentialPayout, b.DollarsAtStake,
-               l.EventType, l.EventLabel, l.ParticipantName
-          FROM bets b
-          JOIN legs l ON b.WagerID=l.WagerID
-         WHERE b.WhichBankroll='GreenAleph'
-           AND b.WLCA='Active'
-           AND l.LeagueName='NBA'
-    """, bet_conn)
-
-    for wid, grp in df_active.groupby("WagerID"):
-        pot   = float(grp.PotentialPayout.iloc[0] or 0)
-        stake = float(grp.DollarsAtStake.iloc[0] or 0)
-        legs  = list(grp[["EventType","EventLabel","ParticipantName"]]
-                     .itertuples(index=False, name=None))
-
-        decs, prob = [], 1.0
-        for et, el, pn in legs:
-            d, p = best_odds_decimal_prob(et, el, pn, now, vig)
-            if p == 0:
-                prob = 0
-                break
-            decs.append(d); prob *= p
-
-        if prob == 0:
-            continue
-
-        expected = pot * prob
-        exc_sum  = sum(d - 1 for d in decs)
-        if exc_sum <= 0:
-            continue
-
-        for d in decs:
-            w = (d - 1) / exc_sum
-            active_stake[(et, el)] += w * stake
-            active_exp  [(et, el)] += w * expected
-
-    # --- REALIZED NBA FUTURES ---
-    df_real = pd.read_sql("""
-        SELECT b.WagerID, b.NetProfit,
-               l.EventType, l.EventLabel, l.ParticipantName
-          FROM bets b
-          JOIN legs l ON b.WagerID=l.WagerID
-         WHERE b.WhichBankroll='GreenAleph'
-           AND b.WLCA IN ('Win','Loss','Cashout')
-           AND l.LeagueName='NBA'
-    """, bet_conn)
-
-    net_map  = df_real.groupby("WagerID").NetProfit.first().to_dict()
-    legs_map = df_real.groupby("WagerID")[["EventType","EventLabel","ParticipantName"]] \
-                      .apply(lambda df: list(df.itertuples(index=False,name=None))) \
-                      .to_dict()
-
-    for wid, legs in legs_map.items():
-        npv = float(net_map.get(wid,0))
-        decs = [best_odds_decimal_prob(et,el,pn,now,vig)[0] for et,el,pn in legs]
-        exc_sum = sum(d - 1 for d in decs)
-        if exc_sum <= 0:
-            continue
-        for d,(et,el,_) in zip(decs, legs):
-            realized_np[(et,el)] += npv * ((d - 1) / exc_sum)
+    # --- ACTIVE + REALIZED NBA FUTURES ---
+    # the engine outlives reruns: only wagers that are new, changed status /
+    # NetProfit or have a leg whose best line moved are re-allocated, and
+    # settled wagers reuse their weights frozen in settled_allocation. A partial
+    # futures read still builds the table; only wagers on unread tables wait
+    # for a later run to be frozen
+    unread = set()
+    engine = ev_engine().refresh(lambda sql, params: fetch_rows(bet_conn, sql, params),
+                                 lambda legs: resolve_best_odds(legs, now, vig, unread)[0],
+                                 lambda sql, rows: execute_rows(bet_conn, sql, rows),
+                                 lambda legs: resolve_best_odds(legs, now, vig, unread, SETTLED_ODDS))
+    active_stake, active_exp, realized_np = engine.totals()
 
     # --- COMPLETED OTHER SPORTS ---
     df_other = pd.read_sql("""
@@ -255,11 +196,14 @@ def build_ev_table():
         )
     }
     df = pd.concat([df, pd.DataFrame([total_row])], ignore_index=True)
-    return df
+    return df, sorted(unread)
 
 # ──────────────────────  RENDER  ──────────────────────
 try:
-    df = build_ev_table()
+    df, unread = build_ev_table()
+    if unread:
+        st.warning(f"⚠️ Futures odds incomplete — not read: {', '.join(unread)}. "
+                   "Their legs are priced as unquoted and settled wagers on them are not frozen yet.")
 except Exception as e:
     st.error(f"DB error; showing demo data: {e}")
     df = pd.DataFrame([{
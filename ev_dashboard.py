@@ -1,9 +1,9 @@
 #!/usr/bin/env python3
 
+import argparse
 import os
-import re
-from collections import defaultdict
-from datetime import datetime, date
+import time
+from datetime import datetime
 
 import matplotlib
 matplotlib.use("Agg")             # headless backend for CI
@@ -14,6 +14,13 @@ from urllib.parse import quote_plus
 import pymysql
 import sqlalchemy
 
+from ev_engine import EVEngine
+from ev_history import roll_up_day, write_market_snapshot
+from futures_loader import READ_TIMEOUT
+from futures_mirror import FuturesMirror
+from odds_index import OddsIndex, OddsResolver
+from stage_profile import StageProfile, run_profiled
+
 # ─────────────────────────────────────────────────────────────────────────────
 # 1) Database credentials (from env vars)
 # ─────────────────────────────────────────────────────────────────────────────
@@ -33,28 +40,19 @@ engine_bet = sqlalchemy.create_engine(
 )
 fut_pw_escaped = quote_plus(FUT_PW)
 engine_fut = sqlalchemy.create_engine(
-    f"mysql+pymysql://{FUT_USER}:{fut_pw_escaped}@{FUT_HOST}/{FUT_DB}"
+    f"mysql+pymysql://{FUT_USER}:{fut_pw_escaped}@{FUT_HOST}/{FUT_DB}",
+    connect_args={"read_timeout": READ_TIMEOUT},   # a hung futures read ends (futures_loader.py)
 )
 
+# stage timings of the current snapshot (see stage_profile.py)
+PROFILE      = StageProfile()
+PROFILE_JSON = "ev_profile.json"
+PROFILE.count_queries(engine_bet)
+PROFILE.count_queries(engine_fut)
+
 # ─────────────────────────────────────────────────────────────────────────────
 # 2) Helpers
 # ─────────────────────────────────────────────────────────────────────────────
-def american_odds_to_decimal(o: int) -> float:
-    if o > 0:   return 1.0 + o/100.0
-    if o < 0:   return 1.0 + 100.0/abs(o)
-    return 1.0
-
-def american_odds_to_prob(o: int) -> float:
-    if o > 0:   return 100.0/(o + 100.0)
-    if o < 0:   return abs(o)/(abs(o) + 100.0)
-    return 0.0
-
-def cast_odds(v) -> int:
-    if v in (None, "", 0): return 0
-    if isinstance(v, (int, float)): return int(v)
-    m = re.search(r"[-+]?\d+", str(v))
-    return int(m.group()) if m else 0
-
 futures_table_map = {
     ("Championship","NBA Championship"): "NBAChampionship",
     ("Conference Winner","Eastern Conference"): "NBAEasternConference",
@@ -87,178 +85,208 @@ team_alias_map = {
 
 sportsbook_cols = ["BetMGM","DraftKings","Caesars","ESPNBet","FanDuel","BallyBet","RiversCasino","Bet365"]
 
-def best_odds_decimal_prob(event_type, event_label, participant, cutoff_dt, vig_map):
-    tbl = futures_table_map.get((event_type, event_label))
-    if tbl is None: return 1.0, 0.0
-
-    alias = team_alias_map.get(participant, participant)
+def _fut_query(query, params):
+    # one connection per call: OddsIndex.load runs these on worker threads
     with engine_fut.connect() as conn:
-        rows = conn.execute(
-            sqlalchemy.text(f"""
-                SELECT {','.join(sportsbook_cols)}
-                  FROM {tbl}
-                 WHERE team_name = :alias
-                   AND date_created <= :dt
-              ORDER BY date_created DESC
-                 LIMIT 100
-            """), {"alias": alias, "dt": cutoff_dt}
-        ).mappings().all()
-
-    for r in rows:
-        quotes = [cast_odds(r[c]) for c in sportsbook_cols]
-        quotes = [q for q in quotes if q]
-        if not quotes: continue
-        best = min(quotes, key=american_odds_to_prob)
-        dec  = american_odds_to_decimal(best)
-        prob = american_odds_to_prob(best) * (1 - vig_map.get((event_type, event_label), 0.05))
-        return dec, prob
-
-    return 1.0, 0.0
+        return conn.exec_driver_sql(query, params).mappings().all()
+
+def _bet_query(query, params):
+    with engine_bet.connect() as conn:
+        return conn.exec_driver_sql(query, params).mappings().all()
+
+def _bet_execute(query, rows):
+    # rows=None runs the statement once, a list of tuples runs it per row
+    with engine_bet.begin() as conn:
+        conn.exec_driver_sql(query, rows)
+
+def load_odds_index(start, end):
+    """
+    As-of index of every tracked NBA market over [start, end], tables read
+    concurrently, from the local futures mirror when $FUTURES_MIRROR is set.
+    """
+    mirror = FuturesMirror.from_env()
+    if mirror is not None:
+        return OddsIndex.from_mirror(
+            mirror, futures_table_map.values(),
+            sportsbook_cols, start, end
+        )
+    return OddsIndex.load(
+        _fut_query, futures_table_map.values(),
+        sportsbook_cols, start, end
+    )
+
+ODDS = OddsResolver(_fut_query, futures_table_map, team_alias_map, sportsbook_cols)
+
+def resolve_best_odds(legs, cutoff_dt, vig_map, index=None):
+    """
+    (decimal, prob) for every (et, el, participant) leg from the newest valid
+    line at or before cutoff_dt; see odds_index.OddsResolver.
+    """
+    return ODDS.resolve(legs, cutoff_dt, vig_map, index=index)
+
+# settled wagers are frozen under the rule every writer of settled_allocation shares
+SETTLED_ODDS = ODDS.settlement()
+
+def resolve_settled_odds(legs, cutoff_dt, vig_map):
+    """({leg: (dec, prob)}, no missing legs) for freezing settled wagers; raises on a partial read."""
+    return SETTLED_ODDS.resolve(legs, cutoff_dt, vig_map), set()
+
+# per-wager contributions survive between builds in this process
+EV_ENGINE = EVEngine()
 
 def build_ev_table():
     now = datetime.utcnow()
     vig = {k:0.05 for k in futures_table_map}
-    active_stake = defaultdict(float)
-    active_exp   = defaultdict(float)
-    realized_np  = defaultdict(float)
-
-    # ACTIVE NBA FUTURES
-    df_active = pd.read_sql("""
-        SELECT b.WagerID, b.PotentialPayout, b.DollarsAtStake,
-               l.EventType, l.EventLabel, l.ParticipantName
-          FROM bets b JOIN legs l ON b.WagerID=l.WagerID
-         WHERE b.WhichBankroll='GreenAleph'
-           AND b.WLCA='Active'
-           AND l.LeagueName='NBA'
-    """, engine_bet)
-
-    for wid, grp in df_active.groupby("WagerID", as_index=False):
-        pot   = float(grp.PotentialPayout.iloc[0] or 0)
-        stake = float(grp.DollarsAtStake.iloc[0]  or 0)
-        legs  = list(grp[["EventType","EventLabel","ParticipantName"]].itertuples(index=False, name=None))
-        decs, prob = [], 1.0
-        for et, el, pn in legs:
-            dec, p = best_odds_decimal_prob(et, el, pn, now, vig)
-            if p == 0:
-                prob = 0
-                break
-            decs.append(dec)
-            prob *= p
-        if prob == 0:
-            continue
-        expected = pot * prob
-        exc_sum  = sum(d - 1 for d in decs)
-        if exc_sum <= 0:
-            continue
-        for d, (et, el, _) in zip(decs, [(et,el,_) for et,el,_ in legs]):
-            w = (d - 1) / exc_sum
-            active_stake[(et,el)] += w * stake
-            active_exp  [(et,el)] += w * expected
-
-    # REALIZED NBA FUTURES
-    df_real = pd.read_sql("""
-        SELECT b.WagerID, b.NetProfit,
-               l.EventType, l.EventLabel, l.ParticipantName
-          FROM bets b JOIN legs l ON b.WagerID=l.WagerID
-         WHERE b.WhichBankroll='GreenAleph'
-           AND b.WLCA IN ('Win','Loss','Cashout')
-           AND l.LeagueName='NBA'
-    """, engine_bet)
-
-    net      = df_real.groupby("WagerID").NetProfit.first().to_dict()
-    legs_map = df_real.groupby("WagerID")[["EventType","EventLabel","ParticipantName"]] \
-                      .apply(lambda df: list(df.itertuples(index=False, name=None))) \
-                      .to_dict()
-
-    for wid, legs in legs_map.items():
-        npv    = float(net.get(wid, 0))
-        decs   = [best_odds_decimal_prob(et, el, pn, now, vig)[0] for et, el, pn in legs]
-        exc_sum = sum(d - 1 for d in decs)
-        if exc_sum <= 0:
-            continue
-        for d, (et, el, _) in zip(decs, legs):
-            realized_np[(et,el)] += npv * ((d - 1) / exc_sum)
-
-    # OTHER SPORTS
-    df_other = pd.read_sql("""
-        SELECT b.NetProfit, l.LeagueName, l.EventType, l.EventLabel
-          FROM bets b JOIN legs l ON b.WagerID=l.WagerID
-         WHERE b.WhichBankroll='GreenAleph'
-           AND b.WLCA IN ('Win','Loss','Cashout')
-           AND l.LeagueName <> 'NBA'
-    """, engine_bet)
-
-    other = df_other.groupby(["LeagueName","EventType","EventLabel"]) \
-                    .NetProfit.sum().to_dict()
-
-    rec = []
-    for (et,el), tbl in futures_table_map.items():
-        rec.append({
-            "LeagueName": "NBA",
-            "EventType": et,
-            "EventLabel": el,
-            "ActiveDollarsAtStake": round(active_stake.get((et,el), 0), 2),
-            "ActiveExpectedPayout": round(active_exp.get((et,el), 0), 2),
-            "RealizedNetProfit": round(realized_np.get((et,el), 0), 2),
-            "ExpectedValue": round(active_exp.get((et,el), 0) - active_stake.get((et,el), 0) + realized_np.get((et,el), 0), 2),
-        })
-    for (lg, et, el), npv in other.items():
-        rec.append({
-            "LeagueName": lg,
-            "EventType": et,
-            "EventLabel": el,
-            "ActiveDollarsAtStake": 0.0,
-            "ActiveExpectedPayout": 0.0,
-            "RealizedNetProfit": round(npv, 2),
-            "ExpectedValue": round(npv, 2),
-        })
-
-    df = pd.DataFrame(rec).sort_values(["LeagueName","EventType","EventLabel"]).reset_index(drop=True)
-
-    total_net = float(pd.read_sql(
-        "SELECT SUM(NetProfit) AS s FROM bets WHERE WhichBankroll='GreenAleph'",
-        engine_bet
-    ).iloc[0, 0] or 0)
-
-    total_row = {
-        "LeagueName": "TOTAL",
-        "EventType": "",
-        "EventLabel": "",
-        "ActiveDollarsAtStake": df.ActiveDollarsAtStake.sum(),
-        "ActiveExpectedPayout": df.ActiveExpectedPayout.sum(),
-        "RealizedNetProfit": round(total_net, 2),
-        "ExpectedValue": round(df.ActiveExpectedPayout.sum() - df.ActiveDollarsAtStake.sum() + total_net, 2),
-    }
-    return pd.concat([df, pd.DataFrame([total_row])], ignore_index=True)
 
-if __name__ == "__main__":
-    ev_df = build_ev_table()
-    today_ev = float(ev_df.loc[ev_df.LeagueName=="TOTAL","ExpectedValue"].iloc[0])
-    print(f"🗓️  {date.today()} → TOTAL EV = ${today_ev:,.2f}")
+    # --- ACTIVE + REALIZED NBA FUTURES ---
+    # Only wagers that are new, changed status/NetProfit or have a leg whose
+    # best line moved are re-allocated; settled wagers reuse the weights frozen
+    # in settled_allocation and are never priced again (see ev_engine.py)
+    with PROFILE.span("allocation"):
+        EV_ENGINE.refresh(PROFILE.timed("query", _bet_query),
+                          PROFILE.timed("odds", lambda legs: resolve_best_odds(legs, now, vig)),
+                          PROFILE.timed("persist", _bet_execute),
+                          PROFILE.timed("odds", lambda legs: resolve_settled_odds(legs, now, vig),
+                                        rows=lambda result: len(result[0])))
+        active_stake, active_exp, realized_np = EV_ENGINE.totals()
+
+    # OTHER SPORTS (summed server-side: one row per market per tick)
+    with PROFILE.span("query") as stage:
+        df_other = pd.read_sql("""
+            SELECT l.LeagueName, l.EventType, l.EventLabel, SUM(b.NetProfit) AS NetProfit
+              FROM bets b JOIN legs l ON b.WagerID=l.WagerID
+             WHERE b.WhichBankroll='GreenAleph'
+               AND b.WLCA IN ('Win','Loss','Cashout')
+               AND l.LeagueName <> 'NBA'
+          GROUP BY l.LeagueName, l.EventType, l.EventLabel
+        """, engine_bet)
+        total_net = float(pd.read_sql(
+            "SELECT SUM(NetProfit) AS s FROM bets WHERE WhichBankroll='GreenAleph'",
+            engine_bet
+        ).iloc[0, 0] or 0)
+        stage.rows += len(df_other) + 1
+
+    with PROFILE.span("assembly"):
+        other = df_other.set_index(["LeagueName","EventType","EventLabel"]) \
+                        .NetProfit.astype(float).to_dict()
+
+        rec = []
+        for (et,el), tbl in futures_table_map.items():
+            rec.append({
+                "LeagueName": "NBA",
+                "EventType": et,
+                "EventLabel": el,
+                "ActiveDollarsAtStake": round(active_stake.get((et,el), 0), 2),
+                "ActiveExpectedPayout": round(active_exp.get((et,el), 0), 2),
+                "RealizedNetProfit": round(realized_np.get((et,el), 0), 2),
+                "ExpectedValue": round(active_exp.get((et,el), 0) - active_stake.get((et,el), 0) + realized_np.get((et,el), 0), 2),
+            })
+        for (lg, et, el), npv in other.items():
+            rec.append({
+                "LeagueName": lg,
+                "EventType": et,
+                "EventLabel": el,
+                "ActiveDollarsAtStake": 0.0,
+                "ActiveExpectedPayout": 0.0,
+                "RealizedNetProfit": round(npv, 2),
+                "ExpectedValue": round(npv, 2),
+            })
+
+        df = pd.DataFrame(rec).sort_values(["LeagueName","EventType","EventLabel"]).reset_index(drop=True)
+
+        total_row = {
+            "LeagueName": "TOTAL",
+            "EventType": "",
+            "EventLabel": "",
+            "ActiveDollarsAtStake": df.ActiveDollarsAtStake.sum(),
+            "ActiveExpectedPayout": df.ActiveExpectedPayout.sum(),
+            "RealizedNetProfit": round(total_net, 2),
+            "ExpectedValue": round(df.ActiveExpectedPayout.sum() - df.ActiveDollarsAtStake.sum() + total_net, 2),
+        }
+        return pd.concat([df, pd.DataFrame([total_row])], ignore_index=True)
 
-    with engine_bet.begin() as conn:
-        conn.execute(
-            sqlalchemy.text("""
-                REPLACE INTO ev_history (snapshot_date, expected_value)
-                VALUES (:d, :ev)
-            """), {"d": date.today(), "ev": today_ev}
-        )
+# ─────────────────────────────────────────────────────────────────────────────
+# 4) Snapshots: once (cron / CI) or every N minutes (long-running)
+# ─────────────────────────────────────────────────────────────────────────────
+def take_snapshot():
+    """Build the EV table, store it at timestamp resolution and roll up its day."""
+    snapshot_ts = datetime.utcnow().replace(microsecond=0)
+    ev_df = build_ev_table()
+    with PROFILE.span("persist") as stage:
+        n_rows = write_market_snapshot(engine_bet, ev_df, snapshot_ts)
+        roll_up_day(engine_bet, snapshot_ts.date())
+        stage.rows += n_rows
+
+    total_ev = float(ev_df.loc[ev_df.LeagueName=="TOTAL","ExpectedValue"].iloc[0])
+    refresh = EV_ENGINE.last_refresh
+    print(f"🗓️  {snapshot_ts:%Y-%m-%d %H:%M:%S} UTC → TOTAL EV = ${total_ev:,.2f} "
+          f"({n_rows} markets; {refresh['mode']} refresh, {refresh['dirty_wagers']} wagers recomputed)")
+    return ev_df
+
+def run_every(minutes, ticks=None, profile_json=PROFILE_JSON):
+    """
+    Snapshot every `minutes` on wall-clock boundaries (…:00, :15, :30 for 15),
+    `ticks` times or forever. The process keeps EV_ENGINE warm, so a tick only
+    re-reads bets, the active book's lines and what changed since the last one.
+    A failed tick is reported and the next one tried. Each tick's stage
+    profile overwrites `profile_json`.
+    """
+    period, done = minutes * 60, 0
+    while ticks is None or done < ticks:
+        PROFILE.reset()
+        try:
+            take_snapshot()
+            print(f"   ⏱️  {PROFILE.one_line()}")
+            PROFILE.write_json(profile_json)
+        except Exception as e:
+            print(f"⚠️  snapshot failed: {e}")
+        done += 1
+        if ticks is None or done < ticks:
+            time.sleep(period - time.time() % period)
+
+def plot_history(path="ev_history.png"):
+    with PROFILE.span("query") as stage:
+        hist = pd.read_sql("""
+            SELECT snapshot_date AS date, expected_value AS ev
+              FROM ev_history
+             ORDER BY snapshot_date
+        """, engine_bet, parse_dates=["date"])
+        stage.rows += len(hist)
+
+    with PROFILE.span("plot"):
+        plt.figure(figsize=(10,5))
+        plt.plot(hist.date, hist.ev, marker="o", linewidth=2)
+        plt.title("Historical Total Expected Value over Time", fontsize=16)
+        plt.xlabel("Date")
+        plt.ylabel("Total EV ($)")
+        plt.grid(alpha=0.3)
+        plt.tight_layout()
+        plt.savefig(path)
+
+def snapshot_and_plot():
+    take_snapshot()
     print("✅  ev_history updated.")
-
     # plot + save to file
-    hist = pd.read_sql("""
-        SELECT snapshot_date AS date, expected_value AS ev
-          FROM ev_history
-         ORDER BY snapshot_date
-    """, engine_bet, parse_dates=["date"])
-
-    plt.figure(figsize=(10,5))
-    plt.plot(hist.date, hist.ev, marker="o", linewidth=2)
-    plt.title("Historical Total Expected Value over Time", fontsize=16)
-    plt.xlabel("Date")
-    plt.ylabel("Total EV ($)")
-    plt.grid(alpha=0.3)
-    plt.tight_layout()
-    plt.savefig("ev_history.png")
-
+    plot_history()
 
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Snapshot futures EV into ev_market_snapshots "
+                                                 "and the daily ev_history rollups.")
+    parser.add_argument("--every", type=float, metavar="MINUTES",
+                        help="keep running and snapshot every MINUTES (default: one snapshot)")
+    parser.add_argument("--ticks", type=int, help="with --every, stop after this many snapshots")
+    parser.add_argument("--profile-json", default=PROFILE_JSON,
+                        help=f"where to write the stage profile (default: {PROFILE_JSON})")
+    args = parser.parse_args()
+
+    if args.every:
+        try:
+            run_every(args.every, args.ticks, args.profile_json)
+        except KeyboardInterrupt:
+            print("👋  scheduler stopped.")
+    else:
+        PROFILE.reset()
+        run_profiled(snapshot_and_plot)
+        print(PROFILE.summary())
+        PROFILE.write_json(args.profile_json)
+        print(f"📊  stage profile written to {args.profile_json}")
@@ -0,0 +1,292 @@
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+
+import pandas as pd
+
+from allocation import leg_weights, parlay_prob
+from wager_store import ACTIVE, SETTLED, WagerStore
+
+# ──────────────────────  INCREMENTAL EV ENGINE  ──────────────────────
+# build_ev_table's NBA allocation kept in memory between refreshes. Every wager's
+# per-leg contribution (stake, expected payout, realized net profit) is stored
+# next to the per-market totals. A refresh re-reads the bet-level columns and
+# the odds of the legs on the active book, then recomputes only the wagers that
+# are new, changed WLCA / NetProfit / stake / payout, left the book, or have a
+# leg whose best line moved: their old contribution is subtracted from the
+# market totals and the new one added. Legs never change after placement, so
+# they are read once per WagerID. When most of the book is dirty the totals are
+# rebuilt from scratch instead, which also clears accumulated floating-point
+# drift.
+#
+# A settled wager's NetProfit is split over its markets with weights frozen the
+# first time it is seen settled, and kept in settled_allocation, so its legs
+# are never priced again: later refreshes (and other processes) reuse the
+# weights. Settled legs are priced by `resolve_settled`, which every writer
+# runs under the same rule (odds_index.SETTLEMENT_RULE) whatever rule prices
+# its active book; a leg without a quote weighs 0, and a wager without any
+# quoted leg is frozen with zero weights (its NetProfit stays unallocated).
+# Only a wager with a leg whose futures table failed to load stays pending and
+# is re-allocated on every refresh. What the engine caches is what
+# settled_allocation holds after the write, so when another process froze the
+# wager first, its weights win here too.
+
+BETS_QUERY = """
+SELECT b.WagerID, b.WLCA, b.PotentialPayout, b.DollarsAtStake, b.NetProfit
+  FROM bets b
+ WHERE b.WhichBankroll = %s
+   AND b.WLCA IN ('Active','Win','Loss','Cashout')
+   AND EXISTS (SELECT 1 FROM legs l WHERE l.WagerID = b.WagerID AND l.LeagueName = %s)
+"""
+
+LEGS_QUERY = """
+SELECT l.WagerID, l.EventType, l.EventLabel, l.ParticipantName
+  FROM legs l
+ WHERE l.LeagueName = %s
+   AND l.WagerID IN ({ids})
+"""
+
+CREATE_SETTLED_ALLOCATION = """
+CREATE TABLE IF NOT EXISTS settled_allocation (
+    WagerID     BIGINT        NOT NULL,
+    LeagueName  VARCHAR(100)  NOT NULL,
+    EventType   VARCHAR(100)  NOT NULL,
+    EventLabel  VARCHAR(100)  NOT NULL,
+    Weight      DOUBLE        NOT NULL,
+    frozen_at   DATETIME      NOT NULL,
+    PRIMARY KEY (WagerID, LeagueName, EventType, EventLabel)
+)
+"""
+
+SETTLED_ALLOCATION_QUERY = """
+SELECT WagerID, EventType, EventLabel, Weight
+  FROM settled_allocation
+ WHERE LeagueName = %s
+"""
+
+SETTLED_ALLOCATION_BY_ID_QUERY = SETTLED_ALLOCATION_QUERY + """   AND WagerID IN ({ids})
+"""
+
+# first writer wins: another process may have frozen the same wager meanwhile
+INSERT_SETTLED_ALLOCATION = """
+INSERT IGNORE INTO settled_allocation
+    (WagerID, LeagueName, EventType, EventLabel, Weight, frozen_at)
+VALUES (%s, %s, %s, %s, %s, %s)
+"""
+
+BET_FIELDS = ("WLCA", "PotentialPayout", "DollarsAtStake", "NetProfit")
+SETTLED_WLCA = ("Win", "Loss", "Cashout")
+IDS_PER_QUERY = 1000
+REBUILD_FRACTION = 0.25   # dirty share of the book above which totals are rebuilt
+
+
+def _bet_state(r):
+    return (r["WLCA"], *(float(r[col] or 0) for col in BET_FIELDS[1:]))
+
+
+class EVEngine:
+    """
+    NBA active stake / expected payout and realized net profit per (EventType,
+    EventLabel), kept up to date incrementally. Share one instance per process
+    (module-level in the scripts, st.cache_resource in ev-table.py), call
+    `refresh()` and read `totals()`.
+    """
+
+    def __init__(self, bankroll="GreenAleph", league="NBA", rebuild_fraction=REBUILD_FRACTION):
+        self.bankroll         = bankroll
+        self.league           = league
+        self.rebuild_fraction = rebuild_fraction
+        self._bets            = {}                 # WagerID -> (WLCA, payout, stake, net profit)
+        self._legs            = {}                 # WagerID -> [(EventType, EventLabel, ParticipantName), ...]
+        self._wagers_by_leg   = defaultdict(set)   # leg -> WagerIDs holding it
+        self._frozen          = None               # WagerID -> [(market, weight), ...] of settled wagers
+        self._odds            = {}                 # leg -> (dec, prob) the active contributions were computed with
+        self._contrib         = {}                 # WagerID -> [(market, stk, exp, npv, active, settled), ...]
+        self._totals          = {}                 # market -> [stk, exp, npv, active legs, settled legs]
+        self._lock            = threading.Lock()
+        self.last_refresh     = {"mode": None, "wagers": 0, "dirty_wagers": 0, "priced_legs": 0,
+                                 "moved_legs": 0, "frozen_now": 0, "pending": 0, "seconds": 0.0}
+
+    # ───────────────  reading  ───────────────
+    def _read_legs(self, query_fn, wager_ids):
+        wager_ids = sorted(wager_ids)
+        for lo in range(0, len(wager_ids), IDS_PER_QUERY):
+            chunk = wager_ids[lo:lo + IDS_PER_QUERY]
+            rows = query_fn(LEGS_QUERY.format(ids=",".join(["%s"] * len(chunk))), (self.league, *chunk))
+            for r in rows:
+                leg = (r["EventType"], r["EventLabel"], r["ParticipantName"])
+                self._legs.setdefault(r["WagerID"], []).append(leg)
+                self._wagers_by_leg[leg].add(r["WagerID"])
+
+    def _read_frozen(self, query_fn, write_fn):
+        self._frozen = {}
+        if write_fn is None:
+            return   # nowhere to persist them: freeze in memory only
+        write_fn(CREATE_SETTLED_ALLOCATION, None)
+        self._add_frozen(query_fn(SETTLED_ALLOCATION_QUERY, (self.league,)))
+
+    def _add_frozen(self, rows):
+        for r in rows or []:
+            self._frozen.setdefault(r["WagerID"], []).append(((r["EventType"], r["EventLabel"]), float(r["Weight"])))
+
+    def _forget(self, wager_id):
+        for leg in self._legs.pop(wager_id, ()):
+            holders = self._wagers_by_leg[leg]
+            holders.discard(wager_id)
+            if not holders:
+                del self._wagers_by_leg[leg]
+
+    def _priced(self, wager_id):
+        """Does this wager's contribution depend on current odds?"""
+        return self._bets[wager_id][0] not in SETTLED_WLCA or wager_id not in self._frozen
+
+    # ───────────────  contributions  ───────────────
+    def _contributions(self, wager_ids, odds, missing=()):
+        """
+        Per-leg contributions of `wager_ids`, and the weights of the settled
+        ones that were not frozen yet. Priced wagers go through the allocation
+        kernel; frozen ones only scale their weights by NetProfit. A settled
+        wager with a leg in `missing` (its odds could not be read) is left out
+        of the second dict.
+        """
+        contrib, frozen_now = {}, {}
+        for wid in wager_ids:
+            if not self._priced(wid):
+                weights = self._frozen[wid]
+                allocated = any(w > 0 for _, w in weights)
+                contrib[wid] = [(m, 0.0, 0.0, w * self._bets[wid][3], False, allocated) for m, w in weights]
+
+        rows = [(wid, *self._bets[wid], *leg) for wid in wager_ids if wid not in contrib
+                for leg in self._legs.get(wid, ())]
+        store = WagerStore.from_frame(pd.DataFrame(rows, columns=[
+            "WagerID", *BET_FIELDS, "EventType", "EventLabel", "ParticipantName"]))
+        dec, prob = store.leg_odds(odds)
+        n, seg = store.n_wagers, store.seg
+        parlay = parlay_prob(seg, prob, n)
+        w_active, ok_active = leg_weights(seg, dec, n, keep=store.has_status(ACTIVE) & (parlay > 0))
+        w_settled, ok_settled = leg_weights(seg, dec, n, keep=store.has_status(*SETTLED))
+        freezable = store.has_status(*SETTLED).tolist()
+
+        stk = w_active * store.stake[seg]
+        exp = w_active * (store.payout * parlay)[seg]
+        npv = w_settled * store.net_profit[seg]
+        markets = [store.markets[m] for m in store.leg_market.tolist()]
+        legs = zip(markets, stk.tolist(), exp.tolist(), npv.tolist(),
+                   ok_active[seg].tolist(), ok_settled[seg].tolist(), w_settled.tolist())
+        for i, (wid, lo, hi) in enumerate(zip(store.wager_id.tolist(), store.leg_offsets[:-1].tolist(),
+                                              store.leg_offsets[1:].tolist())):
+            wager_legs = [next(legs) for _ in range(hi - lo)]
+            contrib[wid] = [leg[:6] for leg in wager_legs]
+            if freezable[i] and not any(leg in missing for leg in self._legs[wid]):
+                weights = defaultdict(float)
+                for leg in wager_legs:
+                    weights[leg[0]] += leg[6]
+                frozen_now[wid] = list(weights.items())
+        return contrib, frozen_now
+
+    def _apply(self, contrib, sign):
+        for legs in contrib.values():
+            for market, stk, exp, npv, active, settled in legs:
+                if not (active or settled):
+                    continue
+                tot = self._totals.setdefault(market, [0.0, 0.0, 0.0, 0, 0])
+                tot[0] += sign * stk
+                tot[1] += sign * exp
+                tot[2] += sign * npv
+                tot[3] += sign * active
+                tot[4] += sign * settled
+                if tot[3] == 0 and tot[4] == 0:
+                    del self._totals[market]   # nothing left in it: drop the residue too
+
+    def _freeze(self, frozen_now, query_fn, write_fn):
+        if write_fn is None or not frozen_now:
+            self._frozen.update(frozen_now)
+            return
+        now = datetime.utcnow()
+        rows = [(wid, self.league, et, el, weight, now)
+                for wid, weights in frozen_now.items() for (et, el), weight in weights]
+        for lo in range(0, len(rows), IDS_PER_QUERY):
+            write_fn(INSERT_SETTLED_ALLOCATION, rows[lo:lo + IDS_PER_QUERY])
+        # INSERT IGNORE keeps whichever process froze a wager first: cache the stored weights
+        wager_ids = sorted(frozen_now)
+        for lo in range(0, len(wager_ids), IDS_PER_QUERY):
+            chunk = wager_ids[lo:lo + IDS_PER_QUERY]
+            self._add_frozen(query_fn(SETTLED_ALLOCATION_BY_ID_QUERY.format(ids=",".join(["%s"] * len(chunk))),
+                                      (self.league, *chunk)))
+
+    # ───────────────  refreshing  ───────────────
+    def refresh(self, query_fn, resolve_odds, write_fn=None, resolve_settled=None):
+        """
+        Bring the totals up to date. `query_fn(query, params)` returns dict rows
+        from betting_db; `resolve_odds(legs)` returns {leg: (dec, prob)} for a
+        set of (EventType, EventLabel, ParticipantName) legs (resolve_best_odds);
+        `write_fn(query, rows)` runs a statement on betting_db, once per row of
+        `rows` (or once when None), and persists the frozen settled weights.
+        `resolve_settled(legs)` prices the legs of settled wagers about to be
+        frozen and returns ({leg: (dec, prob)}, legs whose odds could not be
+        read); by default it is resolve_odds with nothing missing.
+        """
+        if resolve_settled is None:
+            resolve_settled = lambda legs: (resolve_odds(legs), set())
+        with self._lock:
+            t0 = time.perf_counter()
+            if self._frozen is None:
+                self._read_frozen(query_fn, write_fn)
+            bets = {r["WagerID"]: _bet_state(r)
+                    for r in query_fn(BETS_QUERY, (self.bankroll, self.league)) or []}
+
+            gone = self._bets.keys() - bets.keys()
+            changed = {wid for wid, state in bets.items() if self._bets.get(wid) != state}
+            self._read_legs(query_fn, bets.keys() - self._legs.keys())
+            for wid in gone:
+                self._forget(wid)
+            self._bets = bets
+
+            # only the active book and not-yet-frozen settled wagers need lines
+            active  = {wid for wid in bets if bets[wid][0] not in SETTLED_WLCA}
+            pending = {wid for wid in bets if self._priced(wid)} - active
+            odds    = resolve_odds({leg for wid in active for leg in self._legs.get(wid, ())})
+            settled_odds, missing = {}, set()
+            if pending:
+                settled_odds, missing = resolve_settled({leg for wid in pending for leg in self._legs.get(wid, ())})
+            moved = {leg for leg, quote in odds.items() if self._odds.get(leg) != quote}
+            dirty = changed | gone | pending
+            for leg in moved:
+                dirty |= self._wagers_by_leg[leg] & active
+
+            full = not self._contrib or len(dirty) > self.rebuild_fraction * max(len(bets), 1)
+            if full:
+                self._totals, self._contrib = {}, {}
+                dirty = set(bets)
+            else:
+                self._apply({wid: self._contrib.pop(wid) for wid in dirty if wid in self._contrib}, -1)
+
+            fresh, _ = self._contributions([wid for wid in dirty if wid in bets and wid not in pending], odds)
+            settled, frozen_now = self._contributions(sorted(pending), settled_odds, missing)
+            fresh.update(settled)
+            if frozen_now:
+                # allocate the just-frozen wagers from the weights actually stored
+                self._freeze(frozen_now, query_fn, write_fn)
+                fresh.update(self._contributions(list(frozen_now), settled_odds)[0])
+            self._apply(fresh, +1)
+            self._contrib.update(fresh)
+            self._odds = odds
+            self.last_refresh = {"mode": "full" if full else "incremental", "wagers": len(bets),
+                                 "dirty_wagers": len(dirty), "priced_legs": len(odds) + len(settled_odds),
+                                 "moved_legs": len(moved), "frozen_now": len(frozen_now),
+                                 "pending": len(pending) - len(frozen_now),
+                                 "seconds": time.perf_counter() - t0}
+        return self
+
+    def totals(self):
+        """
+        (active stake, active expected payout, realized net profit), each
+        {(EventType, EventLabel): $}, in the shape allocate_active /
+        allocate_realized return.
+        """
+        with self._lock:
+            active = {m: t for m, t in self._totals.items() if t[3] > 0}
+            settled = {m: t for m, t in self._totals.items() if t[4] > 0}
+            return ({m: t[0] for m, t in active.items()}, {m: t[1] for m, t in active.items()},
+                    {m: t[2] for m, t in settled.items()})
@@ -0,0 +1,141 @@
+import pandas as pd
+import sqlalchemy
+
+# ──────────────────────  EV HISTORY TABLES  ──────────────────────
+# ev_history            TOTAL EV per day (update_ev.py / ev_dashboard.py)
+# ev_history_market     EV per market per day (backfill_ev.py)
+# ev_market_snapshots   every market of every build_ev_table() snapshot, keyed by
+#                       its timestamp, written in batched executemany round trips
+#
+# With intraday snapshots (ev_dashboard.py --every N) the two daily tables are
+# rollups: a day's rows are its last snapshot, which is what the once-a-day job
+# used to write, so the daily charts keep working unchanged.
+#
+# A market's series is read through the (LeagueName, EventType, EventLabel,
+# snapshot_ts) index, so charting one market never scans the other markets'
+# rows.
+
+BATCH_SIZE = 1000    # rows per executemany round trip
+
+CREATE_MARKET_HISTORY = """
+CREATE TABLE IF NOT EXISTS ev_history_market (
+    snapshot_date        DATE          NOT NULL,
+    LeagueName           VARCHAR(100)  NOT NULL,
+    EventType            VARCHAR(100)  NOT NULL,
+    EventLabel           VARCHAR(100)  NOT NULL,
+    ActiveDollarsAtStake DECIMAL(14,2) NOT NULL,
+    ActiveExpectedPayout DECIMAL(14,2) NOT NULL,
+    RealizedNetProfit    DECIMAL(14,2) NOT NULL,
+    ExpectedValue        DECIMAL(14,2) NOT NULL,
+    PRIMARY KEY (snapshot_date, LeagueName, EventType, EventLabel)
+)
+"""
+
+CREATE_MARKET_SNAPSHOTS = """
+CREATE TABLE IF NOT EXISTS ev_market_snapshots (
+    snapshot_ts          DATETIME      NOT NULL,
+    LeagueName           VARCHAR(100)  NOT NULL,
+    EventType            VARCHAR(100)  NOT NULL,
+    EventLabel           VARCHAR(100)  NOT NULL,
+    ActiveDollarsAtStake DECIMAL(14,2) NOT NULL,
+    ActiveExpectedPayout DECIMAL(14,2) NOT NULL,
+    RealizedNetProfit    DECIMAL(14,2) NOT NULL,
+    ExpectedValue        DECIMAL(14,2) NOT NULL,
+    PRIMARY KEY (snapshot_ts, LeagueName, EventType, EventLabel),
+    KEY market_ts (LeagueName, EventType, EventLabel, snapshot_ts)
+)
+"""
+
+INSERT_MARKET_SNAPSHOT = """
+REPLACE INTO ev_market_snapshots
+    (snapshot_ts, LeagueName, EventType, EventLabel, ActiveDollarsAtStake,
+     ActiveExpectedPayout, RealizedNetProfit, ExpectedValue)
+VALUES (:ts, :lg, :et, :el, :stk, :exp, :npv, :ev)
+"""
+
+MARKET_SERIES_QUERY = """
+SELECT snapshot_ts, ActiveDollarsAtStake, ActiveExpectedPayout,
+       RealizedNetProfit, ExpectedValue
+  FROM ev_market_snapshots
+ WHERE LeagueName = :lg AND EventType = :et AND EventLabel = :el
+   AND snapshot_ts >= :start AND snapshot_ts < :end
+ ORDER BY snapshot_ts
+"""
+
+LATEST_SNAPSHOT_QUERY = """
+SELECT MAX(snapshot_ts)
+  FROM ev_market_snapshots
+ WHERE snapshot_ts >= :start AND snapshot_ts < :end
+"""
+
+ROLLUP_MARKETS = """
+REPLACE INTO ev_history_market
+    (snapshot_date, LeagueName, EventType, EventLabel, ActiveDollarsAtStake,
+     ActiveExpectedPayout, RealizedNetProfit, ExpectedValue)
+SELECT :day, LeagueName, EventType, EventLabel, ActiveDollarsAtStake,
+       ActiveExpectedPayout, RealizedNetProfit, ExpectedValue
+  FROM ev_market_snapshots
+ WHERE snapshot_ts = :ts AND LeagueName <> 'TOTAL'
+"""
+
+ROLLUP_TOTAL = """
+REPLACE INTO ev_history (snapshot_date, expected_value)
+SELECT :day, ExpectedValue
+  FROM ev_market_snapshots
+ WHERE snapshot_ts = :ts AND LeagueName = 'TOTAL'
+"""
+
+MONEY_COLUMNS = ["ActiveDollarsAtStake", "ActiveExpectedPayout", "RealizedNetProfit", "ExpectedValue"]
+
+
+def snapshot_rows(ev_df, snapshot_ts):
+    """One parameter dict per row of a build_ev_table() frame (TOTAL included)."""
+    cols = ev_df[["LeagueName", "EventType", "EventLabel", *MONEY_COLUMNS]]
+    return [{"ts": snapshot_ts, "lg": lg, "et": et or "", "el": el or "",
+             "stk": round(float(stk), 2), "exp": round(float(exp), 2),
+             "npv": round(float(npv), 2), "ev": round(float(ev), 2)}
+            for lg, et, el, stk, exp, npv, ev in cols.itertuples(index=False, name=None)]
+
+
+def write_market_snapshot(engine, ev_df, snapshot_ts):
+    """Store every market of `ev_df` under `snapshot_ts`, in one transaction."""
+    rows = snapshot_rows(ev_df, snapshot_ts)
+    with engine.begin() as conn:
+        conn.execute(sqlalchemy.text(CREATE_MARKET_SNAPSHOTS))
+        for lo in range(0, len(rows), BATCH_SIZE):
+            conn.execute(sqlalchemy.text(INSERT_MARKET_SNAPSHOT), rows[lo:lo + BATCH_SIZE])
+    return len(rows)
+
+
+def market_history(engine, league, event_type, event_label, start=None, end=None):
+    """
+    One market's snapshots in [start, end) as a DataFrame indexed by
+    snapshot_ts, e.g. `market_history(engine_bet, "NBA", "Championship",
+    "NBA Championship").ExpectedValue.plot()`. The TOTAL series is
+    `market_history(engine, "TOTAL", "", "")`.
+    """
+    params = {"lg": league, "et": event_type, "el": event_label,
+              "start": pd.Timestamp(start or "1900-01-01").to_pydatetime(),
+              "end": pd.Timestamp(end or "9999-12-31").to_pydatetime()}
+    df = pd.read_sql(sqlalchemy.text(MARKET_SERIES_QUERY), engine, params=params, parse_dates=["snapshot_ts"])
+    df[MONEY_COLUMNS] = df[MONEY_COLUMNS].astype(float)
+    return df.set_index("snapshot_ts")
+
+
+def roll_up_day(engine, day):
+    """
+    Rewrite `day`'s ev_history and ev_history_market rows from its last
+    snapshot. Returns that snapshot's timestamp (None if the day has none).
+    """
+    start = pd.Timestamp(day).normalize()
+    with engine.begin() as conn:
+        conn.execute(sqlalchemy.text(CREATE_MARKET_HISTORY))
+        ts = conn.execute(sqlalchemy.text(LATEST_SNAPSHOT_QUERY),
+                          {"start": start.to_pydatetime(),
+                           "end": (start + pd.Timedelta(days=1)).to_pydatetime()}).scalar()
+        if ts is None:
+            return None
+        params = {"day": start.date(), "ts": ts}
+        conn.execute(sqlalchemy.text(ROLLUP_MARKETS), params)
+        conn.execute(sqlalchemy.text(ROLLUP_TOTAL), params)
+    return ts
@@ -0,0 +1,102 @@
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+# ──────────────────────  CONCURRENT FUTURES LOADER  ──────────────────────
+# The futuresdata markets live in one table each, and every caller used to read
+# them one after another. fetch_tables() runs the per-table reads on a bounded
+# thread pool so wall-clock is bounded by the slowest table instead of the sum,
+# gives the whole load one deadline, and reports failures per table instead of
+# letting the first bad table abort everything.
+#
+# `fetch(table)` runs on a worker thread, so it must open its own connection
+# (an SQLAlchemy engine.connect() or a fresh pymysql connection) — DB-API
+# connections are not safe to share across threads. A worker stuck in a read
+# cannot be killed and the interpreter joins it at exit, so futures
+# connections also set the driver's read_timeout (READ_TIMEOUT, passed as
+# pymysql's `read_timeout`): a hung query then ends on its own.
+
+DEFAULT_WORKERS = 6
+DEFAULT_TIMEOUT = 60.0   # seconds for the whole load, counted from submission
+READ_TIMEOUT    = 60     # pymysql read_timeout (seconds) of futures connections
+
+
+class FuturesLoadError(RuntimeError):
+    pass
+
+
+class FuturesLoad:
+    """Outcome of one fetch_tables() call."""
+
+    def __init__(self):
+        self.results   = {}   # table -> whatever fetch(table) returned
+        self.errors    = {}   # table -> exception raised by fetch(table)
+        self.timed_out = []   # tables not done by the load's deadline (started or queued)
+        self.seconds   = {}   # table -> read time (completed tables only)
+        self.wall_seconds = 0.0
+
+    @property
+    def failed(self):
+        return sorted(set(self.errors) | set(self.timed_out))
+
+    @property
+    def ok(self):
+        return not self.failed
+
+    def summary(self):
+        slowest = max(self.seconds.items(), key=lambda kv: kv[1], default=(None, 0.0))
+        text = (f"{len(self.results)} futures tables in {self.wall_seconds:.2f}s "
+                f"(slowest {slowest[0]} {slowest[1]:.2f}s, sum {sum(self.seconds.values()):.2f}s)")
+        if self.timed_out:
+            text += f"; timed out: {', '.join(sorted(self.timed_out))}"
+        if self.errors:
+            text += "; failed: " + ", ".join(f"{t} ({type(e).__name__}: {e})"
+                                             for t, e in sorted(self.errors.items()))
+        return text
+
+    def raise_if_failed(self):
+        """For writers (snapshots, backfills) that must not persist partial numbers."""
+        if not self.ok:
+            raise FuturesLoadError(self.summary())
+
+
+def fetch_tables(fetch, tables, max_workers=DEFAULT_WORKERS, timeout=DEFAULT_TIMEOUT):
+    """
+    Run `fetch(table)` for every table concurrently (at most `max_workers` at a
+    time) and collect the results into a FuturesLoad. Every table not done
+    `timeout` seconds after submission, whether its read started or was still
+    queued behind hung ones, is reported as timed out and its result dropped.
+    A started worker is abandoned, not killed: pair this with a driver read
+    timeout (READ_TIMEOUT) so the query itself also gives up.
+    """
+    load     = FuturesLoad()
+    tables   = list(dict.fromkeys(tables))
+    t0       = time.monotonic()
+    deadline = t0 + timeout
+
+    def run(table):
+        started = time.monotonic()
+        result = fetch(table)
+        return result, time.monotonic() - started
+
+    pool = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(tables) or 1)),
+                              thread_name_prefix="futures")
+    pending = {pool.submit(run, table): table for table in tables}
+    try:
+        while pending:
+            done, _ = wait(pending, timeout=max(0.0, deadline - time.monotonic()),
+                           return_when=FIRST_COMPLETED)
+            for fut in done:
+                table = pending.pop(fut)
+                try:
+                    load.results[table], load.seconds[table] = fut.result()
+                except Exception as exc:   # reported per table, never raised from here
+                    load.errors[table] = exc
+            if pending and time.monotonic() >= deadline:
+                for fut, table in pending.items():
+                    fut.cancel()   # queued reads never start
+                    load.timed_out.append(table)
+                pending.clear()
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+    load.wall_seconds = time.monotonic() - t0
+    return load
@@ -0,0 +1,390 @@
+#!/usr/bin/env python3
+"""
+Local Parquet mirror of the futuresdata market tables.
+
+    python futures_mirror.py sync   [--root DIR] [--tables NBAMVP NBAChampionship ...]
+    python futures_mirror.py status [--root DIR]
+    python futures_mirror.py compact [--root DIR] [--tables ...]   # change-only storage
+    python futures_mirror.py report  [--root DIR] [--tables ...]   # what change-only saves
+    python futures_mirror.py best    [--root DIR] [--tables ...]   # rebuild the best lines
+
+`sync` copies every row newer than each table's high-water mark (the newest
+date_created already mirrored) from the FUT_* database into
+ROOT/<table>/month=YYYY-MM/part-*.parquet and records the new mark in
+ROOT/_state.json. Readers then work off local disk:
+
+    mirror = FuturesMirror("futures_mirror")
+    mirror.read("NBAMVP", "2025-01-01", "2025-03-31")
+    mirror.daily_close("NBAMVP", sportsbook_cols, date(2025, 1, 1), date(2025, 3, 31))
+
+The EV scripts and the tracker apps read through the mirror instead of MySQL
+when the FUTURES_MIRROR env var names its root (see FuturesMirror.from_env).
+`compact` switches tables to change-only storage (odds_series.py): each month
+keeps one row per run of unchanged lines, and later syncs fold their new rows
+into it. read() expands it back transparently.
+
+Next to the raw rows the mirror maintains the best lines of every scrape
+(odds.best_line_frame: longest and shortest price, their books, the implied
+probability and how many books quote), written by the same sync chunk as the
+rows they come from. best_lines() / daily_best() read them without touching
+the books again. Parquet I/O needs pyarrow.
+"""
+import argparse
+import json
+import os
+import shutil
+import threading
+from datetime import datetime
+
+import pandas as pd
+
+from futures_loader import DEFAULT_WORKERS, fetch_tables
+from odds import BEST_LINE_COLUMNS, best_line_frame
+from odds_series import SPORTSBOOK_COLS, compress, compression_report, expand
+
+# ──────────────────────  FUTURES MIRROR  ──────────────────────
+# One directory per market table, one hive-style partition per month of
+# date_created, one Parquet file per sync chunk. A chunk is named after the
+# high-water mark it was read from, so re-running a sync that died before
+# saving its new mark rewrites the same file instead of duplicating rows.
+# The scrapers insert a snapshot's rows with one date_created, so when a chunk
+# hits SYNC_CHUNK_ROWS its newest snapshot may have been cut off by the LIMIT;
+# that snapshot is re-read in full (SNAPSHOT_QUERY) before the mark moves past
+# it, however many rows it has.
+#
+# A change-only month holds runs-<stamp>.parquet and scrapes-<stamp>.parquet
+# (see odds_series.py), <stamp> being the newest part file folded into them.
+# Readers take the newest runs file and only the part files after its stamp,
+# so a compaction that dies half-way never shows a row twice.
+
+MIRROR_ENV        = "FUTURES_MIRROR"
+DEFAULT_ROOT      = "futures_mirror"
+STATE_FILE        = "_state.json"
+BEST_DIR          = "_best"     # ROOT/_best/<table>/month=YYYY-MM/best-*.parquet
+SYNC_CHUNK_ROWS   = 200_000
+SYNC_TIMEOUT      = 3600.0  # seconds for a whole sync; a first sync copies the whole history
+SYNC_READ_TIMEOUT = 600     # pymysql read_timeout: a chunk query may sort a large table first
+EPOCH             = datetime(1900, 1, 1)
+
+SYNC_QUERY = """
+SELECT *
+  FROM {table}
+ WHERE date_created > %s
+ ORDER BY date_created
+ LIMIT %s
+"""
+
+SNAPSHOT_QUERY = """
+SELECT *
+  FROM {table}
+ WHERE date_created = %s
+"""
+
+# every futuresdata table with a date_created column is a market table
+TABLES_QUERY = """
+SELECT TABLE_NAME AS table_name
+  FROM information_schema.COLUMNS
+ WHERE TABLE_SCHEMA = DATABASE() AND COLUMN_NAME = 'date_created'
+ ORDER BY TABLE_NAME
+"""
+
+
+class FuturesMirror:
+    """
+    Reader/writer of a mirror rooted at `root`. Sync from one process at a
+    time; any number of readers can share the files.
+    """
+
+    def __init__(self, root=DEFAULT_ROOT):
+        self.root   = root
+        self._lock  = threading.Lock()
+        self._state = self._load_state()   # table -> {"high_water", "rows", "synced_at"}
+
+    @classmethod
+    def from_env(cls):
+        """The mirror named by $FUTURES_MIRROR, or None to read MySQL."""
+        root = os.environ.get(MIRROR_ENV)
+        return cls(root) if root else None
+
+    # ───────────────  state  ───────────────
+    def _state_path(self):
+        return os.path.join(self.root, STATE_FILE)
+
+    def _load_state(self):
+        try:
+            with open(self._state_path()) as fh:
+                return json.load(fh)
+        except FileNotFoundError:
+            return {}
+
+    def _save_state(self, table, high_water=None, rows=0, **fields):
+        with self._lock:
+            entry = self._state.setdefault(table, {"rows": 0})
+            if high_water is not None:
+                entry["high_water"] = high_water.isoformat(sep=" ")
+                entry["synced_at"] = datetime.utcnow().isoformat(sep=" ", timespec="seconds")
+            entry["rows"] += rows
+            entry.update(fields)
+            os.makedirs(self.root, exist_ok=True)
+            tmp = self._state_path() + ".tmp"
+            with open(tmp, "w") as fh:
+                json.dump(self._state, fh, indent=2, sort_keys=True)
+            os.replace(tmp, self._state_path())   # readers never see a half-written file
+
+    def high_water(self, table):
+        entry = self._state.get(table, {})
+        return pd.Timestamp(entry["high_water"]).to_pydatetime() if "high_water" in entry else EPOCH
+
+    def change_only_cols(self, table):
+        """The book columns of a change-only table, None when stored in full."""
+        return self._state.get(table, {}).get("change_only")
+
+    def tables(self):
+        return sorted(self._state)
+
+    def status(self):
+        return pd.DataFrame([{"table": t, **self._state[t]} for t in self.tables()])
+
+    # ───────────────  sync  ───────────────
+    def _books(self, table, df):
+        return [c for c in self.change_only_cols(table) or SPORTSBOOK_COLS if c in df]
+
+    def _write_best(self, table, month, df, name):
+        folder = os.path.join(self.root, BEST_DIR, table, f"month={month}")
+        os.makedirs(folder, exist_ok=True)
+        best_line_frame(df, self._books(table, df)).to_parquet(os.path.join(folder, name), index=False)
+
+    def _write_chunk(self, table, df, mark):
+        stamp = pd.Timestamp(mark).strftime("%Y%m%dT%H%M%S%f")
+        month = pd.to_datetime(df["date_created"]).dt.strftime("%Y-%m")
+        for m, part in df.groupby(month, sort=True):
+            folder = os.path.join(self.root, table, f"month={m}")
+            os.makedirs(folder, exist_ok=True)
+            part.to_parquet(os.path.join(folder, f"part-{stamp}.parquet"), index=False)
+            self._write_best(table, m, part, f"best-{stamp}.parquet")
+        return set(month.unique())
+
+    def sync_table(self, query_fn, table, chunk_rows=SYNC_CHUNK_ROWS):
+        """
+        Mirror `table`'s rows newer than its high-water mark. `query_fn(query,
+        params)` returns dict rows (%s placeholders) on its own connection.
+        Returns the number of rows added.
+        """
+        if not self._state.get(table, {}).get("best_lines"):
+            self.rebuild_best(table)   # mirrored before the best lines existed
+        added, months = 0, set()
+        while True:
+            mark = self.high_water(table)
+            df = pd.DataFrame(list(query_fn(SYNC_QUERY.format(table=table), (mark, chunk_rows))))
+            if df.empty:
+                break
+            full = len(df) >= chunk_rows
+            ts = pd.to_datetime(df["date_created"])
+            newest = ts.max().to_pydatetime()
+            if full:
+                # the LIMIT may have cut the newest snapshot short: take all of it
+                rest = pd.DataFrame(list(query_fn(SNAPSHOT_QUERY.format(table=table), (newest,))))
+                df = pd.concat([df[ts < ts.max()], rest], ignore_index=True)
+            months |= self._write_chunk(table, df, mark)
+            self._save_state(table, newest, len(df))
+            added += len(df)
+            if not full:
+                break
+        cols = self.change_only_cols(table)
+        if cols:
+            for m in sorted(months):
+                self._compact_month(os.path.join(self.root, table, f"month={m}"), cols)
+        return added
+
+    def sync(self, query_fn, tables=None, max_workers=DEFAULT_WORKERS, timeout=SYNC_TIMEOUT):
+        """
+        Sync `tables` (default: every market table in futuresdata) concurrently.
+        Returns the FuturesLoad; `results` maps table -> rows added.
+        """
+        if tables is None:
+            tables = [r["table_name"] for r in query_fn(TABLES_QUERY, ())]
+        return fetch_tables(lambda table: self.sync_table(query_fn, table), tables,
+                            max_workers=max_workers, timeout=timeout)
+
+    # ───────────────  change-only storage  ───────────────
+    def _compact_month(self, folder, cols):
+        _, parts = _month_files(folder)
+        if not parts:
+            return
+        stamp = _stamp(parts[-1])
+        runs, grid = compress(self._read_month(folder, None, cols), cols)
+        grid.to_frame(index=False).to_parquet(os.path.join(folder, f"scrapes-{stamp}.parquet"), index=False)
+        runs.to_parquet(os.path.join(folder, f"runs-{stamp}.parquet"), index=False)
+        # the new runs file is in place: everything it folded in can go
+        for f in os.listdir(folder):
+            folded = f.startswith("part-") and _stamp(f) <= stamp
+            stale = f.startswith(("runs-", "scrapes-")) and _stamp(f) < stamp
+            if folded or stale:
+                os.remove(os.path.join(folder, f))
+
+    def compact(self, table, cols=SPORTSBOOK_COLS):
+        """
+        Switch `table` to change-only storage over the book columns `cols`
+        (other columns are dropped) and compact every month it has.
+        """
+        self._save_state(table, change_only=list(cols))
+        for folder in self._months(table, None, None):
+            self._compact_month(folder, list(cols))
+
+    # ───────────────  best lines  ───────────────
+    def rebuild_best(self, table):
+        """Recompute `table`'s best lines from its mirrored rows."""
+        shutil.rmtree(os.path.join(self.root, BEST_DIR, table), ignore_errors=True)
+        cols = self.change_only_cols(table) or SPORTSBOOK_COLS
+        for folder in self._months(table, None, None):
+            df = self._read_month(folder, None, cols)
+            if not df.empty:
+                self._write_best(table, os.path.basename(folder)[len("month="):], df, "best-base.parquet")
+        self._save_state(table, best_lines=True)
+
+    def best_lines(self, table, start=None, end=None):
+        """
+        BEST_LINE_COLUMNS of every mirrored scrape of `table` with start <=
+        date_created <= end, oldest first.
+        """
+        folders = self._months(os.path.join(BEST_DIR, table), start, end)
+        parts = [pd.read_parquet(os.path.join(folder, f)) for folder in folders
+                 for f in sorted(os.listdir(folder)) if f.endswith(".parquet")]
+        return _in_range([p for p in parts if not p.empty], BEST_LINE_COLUMNS, start, end)
+
+    def daily_best(self, table, start_date, end_date):
+        """best_lines() of each team's last scrape per day, with a `date` column."""
+        df = self.best_lines(table, f"{start_date} 00:00:00", f"{end_date} 23:59:59")
+        df["date"] = df["date_created"].dt.date
+        return (df.drop_duplicates(["team_name", "date"], keep="last")
+                  .sort_values(["team_name", "date"]).reset_index(drop=True))
+
+    # ───────────────  reading  ───────────────
+    def _read_month(self, folder, columns, cols):
+        runs_stamp, parts = _month_files(folder)
+        frames = []
+        if runs_stamp is not None:
+            full = expand(pd.read_parquet(os.path.join(folder, f"runs-{runs_stamp}.parquet")),
+                          pd.read_parquet(os.path.join(folder, f"scrapes-{runs_stamp}.parquet"))["date_created"],
+                          cols)
+            frames.append(full if columns is None else full[[c for c in columns if c in full]])
+        frames += [pd.read_parquet(os.path.join(folder, f), columns=columns) for f in parts]
+        frames = [f for f in frames if not f.empty]
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=columns)
+
+    def _months(self, table, start, end):
+        folder = os.path.join(self.root, table)
+        if not os.path.isdir(folder):
+            return []
+        lo = pd.Timestamp(start).strftime("%Y-%m") if start is not None else ""
+        hi = pd.Timestamp(end).strftime("%Y-%m") if end is not None else "9999-99"
+        return [os.path.join(folder, d) for d in sorted(os.listdir(folder))
+                if d.startswith("month=") and lo <= d[len("month="):] <= hi]
+
+    def read(self, table, start=None, end=None, columns=None):
+        """
+        Rows of `table` with start <= date_created <= end (either bound may be
+        None), oldest first. Only the month partitions overlapping the range
+        are opened; `columns` limits the columns read (date_created is always
+        included).
+        """
+        if columns is not None and "date_created" not in columns:
+            columns = ["date_created", *columns]
+        cols = self.change_only_cols(table) or SPORTSBOOK_COLS
+        parts = [self._read_month(folder, columns, cols) for folder in self._months(table, start, end)]
+        return _in_range([p for p in parts if not p.empty], columns or ["team_name", "date_created"], start, end)
+
+    def daily_close(self, table, cols, start_date, end_date):
+        """Same frame as daily_close.read_daily_close, off local disk."""
+        df = self.read(table, f"{start_date} 00:00:00", f"{end_date} 23:59:59",
+                       columns=["team_name", *cols])
+        df["date"] = df["date_created"].dt.date
+        last = df.drop_duplicates(["team_name", "date"], keep="last")
+        return (last[["team_name", "date", "date_created", *cols]]
+                .sort_values(["team_name", "date"]).reset_index(drop=True))
+
+
+def _in_range(parts, columns, start, end):
+    df = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=columns)
+    df["date_created"] = pd.to_datetime(df["date_created"])
+    keep = pd.Series(True, index=df.index)
+    if start is not None:
+        keep &= df["date_created"] >= pd.Timestamp(start)
+    if end is not None:
+        keep &= df["date_created"] <= pd.Timestamp(end)
+    return df[keep].sort_values("date_created", kind="stable").reset_index(drop=True)
+
+
+def _stamp(filename):
+    return filename.rsplit("-", 1)[1][:-len(".parquet")]
+
+
+def _month_files(folder):
+    """(stamp of the newest runs file or None, part files not folded into it)."""
+    files = sorted(f for f in os.listdir(folder) if f.endswith(".parquet"))
+    stamps = [_stamp(f) for f in files
+              if f.startswith("runs-") and f"scrapes-{_stamp(f)}.parquet" in files]
+    runs_stamp = max(stamps, default=None)
+    parts = [f for f in files if f.startswith("part-") and (runs_stamp is None or _stamp(f) > runs_stamp)]
+    return runs_stamp, parts
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# CLI
+# ─────────────────────────────────────────────────────────────────────────────
+def _fut_query_fn():
+    from urllib.parse import quote_plus
+
+    import sqlalchemy
+
+    engine = sqlalchemy.create_engine(
+        f"mysql+pymysql://{os.environ['FUT_USER']}:{quote_plus(os.environ['FUT_PW'])}"
+        f"@{os.environ['FUT_HOST']}/{os.environ['FUT_DB']}",
+        connect_args={"read_timeout": SYNC_READ_TIMEOUT},
+    )
+
+    def query_fn(query, params):
+        # one connection per call: sync runs tables on worker threads
+        with engine.connect() as conn:
+            return conn.exec_driver_sql(query, params).mappings().all()
+    return query_fn
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("command", choices=["sync", "status", "compact", "report", "best"])
+    parser.add_argument("--root", default=os.environ.get(MIRROR_ENV, DEFAULT_ROOT))
+    parser.add_argument("--tables", nargs="*", help="market tables (default: all)")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    args = parser.parse_args()
+
+    mirror = FuturesMirror(args.root)
+    if args.command == "sync":
+        load = mirror.sync(_fut_query_fn(), args.tables or None, max_workers=args.workers)
+        for table, added in sorted(load.results.items()):
+            print(f"  {table:<28} +{added:,} rows (through {mirror.high_water(table)})")
+        print(f"🗄️  {load.summary()}")
+        load.raise_if_failed()
+    elif args.command == "compact":
+        for table in args.tables or mirror.tables():
+            mirror.compact(table)
+            print(f"  {table:<28} change-only")
+    elif args.command == "best":
+        for table in args.tables or mirror.tables():
+            mirror.rebuild_best(table)
+            print(f"  {table:<28} best lines rebuilt")
+    elif args.command == "report":
+        lines = []
+        for table in args.tables or mirror.tables():
+            r = compression_report(mirror.read(table), mirror.change_only_cols(table) or SPORTSBOOK_COLS)
+            lines.append({"table": table, "rows": r["rows"], "runs": r["runs"],
+                          "rows ×": round(r["row_ratio"], 1),
+                          "cells ×": round(r["cells"] / max(r["stored_cells"], 1), 1),
+                          "MiB full": round(r["raw_bytes"] / 2**20, 2),
+                          "MiB change-only": round(r["change_only_bytes"] / 2**20, 2),
+                          "read full s": round(r["raw_read_s"], 3),
+                          "read change-only s": round(r["change_only_read_s"], 3),
+                          "lossless": r["lossless"]})
+        print(pd.DataFrame(lines).to_string(index=False))
+    else:
+        print(mirror.status().to_string(index=False) if mirror.tables() else f"{args.root}: empty mirror")
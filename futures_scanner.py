@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Cross-book arbitrage and outlier scan of the latest snapshot of every futures
+market in futures_table_map.
+
+    python futures_scanner.py [--dry-run] [--outlier-logit 0.5] [--min-books 3]
+
+Per market, from the newest scrape of its table:
+
+* overround = Σ over teams of the best line's implied probability, minus 1.
+  Below 0 the market is an arbitrage: backing every team at its best book in
+  proportion to that probability pays 1 / (1 + overround) - 1 whatever wins.
+  This is only meaningful when the table lists the whole field.
+* a book's quote is an outlier when its log-odds are more than
+  `outlier_logit` away from the median of the books quoting that team (with
+  at least `min_books` quoting). Its edge is the expected return per $1 at
+  that book against the consensus, de-vigged across the market.
+
+Results go to futures_scan_markets / futures_scan_flags in betting_db (the
+"Futures Scanner" page of app.py). Reads the local futures mirror when
+FUTURES_MIRROR is set.
+"""
+import argparse
+import time
+import warnings
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import sqlalchemy
+
+from ev_history import BATCH_SIZE
+from futures_loader import fetch_tables
+from futures_mirror import FuturesMirror
+from odds import american_to_decimal, american_to_prob, best_line, odds_matrix
+from update_ev import engine_bet, engine_fut, futures_table_map, sportsbook_cols
+
+OUTLIER_LOGIT = 0.5   # |log-odds - consensus log-odds| above which a quote is flagged
+MIN_BOOKS     = 3     # books that must quote a team before any of them can be an outlier
+
+LATEST_SNAPSHOT_QUERY = """
+SELECT team_name, date_created, {cols}
+  FROM {table}
+ WHERE date_created = (SELECT MAX(date_created) FROM {table})
+"""
+
+CREATE_SCAN_MARKETS = """
+CREATE TABLE IF NOT EXISTS futures_scan_markets (
+    scan_ts      DATETIME      NOT NULL,
+    table_name   VARCHAR(100)  NOT NULL,
+    snapshot_ts  DATETIME      NOT NULL,
+    n_teams      INT           NOT NULL,
+    overround    DOUBLE        NOT NULL,
+    arb_margin   DOUBLE        NOT NULL,
+    n_outliers   INT           NOT NULL,
+    PRIMARY KEY (scan_ts, table_name)
+)
+"""
+
+CREATE_SCAN_FLAGS = """
+CREATE TABLE IF NOT EXISTS futures_scan_flags (
+    scan_ts         DATETIME      NOT NULL,
+    table_name      VARCHAR(100)  NOT NULL,
+    team_name       VARCHAR(100)  NOT NULL,
+    book            VARCHAR(32)   NOT NULL,
+    kind            VARCHAR(16)   NOT NULL,
+    american        INT           NOT NULL,
+    prob            DOUBLE        NOT NULL,
+    consensus_prob  DOUBLE        NULL,
+    fair_prob       DOUBLE        NULL,
+    edge            DOUBLE        NULL,
+    stake_share     DOUBLE        NULL,
+    PRIMARY KEY (scan_ts, table_name, team_name, book, kind)
+)
+"""
+
+INSERT_SCAN_MARKET = """
+REPLACE INTO futures_scan_markets
+    (scan_ts, table_name, snapshot_ts, n_teams, overround, arb_margin, n_outliers)
+VALUES (:scan_ts, :table_name, :snapshot_ts, :n_teams, :overround, :arb_margin, :n_outliers)
+"""
+
+INSERT_SCAN_FLAG = """
+REPLACE INTO futures_scan_flags
+    (scan_ts, table_name, team_name, book, kind, american, prob, consensus_prob,
+     fair_prob, edge, stake_share)
+VALUES (:scan_ts, :table_name, :team_name, :book, :kind, :american, :prob, :consensus_prob,
+        :fair_prob, :edge, :stake_share)
+"""
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 1) Latest snapshot of every market
+# ─────────────────────────────────────────────────────────────────────────────
+def load_snapshots(tables, cols):
+    """{table: rows of its newest scrape}, off the mirror when there is one."""
+    mirror = FuturesMirror.from_env()
+
+    def fetch(table):
+        if mirror is not None:
+            return mirror.read(table, start=mirror.high_water(table), columns=["team_name", *cols])
+        with engine_fut.connect() as conn:
+            return pd.DataFrame(conn.exec_driver_sql(
+                LATEST_SNAPSHOT_QUERY.format(cols=", ".join(cols), table=table)).mappings().all())
+
+    load = fetch_tables(fetch, tables)
+    load.raise_if_failed()   # a partial sweep would under-count overrounds silently
+    return load.results
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 2) One vectorized pass over the stacked team × book matrix
+# ─────────────────────────────────────────────────────────────────────────────
+def _logit(p):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.log(p / (1 - p))
+
+
+def scan(snapshots, cols, outlier_logit=OUTLIER_LOGIT, min_books=MIN_BOOKS):
+    """
+    (markets, flags) DataFrames for {table: snapshot rows}. Every market's
+    teams are stacked into one (teams × books) matrix and per-market sums are
+    bincounts over the market code, so the sweep does not loop over markets.
+    """
+    frames = [df.assign(table_name=table) for table, df in snapshots.items() if len(df)]
+    if not frames:
+        return pd.DataFrame(), pd.DataFrame()
+    rows = pd.concat(frames, ignore_index=True)
+    market, tables = pd.factorize(rows["table_name"])
+    n_markets = len(tables)
+
+    quotes = odds_matrix(rows, cols)
+    quoted = quotes != 0
+    prob = np.where(quoted, american_to_prob(quotes), np.nan)
+    dec = american_to_decimal(quotes)
+    n_books = quoted.sum(axis=1)
+
+    # market overround from each team's best (longest) line
+    best, best_book = best_line(quotes)
+    best_prob = american_to_prob(best)
+    prob_sum = np.bincount(market, weights=best_prob, minlength=n_markets)
+    overround = prob_sum - 1
+    arb_margin = np.where(prob_sum > 0, 1 / np.where(prob_sum > 0, prob_sum, 1) - 1, 0.0)
+
+    # consensus per team, de-vigged across its market
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)   # teams no book quotes
+        consensus = np.nanmedian(prob, axis=1)
+    consensus = np.where(n_books > 0, consensus, np.nan)
+    cons_sum = np.bincount(market, weights=np.nan_to_num(consensus), minlength=n_markets)
+    fair = consensus / np.where(cons_sum > 0, cons_sum, 1)[market]
+    edge = fair[:, None] * dec - 1
+    outlier = (quoted & (n_books >= min_books)[:, None]
+               & (np.abs(_logit(prob) - _logit(consensus)[:, None]) > outlier_logit))
+
+    n_outliers = np.bincount(market, weights=outlier.sum(axis=1), minlength=n_markets)
+    snapshot_ts = pd.to_datetime(rows["date_created"]).groupby(market).max()
+    markets = pd.DataFrame({
+        "table_name":  tables,
+        "snapshot_ts": snapshot_ts.reindex(range(n_markets)).to_numpy(),
+        "n_teams":     np.bincount(market, weights=n_books > 0, minlength=n_markets).astype(int),
+        "overround":   overround,
+        "arb_margin":  arb_margin,
+        "n_outliers":  n_outliers.astype(int),
+    })
+
+    books = np.asarray(cols, dtype=object)
+    r, b = np.nonzero(outlier)
+    flags = [pd.DataFrame({
+        "table_name": rows["table_name"].to_numpy()[r], "team_name": rows["team_name"].to_numpy()[r],
+        "book": books[b], "kind": "outlier", "american": quotes[r, b], "prob": prob[r, b],
+        "consensus_prob": consensus[r], "fair_prob": fair[r], "edge": edge[r, b], "stake_share": np.nan,
+    })]
+    # the legs of every arbitrage: each quoted team at its best book
+    r = np.flatnonzero((overround[market] < 0) & (best_book >= 0))
+    flags.append(pd.DataFrame({
+        "table_name": rows["table_name"].to_numpy()[r], "team_name": rows["team_name"].to_numpy()[r],
+        "book": books[best_book[r]], "kind": "arbitrage", "american": best[r], "prob": best_prob[r],
+        "consensus_prob": consensus[r], "fair_prob": fair[r], "edge": edge[r, best_book[r]],
+        "stake_share": best_prob[r] / prob_sum[market[r]],
+    }))
+    flags = pd.concat([f for f in flags if len(f)] or flags, ignore_index=True)
+    return markets, flags
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 3) Write
+# ─────────────────────────────────────────────────────────────────────────────
+def _records(df, scan_ts):
+    out = df.astype(object)
+    return [{**r, "scan_ts": scan_ts} for r in out.where(pd.notna(out), None).to_dict("records")]
+
+
+def write_scan(markets, flags, scan_ts):
+    market_rows = _records(markets, scan_ts)
+    for r in market_rows:
+        r["snapshot_ts"] = pd.Timestamp(r["snapshot_ts"]).to_pydatetime()
+    with engine_bet.begin() as conn:
+        conn.execute(sqlalchemy.text(CREATE_SCAN_MARKETS))
+        conn.execute(sqlalchemy.text(CREATE_SCAN_FLAGS))
+        conn.execute(sqlalchemy.text(INSERT_SCAN_MARKET), market_rows)
+        flag_rows = _records(flags, scan_ts)
+        for lo in range(0, len(flag_rows), BATCH_SIZE):
+            conn.execute(sqlalchemy.text(INSERT_SCAN_FLAG), flag_rows[lo:lo + BATCH_SIZE])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--outlier-logit", type=float, default=OUTLIER_LOGIT)
+    parser.add_argument("--min-books", type=int, default=MIN_BOOKS)
+    parser.add_argument("--dry-run", action="store_true", help="scan and print, don't write")
+    args = parser.parse_args()
+
+    scan_ts = datetime.utcnow().replace(microsecond=0)
+    t0 = time.perf_counter()
+    snapshots = load_snapshots(futures_table_map.values(), sportsbook_cols)
+    t1 = time.perf_counter()
+    markets, flags = scan(snapshots, sportsbook_cols, args.outlier_logit, args.min_books)
+    t2 = time.perf_counter()
+
+    print(markets.sort_values("overround").to_string(index=False))
+    n_arb = int((markets["overround"] < 0).sum()) if len(markets) else 0
+    print(f"🔎  {len(markets)} markets scanned in {t2 - t1:.3f}s (load {t1 - t0:.2f}s): "
+          f"{n_arb} arbitrage, {int((flags['kind'] == 'outlier').sum()) if len(flags) else 0} outlier quotes")
+    if not args.dry_run and len(markets):
+        write_scan(markets, flags, scan_ts)
+        print(f"✅  futures_scan_markets / futures_scan_flags written for {scan_ts}.")
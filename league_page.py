@@ -0,0 +1,216 @@
+import matplotlib.pyplot as plt
+import streamlit as st
+
+# ──────────────────────  LEAGUE CHART PAGES  ──────────────────────
+# The NBA / NCAAB / NHL / NFL / MLB chart pages share one layout: active principal
+# by EventType, EventType + EventLabel dropdowns, the straight-bet participant
+# chart and the parlay charts. A LeaguePage holds what differs per league and
+# renders everything from the cached Portfolio, so a dropdown change only
+# filters that league's legs in memory and never touches the database.
+
+PASTEL_COLORS = ['#a0d8f1', '#f4a261', '#e76f51', '#8ecae6', '#219ebc',
+                 '#023047', '#ffb703', '#fb8500', '#d4a5a5', '#9ab0a8']
+
+
+def _frame_axes(ax):
+    # Add horizontal line at y=0, white background and a black border
+    ax.axhline(0, color='black', linewidth=0.8)
+    ax.set_facecolor('white')
+    for spine in ax.spines.values():
+        spine.set_edgecolor('black')
+        spine.set_linewidth(1.2)
+
+
+class LeaguePage:
+    """
+    One league's chart page.
+
+    * `wlca_filter=True` adds the Active/All radio, lists every EventType the
+      league has ever had and draws the breakeven line (NFL)
+    * `stake_labels` is "implied" (implied probability under the stake bars) or
+      "stake" (the stake itself)
+    * `parlay_header=None` leaves out the parlay section; `parlay_excluded`
+      maps an EventType to participants hidden from its parlay charts
+    * `stop_on_empty=True` ends the page (st.stop) when no EventLabel is
+      selected or the straight-bet chart has no data, as the NBA page always
+      did; otherwise the page warns and goes on to the parlay charts
+    """
+
+    def __init__(self, league, title, parlay_header=None, straight_only=False,
+                 event_type_title='Active Principal by EventType (GAII)',
+                 straight_title='Active Principal & Potential Payout (Straight Bets Only)',
+                 wlca_filter=False, stake_labels="implied", payout_color='beige',
+                 payout_label_rotation=45, ylabel='USD ($) in MM', ylim_pad=(35000, 80000),
+                 parlay_excluded=None, stop_on_empty=False):
+        self.league                = league
+        self.title                 = title
+        self.parlay_header         = parlay_header
+        self.straight_only         = straight_only
+        self.event_type_title      = event_type_title
+        self.straight_title        = straight_title
+        self.wlca_filter           = wlca_filter
+        self.stake_labels          = stake_labels
+        self.payout_color          = payout_color
+        self.payout_label_rotation = payout_label_rotation
+        self.ylabel                = ylabel
+        self.ylim_pad              = ylim_pad
+        self.parlay_excluded       = parlay_excluded or {}
+        self.stop_on_empty         = stop_on_empty
+
+    # ───────────────  charts  ───────────────
+    def event_type_chart(self, portfolio):
+        df = portfolio.active_principal_by_event_type(self.league, straight_only=self.straight_only)
+        df['TotalDollarsAtStake'] = df['TotalDollarsAtStake'].astype(float).round(0)
+        df = df.sort_values('TotalDollarsAtStake', ascending=True)
+
+        fig, ax = plt.subplots(figsize=(15, 10))
+        bars = ax.bar(df['EventType'], df['TotalDollarsAtStake'],
+                      color=[PASTEL_COLORS[i % len(PASTEL_COLORS)] for i in range(len(df))],
+                      width=0.6, edgecolor='black')
+        ax.set_title(self.event_type_title, fontsize=18, fontweight='bold')
+        ax.set_ylabel('Total Dollars At Stake ($)', fontsize=14, fontweight='bold')
+
+        # Annotate each bar with the value (no dollar sign)
+        for bar in bars:
+            height = bar.get_height()
+            ax.annotate(f'{height:,.0f}', xy=(bar.get_x() + bar.get_width() / 2, height),
+                        xytext=(0, 3), textcoords="offset points",
+                        ha='center', va='bottom', fontsize=14, fontweight='bold', color='black')
+
+        plt.xticks(rotation=45, ha='right', fontsize=14, fontweight='bold')
+        _frame_axes(ax)
+        plt.tight_layout()
+        st.pyplot(fig)
+        return df
+
+    def straight_chart(self, portfolio, wlca, event_type, event_label, wlca_label=None, breakeven=None):
+        df = portfolio.straight_positions(self.league, wlca=wlca, EventType=event_type,
+                                          EventLabel=event_label)
+        if df.empty:
+            st.warning("No data for selected filters.")
+            if self.stop_on_empty:
+                st.stop()
+            return
+
+        df['ImpliedProbability'] = (df['TotalDollarsAtStake'] / df['TotalPotentialPayout']) * 100
+
+        # Stake drawn downward from the x-axis, potential payout upward
+        df['TotalDollarsAtStake'] = -df['TotalDollarsAtStake'].astype(float).round(0)
+        df['TotalPotentialPayout'] = df['TotalPotentialPayout'].astype(float).round(0)
+        df = df.sort_values('TotalDollarsAtStake', ascending=True)
+
+        fig, ax = plt.subplots(figsize=(18, 12))
+        bars1 = ax.bar(df['ParticipantName'], df['TotalDollarsAtStake'],
+                       color='lightblue', width=0.4, edgecolor='black')
+        bars2 = ax.bar(df['ParticipantName'], df['TotalPotentialPayout'],
+                       color=self.payout_color, width=0.4, edgecolor='black')
+
+        title = self.straight_title if wlca_label is None else f'{self.straight_title} - {wlca_label}'
+        ax.set_ylabel(self.ylabel, fontsize=16, fontweight='bold')
+        ax.set_title(title, fontsize=18, fontweight='bold')
+
+        # Implied probability (or the stake itself) just below each stake bar
+        for i, bar1 in enumerate(bars1):
+            height = bar1.get_height()
+            label = (f"{df.iloc[i]['ImpliedProbability']:.1f}%" if self.stake_labels == "implied"
+                     else f'{abs(height):,.0f}')
+            ax.annotate(label, xy=(bar1.get_x() + bar1.get_width() / 2, height),
+                        xytext=(0, -15), textcoords="offset points",
+                        ha='center', va='bottom', fontsize=12, fontweight='bold', color='black')
+
+        # Potential payout above each payout bar
+        for bar2 in bars2:
+            height2 = bar2.get_height()
+            ax.annotate(f'{height2:,.0f}', xy=(bar2.get_x() + bar2.get_width() / 2, height2),
+                        xytext=(0, 3), textcoords="offset points",
+                        ha='center', va='bottom', fontsize=12, fontweight='bold', color='black',
+                        rotation=self.payout_label_rotation)
+
+        plt.xticks(rotation=45, ha='right', fontsize=14, fontweight='bold')
+        if self.stake_labels == "implied":
+            ax.legend([bars2, bars1], ['Potential Payout', 'Implied Probability (%)'])
+        else:
+            ax.legend([bars2, bars1], ['Potential Payout', 'Active Principal'])
+        if breakeven is not None:
+            ax.axhline(breakeven, color='blue', linestyle='dashed', linewidth=1.5,
+                       label=f'Breakeven: ${breakeven:,.0f}')
+            ax.legend(loc='best', fontsize=18, title_fontsize=18)
+
+        _frame_axes(ax)
+        below, above = self.ylim_pad
+        ax.set_ylim(min(df['TotalDollarsAtStake']) - below, max(df['TotalPotentialPayout']) + above)
+        plt.tight_layout()
+        st.pyplot(fig)
+
+    def _participant_chart(self, df, column, title, ylabel, fmt, color):
+        fig, ax = plt.subplots(figsize=(14, 8))
+        bars = ax.bar(df['ParticipantName'], df[column], color=color, edgecolor='black')
+        ax.set_title(title, fontsize=18, fontweight='bold')
+        ax.set_ylabel(ylabel, fontsize=14, fontweight='bold')
+        plt.xticks(rotation=45, ha='right', fontsize=12, fontweight='bold')
+        for bar in bars:
+            height = bar.get_height()
+            ax.annotate(fmt.format(height), xy=(bar.get_x() + bar.get_width() / 2, height),
+                        xytext=(0, 5), textcoords="offset points",
+                        ha='center', va='bottom', fontsize=12, color='black')
+        _frame_axes(ax)
+        plt.tight_layout()
+        st.pyplot(fig)
+
+    def parlay_charts(self, portfolio, event_type):
+        st.header(self.parlay_header)
+        excluded = self.parlay_excluded.get(event_type, ())
+
+        parlay_df = portfolio.parlay_counts(self.league, event_type)
+        parlay_df = parlay_df[~parlay_df['ParticipantName'].isin(excluded)]
+        if parlay_df.empty:
+            st.warning("No parlay data found for the selected EventType.")
+        else:
+            st.subheader(f"Number of Parlays by Participant for {event_type}")
+            self._participant_chart(parlay_df, 'NumberOfParlays',
+                                    f"Parlay Involvement by Participant for {event_type} (GAII)",
+                                    "Number of Parlays", "{}", 'skyblue')
+
+        parlay_dollars_df = portfolio.parlay_dollars(self.league, event_type)
+        parlay_dollars_df = parlay_dollars_df[~parlay_dollars_df['ParticipantName'].isin(excluded)]
+        if parlay_dollars_df.empty:
+            st.warning("No parlay dollar data found for the selected EventType.")
+        else:
+            st.subheader(f"Total Dollars At Stake in Parlays by Participant for {event_type}")
+            self._participant_chart(parlay_dollars_df, 'TotalDollarsAtStake',
+                                    f"Total Dollars At Stake in Parlays by Participant for {event_type} (GAII)",
+                                    "Total Dollars At Stake ($)", "${:,.0f}", 'lightblue')
+
+    # ───────────────  page  ───────────────
+    def render(self, portfolio):
+        st.title(self.title)
+        first_chart_df = self.event_type_chart(portfolio)
+
+        wlca_label, wlca = None, ("Active",)
+        if self.wlca_filter:
+            wlca_label = st.radio(
+                "Filter by Bet Status",
+                options=["Active", "All"],
+                index=0,  # Default to "Active"
+                help="Choose whether to display Active bets only or include bets with Win, Loss, and Active statuses."
+            )
+            wlca = ("Active",) if wlca_label == "Active" else ("Win", "Loss", "Active")
+            event_types = portfolio.event_types(self.league)
+        else:
+            event_types = first_chart_df.loc[first_chart_df['EventType'] != 'Total', 'EventType'].unique()
+
+        event_type_option = st.selectbox('Select EventType', sorted(event_types))
+        if not event_type_option:
+            st.stop()
+
+        event_label_option = st.selectbox('Select EventLabel',
+                                          portfolio.event_labels(self.league, event_type_option, wlca=wlca))
+        if not event_label_option and self.stop_on_empty:
+            st.stop()
+        if event_label_option:
+            breakeven = portfolio.breakeven(self.league, event_type_option) if self.wlca_filter else None
+            self.straight_chart(portfolio, wlca, event_type_option, event_label_option,
+                                wlca_label=wlca_label, breakeven=breakeven)
+
+        if self.parlay_header:
+            self.parlay_charts(portfolio, event_type_option)
@@ -1,10 +1,12 @@
 import streamlit as st
 import mysql.connector
-import pandas as pd
 import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
 from matplotlib.ticker import PercentFormatter
-from datetime import datetime, timedelta
+from datetime import datetime
+
+from daily_close import DailyCloseCache, daily_prob_matrix, top_k_teams
+from futures_mirror import FuturesMirror
 
 # ────────────────────── CONFIG ──────────────────────
 st.set_page_config(page_title="NBA Futures Probabilities", layout="wide")
@@ -16,14 +18,12 @@ FUTURES_DB = {
     "password": "greenalephadmin",
     "database": "futuresdata"
 }
+ODDS_COLS = ["BetMGM","DraftKings","Caesars","ESPNBet","FanDuel","BallyBet","RiversCasino","Bet365"]
 
-# ────────────────────── UTILS ──────────────────────
-def american_odds_to_probability(odds: int) -> float:
-    if odds > 0:
-        return 100.0 / (odds + 100.0)
-    elif odds < 0:
-        return abs(odds) / (abs(odds) + 100.0)
-    return 0.0
+@st.cache_resource
+def close_cache():
+    """Daily closes of every market viewed, shared by all sessions of this app."""
+    return DailyCloseCache(ODDS_COLS)
 
 # ────────────────────── MAIN STREAMLIT APP ──────────────────────
 def main():
@@ -43,59 +43,42 @@ def main():
     top_k = st.slider("Number of Top Participants to Show", min_value=1, max_value=10, value=5)
     manual_selection_enabled = st.checkbox("Manually select participants")
 
-    # DB Connection
-    conn = mysql.connector.connect(**FUTURES_DB)
-    query = f"""
-    SELECT team_name, date_created,
-           BetMGM, DraftKings, Caesars, ESPNBet, FanDuel, BallyBet, RiversCasino, Bet365
-    FROM {market_table}
-    WHERE date_created BETWEEN %s AND %s
-    ORDER BY team_name, date_created
-    """
-    df = pd.read_sql(query, conn, params=(f"{start_date} 00:00:00", f"{end_date} 23:59:59"))
-    conn.close()
-
-    if df.empty:
-        st.warning("No odds data returned for the selected market.")
-        return
+    refresh = st.button("Refresh odds", help="Read today's snapshots newer than the ones already loaded")
 
-    df['date'] = pd.to_datetime(df['date_created']).dt.date
-    odds_cols = ["BetMGM","DraftKings","Caesars","ESPNBet","FanDuel","BallyBet","RiversCasino","Bet365"]
-    df[odds_cols] = df[odds_cols].apply(pd.to_numeric, errors='coerce').fillna(0)
-    df['best'] = df[odds_cols].replace(0, pd.NA).max(axis=1).fillna(0).astype(int)
-    df['prob'] = df['best'].apply(american_odds_to_probability)
+    # off the local futures mirror when there is one; otherwise only the days
+    # the cache has not seen yet go to the database
+    mirror = FuturesMirror.from_env()
+    if mirror is not None:
+        latest = mirror.daily_best(market_table, start_date, end_date)
+    else:
+        latest = close_cache().closes(lambda: mysql.connector.connect(**FUTURES_DB), market_table,
+                                      start_date, end_date, refresh_tail=refresh)
 
-    latest = df.sort_values(['team_name', 'date']).groupby(['team_name','date']).tail(1)
-    date_range = pd.date_range(start_date, end_date, freq='D')
+    if latest.empty:
+        st.warning("No odds data returned for the selected market.")
+        return
 
-    all_frames = []
-    for name, group in latest.groupby("team_name"):
-        g = group.set_index("date")["prob"].reindex(date_range).ffill()
-        g = g.reset_index().rename(columns={"index": "date"})
-        g["team_name"] = name
-        all_frames.append(g)
-    daily = pd.concat(all_frames)
+    daily = daily_prob_matrix(latest, ODDS_COLS, start_date, end_date)
 
     if manual_selection_enabled:
-        participants = sorted(daily["team_name"].unique().tolist())
+        participants = sorted(daily.columns.tolist())
         selected_participants = st.multiselect("Choose Participants to Display", participants)
         if not selected_participants:
             st.warning("Please select at least one participant.")
             return
         display_set = selected_participants
     else:
-        last_day = daily[daily['date'] == daily['date'].max()]
-        display_set = last_day.sort_values("prob", ascending=False).head(top_k)["team_name"].tolist()
+        display_set = top_k_teams(daily, top_k)
 
     # ... [unchanged code above this point] ...
 
-    daily_top = daily[daily["team_name"].isin(display_set)]
+    daily_top = daily[sorted(display_set)]
 
     fig, ax = plt.subplots(figsize=(12, 6))
-    for name, grp in daily_top.groupby("team_name"):
-        ax.plot(grp["date"], grp["prob"] * 100, label=name, linewidth=2)
+    for name in daily_top.columns:
+        ax.plot(daily_top.index, daily_top[name] * 100, label=name, linewidth=2)
 
-    max_prob = daily_top["prob"].max()
+    max_prob = daily_top.max().max()
     y_max = min(max_prob + 0.05, 1.0) * 100  # 5% headroom, capped at 100%
 
     ax.set_ylim(0, y_max)
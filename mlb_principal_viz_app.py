@@ -1,11 +1,14 @@
 # ─────────────────────  NBA Futures Dashboard: EV Table Page  ──────────────────────
 import streamlit as st
+import numpy as np
 import pandas as pd
-import re
-from collections import defaultdict
 from datetime import datetime
 import traceback
 
+from allocation import allocate_active, allocate_realized
+from odds import american_to_decimal, american_to_prob, best_line, odds_matrix
+from wager_store import WagerStore
+
 # Import pymysql with error handling
 try:
     import pymysql
@@ -89,15 +92,6 @@ def with_cursor(conn):
         st.error(f"Error creating cursor: {str(e)}")
         return None
 
-# ─────────────────  ODDS HELPERS  ────────────────
-def american_odds_to_decimal(o): return 1.0 + (o/100) if o > 0 else 1.0 + 100/abs(o) if o else 1.0
-def american_odds_to_prob(o): return 100/(o+100) if o > 0 else abs(o)/(abs(o)+100) if o else 0.0
-def cast_odds(v):
-    if v in (None, "", 0): return 0
-    if isinstance(v, (int, float)): return int(v)
-    m = re.search(r"[-+]?\d+", str(v))
-    return int(m.group()) if m else 0
-
 # ─────────────────  MAPS  ────────────────────────
 futures_table_map = {
     ("Championship","NBA Championship"): "NBAChampionship",
@@ -131,19 +125,19 @@ team_alias_map = {
 
 sportsbook_cols = ["BetMGM","DraftKings","Caesars","ESPNBet","FanDuel","BallyBet","RiversCasino","Bet365"]
 
-def best_odds_decimal_prob(event_type, event_label, participant, cutoff_dt, fut_conn, vig_map):
-    """Get best odds with error handling"""
+def best_quote(event_type, event_label, participant, cutoff_dt, fut_conn):
+    """Best American quote at or before cutoff_dt, 0 when there is none"""
     if fut_conn is None:
-        return 1.0, 0.0
+        return 0
         
     tbl = futures_table_map.get((event_type, event_label))
-    if not tbl: return 1.0, 0.0
+    if not tbl: return 0
     
     alias = team_alias_map.get(participant, participant)
     
     cursor = with_cursor(fut_conn)
     if cursor is None:
-        return 1.0, 0.0
+        return 0
         
     try:
         cursor.execute(
@@ -156,144 +150,119 @@ def best_odds_decimal_prob(event_type, event_label, participant, cutoff_dt, fut_
         row = cursor.fetchone()
     except Exception as e:
         st.error(f"Error querying odds data: {str(e)}")
-        return 1.0, 0.0
+        return 0
         
-    if not row: return 1.0, 0.0
-    nums = [cast_odds(row.get(c)) for c in sportsbook_cols if row.get(c)]
-    nums = [n for n in nums if n]
-    if not nums: return 1.0, 0.0
-    best = max(nums)
-    dec = american_odds_to_decimal(best)
-    prob = american_odds_to_prob(best)
-    vig = vig_map.get((event_type, event_label), 0.05)
-    return dec, prob * (1 - vig)
+    if not row: return 0
+    # the highest American quote is the longest price, i.e. the lowest implied prob
+    return int(best_line(odds_matrix([row], sportsbook_cols))[0][0])
 
-# ─────────────────  EV TABLE PAGE  ────────────────
-def ev_table_page():
-    try:
-        # Attempt to connect to databases
-        bet_conn = new_betting_conn()
-        fut_conn = new_futures_conn()
-        
-        # Check if either connection failed
-        if bet_conn is None or fut_conn is None:
-            st.warning("⚠️ Unable to connect to one or more databases. Displaying demo data instead.")
-            display_demo_data()
-            return
-            
-        now = datetime.utcnow()
+# ─────────────────  SESSION DATA  ────────────────
+def load_ev_inputs():
+    """
+    (WagerStore, best American quote per leg, time the lines were read) for
+    this session, or None when a database is unreachable. Read once per
+    session (or on Reload): vig changes never come back here.
+    """
+    if "ev_inputs" in st.session_state:
+        return st.session_state["ev_inputs"]
 
-        # Customize Vig
-        st.markdown("### 🧹 Customize Vig by Market")
-        vig_inputs = {}
-        unique_markets = sorted(set((et, el) for et, el in futures_table_map))
-        with st.expander("Set Vig Percentage Per Market", expanded=False):
-            for et, el in unique_markets:
-                key = f"{et}|{el}"
-                percent = st.slider(
-                    label=f"{et} — {el}", min_value=0, max_value=20,
-                    value=5, step=1, key=key
-                )
-                vig_inputs[(et, el)] = percent / 100.0
+    # Attempt to connect to databases
+    bet_conn = new_betting_conn()
+    fut_conn = new_futures_conn()
+    
+    # Check if either connection failed
+    if bet_conn is None or fut_conn is None:
+        return None
 
-        # ------- Active wagers -------
-        sql_active = """
-            SELECT b.WagerID, b.PotentialPayout, b.DollarsAtStake,
+    now = datetime.utcnow()
+    try:
+        # ------- Active + settled wagers, one row per leg -------
+        sql_legs = """
+            SELECT b.WagerID, b.WLCA, b.PotentialPayout, b.DollarsAtStake, b.NetProfit,
                 l.EventType, l.EventLabel, l.ParticipantName
             FROM bets b JOIN legs l ON b.WagerID = l.WagerID
-            WHERE b.WhichBankroll='GreenAleph' AND b.WLCA='Active' AND l.LeagueName='NBA'
+            WHERE b.WhichBankroll='GreenAleph'
+            AND b.WLCA IN ('Active','Win','Loss','Cashout')
+            AND l.LeagueName='NBA'
         """
         
         cursor = with_cursor(bet_conn)
         if cursor is None:
             st.error("Failed to create cursor for betting database")
-            display_demo_data()
-            return
+            return None
             
         try:
-            cursor.execute(sql_active)
+            cursor.execute(sql_legs)
             rows = cursor.fetchall()
         except Exception as e:
-            st.error(f"Error querying active wagers: {str(e)}")
+            st.error(f"Error querying wagers: {str(e)}")
             rows = []
 
-        active_bets = defaultdict(lambda: {"pot":0,"stake":0,"legs":[]})
-        for r in rows:
-            w = active_bets[r["WagerID"]]
-            w["pot"]   = w["pot"]   or float(r["PotentialPayout"] or 0)
-            w["stake"] = w["stake"] or float(r["DollarsAtStake"] or 0)
-            w["legs"].append((r["EventType"], r["EventLabel"], r["ParticipantName"]))
+        store = WagerStore.from_rows(rows)
 
-        active_stake, active_exp = defaultdict(float), defaultdict(float)
-        for data in active_bets.values():
-            pot, stake, legs = data["pot"], data["stake"], data["legs"]
-            decs = []; prob = 1.0
-            for et,el,pn in legs:
-                dec,p = best_odds_decimal_prob(et,el,pn,now,fut_conn,vig_inputs)
-                if p == 0: prob = 0; break
-                decs.append((dec,et,el)); prob *= p
-            if prob == 0: continue
-            expected = pot * prob
-            sum_exc  = sum(d-1 for d,_,_ in decs)
-            if sum_exc <= 0: continue
-            for d,et,el in decs:
-                w = (d-1)/sum_exc
-                active_stake[(et,el)] += w*stake
-                active_exp  [(et,el)] += w*expected
+        # one futures lookup per distinct (market, participant), not per leg
+        quotes = store.leg_values(lambda mkt, pn: best_quote(*mkt, pn, now, fut_conn))
+    finally:
+        # Close database connections
+        bet_conn.close()
+        fut_conn.close()
 
-        # ------- Realised net profit -------
-        sql_real = """
-            SELECT b.WagerID, b.NetProfit,
-                l.EventType, l.EventLabel, l.ParticipantName
-            FROM bets b JOIN legs l ON b.WagerID = l.WagerID
-            WHERE b.WhichBankroll='GreenAleph'
-            AND b.WLCA IN ('Win','Loss','Cashout')
-            AND l.LeagueName='NBA'
-        """
-        
-        try:
-            cursor.execute(sql_real)
-            rows = cursor.fetchall()
-        except Exception as e:
-            st.error(f"Error querying realized profits: {str(e)}")
-            rows = []
+    st.session_state["ev_inputs"] = (store, quotes, now)
+    return st.session_state["ev_inputs"]
 
-        wager_net  = defaultdict(float)
-        wager_legs = defaultdict(list)
-        for r in rows:
-            wager_net [r["WagerID"]] = float(r["NetProfit"] or 0)
-            wager_legs[r["WagerID"]].append((r["EventType"],r["EventLabel"],r["ParticipantName"]))
+# ─────────────────  EV COMPUTE  ──────────────────
+def compute_ev_table(store, quotes, vig_inputs):
+    """Market-level EV for one vig setting, entirely in memory"""
+    # vig only scales the win probability; decimal odds (the weights) don't move
+    leg_vig = np.array([vig_inputs.get(mkt, 0.05) for mkt in store.markets] or [0.0])[store.leg_market]
+    dec  = american_to_decimal(quotes)
+    prob = american_to_prob(quotes) * (1 - leg_vig)
 
-        realized_np = defaultdict(float)
-        for wid,legs in wager_legs.items():
-            net  = wager_net[wid]
-            decs = [(best_odds_decimal_prob(et,el,pn,now,fut_conn,vig_inputs)[0], et, el) for et,el,pn in legs]
-            sum_exc = sum(d-1 for d,_,_ in decs)
-            if sum_exc <= 0: continue
-            for d,et,el in decs:
-                realized_np[(et,el)] += net * ((d-1)/sum_exc)
+    active_stake, active_exp = allocate_active(store, (dec, prob))
+    realized_np = allocate_realized(store, (dec, prob))
 
-        # Close database connections
-        if bet_conn:
-            bet_conn.close()
-        if fut_conn:
-            fut_conn.close()
+    # ------- Assemble dataframe -------
+    keys = set(active_stake)|set(active_exp)|set(realized_np)
+    out  = []
+    for et,el in sorted(keys):
+        stake = active_stake.get((et,el),0)
+        exp   = active_exp.get((et,el),0)
+        net   = realized_np.get((et,el),0)
+        out.append(dict(EventType=et, EventLabel=el,
+                        ActiveDollarsAtStake = round(stake,2),
+                        ActiveExpectedPayout = round(exp  ,2),
+                        RealizedNetProfit    = round(net  ,2),
+                        ExpectedValue        = round(exp-stake+net,2)))
+    return pd.DataFrame(out).sort_values(["EventType","EventLabel"]).reset_index(drop=True)
+
+# ─────────────────  EV TABLE PAGE  ────────────────
+def ev_table_page():
+    try:
+        # Customize Vig
+        st.markdown("### 🧹 Customize Vig by Market")
+        vig_inputs = {}
+        unique_markets = sorted(set((et, el) for et, el in futures_table_map))
+        with st.expander("Set Vig Percentage Per Market", expanded=False):
+            for et, el in unique_markets:
+                key = f"{et}|{el}"
+                percent = st.slider(
+                    label=f"{et} — {el}", min_value=0, max_value=20,
+                    value=5, step=1, key=key
+                )
+                vig_inputs[(et, el)] = percent / 100.0
+
+        if st.button("🔄 Reload wagers & odds"):
+            st.session_state.pop("ev_inputs", None)
 
-        # ------- Assemble dataframe -------
-        keys = set(active_stake)|set(active_exp)|set(realized_np)
-        out  = []
-        for et,el in sorted(keys):
-            stake = active_stake.get((et,el),0)
-            exp   = active_exp.get((et,el),0)
-            net   = realized_np.get((et,el),0)
-            out.append(dict(EventType=et, EventLabel=el,
-                            ActiveDollarsAtStake = round(stake,2),
-                            ActiveExpectedPayout = round(exp  ,2),
-                            RealizedNetProfit    = round(net  ,2),
-                            ExpectedValue        = round(exp-stake+net,2)))
-        df = pd.DataFrame(out).sort_values(["EventType","EventLabel"]).reset_index(drop=True)
+        inputs = load_ev_inputs()
+        if inputs is None:
+            st.warning("⚠️ Unable to connect to one or more databases. Displaying demo data instead.")
+            display_demo_data()
+            return
 
-        display_data(df)
+        store, quotes, loaded_at = inputs
+        st.caption(f"Wagers and lines as of {loaded_at:%Y-%m-%d %H:%M} UTC")
+        display_data(compute_ev_table(store, quotes, vig_inputs))
         
     except Exception as e:
         st.error(f"An unexpected error occurred: {str(e)}")
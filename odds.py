@@ -0,0 +1,133 @@
+import numpy as np
+import pandas as pd
+
+# ──────────────────────  ODDS CONVERSION  ──────────────────────
+# American-odds helpers shared by the EV scripts and dashboards. The array
+# versions work on a whole `sportsbook_cols` block (rows × books) at once; the
+# scalar helpers the pages already call are thin wrappers around them.
+
+_ODDS_PATTERN = r"([-+]?\d+)"
+
+
+def parse_american(values) -> np.ndarray:
+    """
+    American odds as an int64 array of the same shape as `values`.
+
+    Accepts ints, floats, numeric strings ("+150", "-110") and free text that
+    contains a number ("+150 boosted"). None, "", NaN and anything without a
+    number become 0, which every other helper here treats as "no quote".
+    """
+    arr = np.asarray(values)
+    if arr.dtype.kind in "iub":
+        return arr.astype(np.int64)
+    if arr.dtype.kind == "f":
+        return np.nan_to_num(arr, nan=0.0, posinf=0.0, neginf=0.0).astype(np.int64)
+
+    flat = pd.Series(arr.ravel(), dtype=object)
+    num  = pd.to_numeric(flat, errors="coerce")
+    text = num.isna() & flat.notna()
+    if text.any():
+        # only the leftovers pay for the regex
+        num[text] = pd.to_numeric(flat[text].astype(str).str.extract(_ODDS_PATTERN, expand=False),
+                                  errors="coerce")
+    out = num.fillna(0.0).to_numpy(dtype=float)
+    out = np.where(np.isfinite(out), out, 0.0)   # "inf" parses as a number but is no quote
+    return np.trunc(out).astype(np.int64).reshape(arr.shape)
+
+
+def american_to_decimal(odds) -> np.ndarray:
+    """Decimal odds; a 0 (missing) quote maps to 1.0."""
+    o = np.asarray(odds, dtype=float)
+    a = np.abs(o)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(o > 0, 1.0 + o / 100.0,
+                        np.where(o < 0, 1.0 + 100.0 / a, 1.0))
+
+
+def american_to_prob(odds) -> np.ndarray:
+    """Implied probability (vig included); a 0 (missing) quote maps to 0.0."""
+    o = np.asarray(odds, dtype=float)
+    a = np.abs(o)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(o > 0, 100.0 / (o + 100.0),
+                        np.where(o < 0, a / (a + 100.0), 0.0))
+
+
+def odds_matrix(rows, cols) -> np.ndarray:
+    """
+    Parse the `cols` block of futures rows into an int64 (len(rows), len(cols))
+    matrix. `rows` is a DataFrame or a sequence of dict-like rows (pymysql
+    DictCursor rows, SQLAlchemy `.mappings()`, ...).
+    """
+    if isinstance(rows, pd.DataFrame):
+        block = rows.reindex(columns=cols).to_numpy(dtype=object)
+    else:
+        block = np.array([[r.get(c) for c in cols] for r in rows], dtype=object)
+    return parse_american(block.reshape(-1, len(cols)))
+
+
+def best_line(quotes, highest_prob=False):
+    """
+    Best quote per row of a (rows × books) American-odds matrix.
+
+    By default the best line is the one with the lowest implied probability
+    (longest price); `highest_prob=True` picks the shortest price instead.
+    Zeros are ignored. Returns `(best, book)`: the chosen quote per row (0 when
+    the row has no quote) and its column index (-1 when the row has no quote).
+    """
+    q = np.atleast_2d(np.asarray(quotes, dtype=np.int64))
+    p = american_to_prob(q)
+    valid = q != 0
+    if highest_prob:
+        book = np.where(valid, p, -np.inf).argmax(axis=1)
+    else:
+        book = np.where(valid, p, np.inf).argmin(axis=1)
+    has_quote = valid.any(axis=1)
+    best = np.take_along_axis(q, book[:, None], axis=1)[:, 0]
+    return np.where(has_quote, best, 0), np.where(has_quote, book, -1)
+
+
+BEST_LINE_COLUMNS = ["team_name", "date_created", "best_line", "best_book", "best_prob",
+                     "short_line", "short_book", "n_books"]
+
+
+def best_line_frame(rows, cols) -> pd.DataFrame:
+    """
+    The best lines of every futures row (DataFrame or dict rows with
+    team_name, date_created and the `cols` books), as BEST_LINE_COLUMNS:
+
+    * best_line / best_book / best_prob: the longest price (best_line's
+      default) with its book's column name and implied probability
+    * short_line / short_book: the shortest price (highest_prob=True)
+    * n_books: how many books quote it
+
+    A row no book quotes has 0 lines, None books and a 0.0 probability.
+    """
+    df = rows if isinstance(rows, pd.DataFrame) else pd.DataFrame(list(rows))
+    quotes = odds_matrix(df, cols)
+    books = np.array(list(cols) + [None], dtype=object)   # book index -1 -> None
+    best, best_book = best_line(quotes)
+    short, short_book = best_line(quotes, highest_prob=True)
+    return pd.DataFrame({
+        "team_name":    df["team_name"].to_numpy(),
+        "date_created": pd.to_datetime(df["date_created"]).to_numpy(),
+        "best_line":    best,
+        "best_book":    books[best_book],
+        "best_prob":    american_to_prob(best),
+        "short_line":   short,
+        "short_book":   books[short_book],
+        "n_books":      (quotes != 0).sum(axis=1),
+    }, columns=BEST_LINE_COLUMNS)
+
+
+# ───────────────  scalar wrappers  ───────────────
+def american_odds_to_decimal(o: int) -> float:
+    return float(american_to_decimal(o))
+
+
+def american_odds_to_prob(o: int) -> float:
+    return float(american_to_prob(o))
+
+
+def cast_odds(v) -> int:
+    return int(parse_american(np.array([v], dtype=object))[0])
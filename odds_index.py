@@ -0,0 +1,280 @@
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+
+from futures_loader import DEFAULT_TIMEOUT, DEFAULT_WORKERS, fetch_tables
+from odds import american_odds_to_decimal, american_odds_to_prob, best_line, odds_matrix
+
+# ──────────────────────  AS-OF ODDS INDEX  ──────────────────────
+# Point-in-time lookups over the futuresdata tables without going back to MySQL:
+# per (table, team alias) the index keeps the snapshot timestamps in ascending
+# order next to the best line of each snapshot, so "best valid line at or before
+# T" is one binary search. Snapshots where every book is zero are dropped at
+# build time, which is exactly what the row-by-row loops did when they skipped
+# to the next-older row.
+
+INDEX_QUERY = """
+SELECT team_name, date_created, {cols}
+  FROM {table}
+ WHERE date_created >= %s AND date_created <= %s
+"""
+
+# the newest 100 snapshots per team inside the cutoff; the first one with any
+# quote wins
+BEST_QUOTES_QUERY = """
+SELECT team_name, {cols}
+  FROM (
+        SELECT team_name, {cols},
+               ROW_NUMBER() OVER (PARTITION BY team_name
+                                  ORDER BY date_created DESC) AS rn
+          FROM {table}
+         WHERE team_name IN ({aliases})
+           AND {cutoff}
+       ) latest
+ WHERE rn <= 100
+ ORDER BY team_name, rn
+"""
+
+CUTOFF_ASOF     = "date_created <= %s"          # newest snapshot at or before the cutoff
+CUTOFF_SAME_DAY = "DATE(date_created) = %s"     # newest snapshot of the cutoff's day
+
+
+def _alias_key(name) -> str:
+    # MySQL's default collation ignores case and trailing blanks in team_name = %s
+    return str(name).strip().lower()
+
+
+class OddsIndex:
+    """
+    As-of index of best futures lines.
+
+    * `highest_prob=False` keeps the longest price of each snapshot (lowest
+      implied probability); `True` keeps the shortest, matching update_ev.py
+    * lookups before the first loaded snapshot of a team return 0 (no quote),
+      so load the window from the earliest cutoff you intend to ask about
+    """
+
+    def __init__(self, cols, highest_prob=False):
+        self.cols          = list(cols)
+        self.highest_prob  = highest_prob
+        self._series       = {}   # (table, alias_key) -> (ts int64[ns], quotes int64)
+        self.load_report   = None # FuturesLoad of the last load(), if any
+
+    # ───────────────  building  ───────────────
+    def add_rows(self, table, rows):
+        """Index one futures table's rows (dicts/DataFrame with team_name, date_created, cols)."""
+        df = rows if isinstance(rows, pd.DataFrame) else pd.DataFrame(list(rows))
+        if df.empty:
+            return self
+        best, _ = best_line(odds_matrix(df, self.cols), highest_prob=self.highest_prob)
+        return self.add_best(table, df["team_name"], df["date_created"], best)
+
+    def add_best(self, table, team_names, created, best):
+        """Index snapshots whose best line is already known (e.g. odds.best_line_frame)."""
+        best = np.asarray(best, dtype=np.int64)
+        keep = best != 0
+        if not keep.any():
+            return self
+
+        keys = pd.Series(team_names).map(_alias_key).to_numpy()[keep]
+        ts   = pd.to_datetime(pd.Series(created)).to_numpy("datetime64[ns]").astype(np.int64)[keep]
+        best = best[keep]
+
+        # group by alias, ascending time inside each alias
+        order = np.lexsort((ts, keys))
+        keys, ts, best = keys[order], ts[order], best[order]
+        uniq, starts = np.unique(keys, return_index=True)
+        bounds = list(starts[1:]) + [len(keys)]
+        for key, lo, hi in zip(uniq, starts, bounds):
+            old = self._series.get((table, key))
+            new_ts, new_q = ts[lo:hi], best[lo:hi]
+            if old is not None:
+                merged = np.argsort(np.concatenate([old[0], new_ts]), kind="stable")
+                new_ts = np.concatenate([old[0], new_ts])[merged]
+                new_q  = np.concatenate([old[1], new_q])[merged]
+            self._series[(table, key)] = (new_ts, new_q)
+        return self
+
+    @classmethod
+    def load(cls, query_fn, tables, cols, start, end, highest_prob=False,
+             max_workers=DEFAULT_WORKERS, timeout=DEFAULT_TIMEOUT):
+        """
+        Build the index for every table over [start, end], reading the tables
+        concurrently. `query_fn(query, params)` returns a list of dict rows
+        (%s placeholders) and is called from worker threads, so it must use its
+        own connection per call. Tables that fail or time out are left out of
+        the index and listed in `index.load_report`.
+        """
+        index = cls(cols, highest_prob=highest_prob)
+
+        def fetch(table):
+            return query_fn(INDEX_QUERY.format(cols=", ".join(index.cols), table=table), (start, end))
+
+        index.load_report = fetch_tables(fetch, tables, max_workers=max_workers, timeout=timeout)
+        for table, rows in index.load_report.results.items():
+            index.add_rows(table, rows)
+        return index
+
+    @classmethod
+    def from_mirror(cls, mirror, tables, cols, start, end, highest_prob=False,
+                    max_workers=DEFAULT_WORKERS, timeout=DEFAULT_TIMEOUT):
+        """
+        Same as load(), off a local FuturesMirror's materialized best lines
+        (its short_line when `highest_prob`), so no book is parsed again.
+        """
+        index = cls(cols, highest_prob=highest_prob)
+        line = "short_line" if highest_prob else "best_line"
+
+        def fetch(table):
+            return mirror.best_lines(table, start, end)
+
+        index.load_report = fetch_tables(fetch, tables, max_workers=max_workers, timeout=timeout)
+        for table, df in index.load_report.results.items():
+            index.add_best(table, df["team_name"], df["date_created"], df[line])
+        return index
+
+    # ───────────────  lookups  ───────────────
+    def quotes_asof(self, table, alias, cutoffs, not_before=None):
+        """
+        Best American quote at or before each cutoff (0 where there is none).
+        `not_before` (one time, or one per cutoff) additionally ignores snapshots
+        older than that, e.g. the start of the day for update_ev.py's same-day rule.
+        """
+        cut = pd.to_datetime(np.atleast_1d(cutoffs)).to_numpy("datetime64[ns]").astype(np.int64)
+        series = self._series.get((table, _alias_key(alias)))
+        if series is None:
+            return np.zeros(len(cut), dtype=np.int64)
+        ts, quotes = series
+        pos = np.searchsorted(ts, cut, side="right") - 1
+        found = pos >= 0
+        if not_before is not None:
+            floor = pd.to_datetime(np.atleast_1d(not_before)).to_numpy("datetime64[ns]").astype(np.int64)
+            found &= ts[np.maximum(pos, 0)] >= floor
+        return np.where(found, quotes[np.maximum(pos, 0)], 0)
+
+    def quote_asof(self, table, alias, cutoff, not_before=None) -> int:
+        return int(self.quotes_asof(table, alias, [cutoff], not_before=not_before)[0])
+
+    def stats(self):
+        per_table = defaultdict(int)
+        for (table, _), (ts, _) in self._series.items():
+            per_table[table] += len(ts)
+        return {"series": len(self._series), "snapshots": sum(per_table.values()),
+                "per_table": dict(per_table)}
+
+
+# ──────────────────────  LEG ODDS RESOLVER  ──────────────────────
+# Every EV entry point (update_ev.py, ev_dashboard.py, ev-table.py) prices
+# (EventType, EventLabel, ParticipantName) legs the same way: map the leg to
+# its market table and team alias, take the best line at the cutoff, discount
+# the implied probability by the market's vig. What differs is only the cutoff
+# rule and which end of the book counts as "best", so those are parameters.
+#
+# Settled wagers are the exception: their weights are frozen once into the
+# shared settled_allocation table (ev_engine.py), so every writer prices them
+# with the same SETTLEMENT_RULE, whatever rule its active book uses. It is the
+# as-of rule because a settled market has usually left the scrape: the newest
+# quote at or before now is the last line before settlement.
+
+SETTLEMENT_RULE = {"same_day": False, "highest_prob": False}
+
+
+class OddsResolver:
+    """
+    (decimal, prob) per leg from the best futures line at a cutoff.
+
+    * `same_day=False` takes the newest valid snapshot at or before the
+      cutoff; `True` only snapshots of the cutoff's calendar day (update_ev.py)
+    * `highest_prob` picks the shortest price of a snapshot instead of the
+      longest, as in OddsIndex
+    * a leg without a valid quote (or outside `table_map`) resolves to
+      (1.0, 0.0). resolve() raises FuturesLoadError when a futures table fails
+      or times out; resolve_partial() prices its legs as unquoted and reports them
+    """
+
+    def __init__(self, query_fn, table_map, alias_map, cols, same_day=False, highest_prob=False):
+        self.query_fn     = query_fn    # (query, params) -> dict rows, %s placeholders, thread-safe
+        self.table_map    = table_map   # (EventType, EventLabel) -> futures table
+        self.alias_map    = alias_map   # ParticipantName -> team_name in the futures tables
+        self.cols         = list(cols)
+        self.same_day     = same_day
+        self.highest_prob = highest_prob
+
+    def settlement(self):
+        """This resolver under SETTLEMENT_RULE, for freezing settled wagers."""
+        return OddsResolver(self.query_fn, self.table_map, self.alias_map, self.cols, **SETTLEMENT_RULE)
+
+    def _alias(self, participant):
+        return self.alias_map.get(participant, participant)
+
+    def _query_best_quotes(self, aliases_by_tbl, cutoff_dt):
+        cutoff = CUTOFF_SAME_DAY if self.same_day else CUTOFF_ASOF
+        bound  = cutoff_dt.date() if self.same_day else cutoff_dt
+
+        def fetch(tbl):
+            aliases = sorted(aliases_by_tbl[tbl])
+            query = BEST_QUOTES_QUERY.format(cols=", ".join(self.cols), table=tbl, cutoff=cutoff,
+                                             aliases=", ".join(["%s"] * len(aliases)))
+            return self.query_fn(query, (*aliases, bound))
+
+        best_quote = {}   # (tbl, alias_key) -> best American quote within the cutoff
+        load = fetch_tables(fetch, aliases_by_tbl)
+        for tbl, rows in load.results.items():
+            row_best, _ = best_line(odds_matrix(rows, self.cols), highest_prob=self.highest_prob)
+            for r, best in zip(rows, row_best):
+                if best:   # rows are newest-first per team, so the first valid row wins
+                    best_quote.setdefault((tbl, _alias_key(r["team_name"])), int(best))
+        return best_quote, load
+
+    def _indexed_best_quotes(self, aliases_by_tbl, cutoff_dt, index):
+        midnight   = pd.Timestamp(cutoff_dt).normalize() if self.same_day else None
+        best_quote = {}
+        for tbl, aliases in aliases_by_tbl.items():
+            for alias in aliases:
+                best = index.quote_asof(tbl, alias, cutoff_dt, not_before=midnight)
+                if best:
+                    best_quote[(tbl, _alias_key(alias))] = best
+        return best_quote, index.load_report
+
+    def resolve_partial(self, legs, cutoff_dt, vig_map, index=None):
+        """
+        ({(et, el, pn): (dec, prob)}, FuturesLoad) for every leg with ONE query
+        per futures table (tables read concurrently), or none at all when an
+        OddsIndex covering cutoff_dt (built with the same `highest_prob`) is
+        given. Legs of tables in the load's `failed` resolve to (1.0, 0.0);
+        missing_legs() lists them.
+        """
+        aliases_by_tbl = defaultdict(set)
+        for et, el, pn in legs:
+            tbl = self.table_map.get((et, el))
+            if tbl is not None:
+                aliases_by_tbl[tbl].add(self._alias(pn))
+
+        if index is None:
+            best_quote, load = self._query_best_quotes(aliases_by_tbl, cutoff_dt)
+        else:
+            best_quote, load = self._indexed_best_quotes(aliases_by_tbl, cutoff_dt, index)
+
+        resolved = {}
+        for et, el, pn in legs:
+            best = best_quote.get((self.table_map.get((et, el)), _alias_key(self._alias(pn))))
+            if best is None:
+                resolved[(et, el, pn)] = (1.0, 0.0)
+                continue
+            dec  = american_odds_to_decimal(best)
+            prob = american_odds_to_prob(best) * (1 - vig_map.get((et, el), 0.05))
+            resolved[(et, el, pn)] = (dec, prob)
+        return resolved, load
+
+    def missing_legs(self, legs, load):
+        """The legs whose futures table failed or timed out in `load`."""
+        failed = set(load.failed) if load is not None else set()
+        return {leg for leg in legs if self.table_map.get(leg[:2]) in failed}
+
+    def resolve(self, legs, cutoff_dt, vig_map, index=None):
+        """resolve_partial()'s odds; raises FuturesLoadError if any table failed."""
+        resolved, load = self.resolve_partial(legs, cutoff_dt, vig_map, index=index)
+        if load is not None:
+            load.raise_if_failed()
+        return resolved
@@ -0,0 +1,119 @@
+import io
+import time
+
+import numpy as np
+import pandas as pd
+
+from odds import odds_matrix
+
+# ──────────────────────  CHANGE-ONLY ODDS SERIES  ──────────────────────
+# A futures table stores every book's line for every team on every scrape,
+# although most scrapes change nothing. compress() keeps one row per run of
+# consecutive scrapes in which a team's lines stayed the same:
+#
+# * `seq` is the run's first scrape, as a position in the table's scrape grid
+#   (the sorted distinct date_created values, kept next to the runs)
+# * `run` is how many consecutive scrapes the run covers
+# * a book column holds the new line only where it changed since the team's
+#   previous run, and NA where it did not (the first run of a team is full)
+#
+# expand() repeats every run over its scrapes and forward-fills the books per
+# team, giving back exactly the (team_name, date_created, books) rows that went
+# in, with the books parsed to int64 American odds (0 = no quote) the way every
+# reader parses them anyway. A team missing from a scrape ends its run, so gaps
+# survive the round trip.
+
+SPORTSBOOK_COLS = ["BetMGM", "DraftKings", "Caesars", "ESPNBet", "FanDuel", "BallyBet", "RiversCasino", "Bet365"]
+
+
+def compress(df, cols=SPORTSBOOK_COLS):
+    """(runs DataFrame, scrape grid DatetimeIndex) of futures rows `df`."""
+    cols = list(cols)
+    ts = pd.to_datetime(df["date_created"]).to_numpy("datetime64[ns]")
+    grid, seq = np.unique(ts, return_inverse=True)
+    team, teams = pd.factorize(df["team_name"], use_na_sentinel=False)
+    quotes = odds_matrix(df, cols)
+
+    order = np.lexsort((seq, team))   # per team, oldest scrape first
+    team, seq, quotes = team[order], seq[order], quotes[order]
+    # each row vs the one before it; [:len(seq)] keeps an empty frame empty
+    same_team = np.r_[False, team[1:] == team[:-1]][:len(seq)]
+    continues = same_team & np.r_[False, (seq[1:] == seq[:-1] + 1)
+                                  & (quotes[1:] == quotes[:-1]).all(axis=1)][:len(seq)]
+
+    starts = np.flatnonzero(~continues)
+    run = np.diff(np.r_[starts, len(seq)])
+    # the row before a run's start is the last scrape of the team's previous run
+    changed = ~same_team[starts][:, None] | (quotes[starts] != quotes[np.maximum(starts - 1, 0)])
+
+    runs = pd.DataFrame({"team_name": np.asarray(teams, dtype=object)[team[starts]],
+                         "seq": seq[starts].astype(np.int32),
+                         "run": run.astype(np.int32)})
+    for j, col in enumerate(cols):
+        runs[col] = pd.Series(quotes[starts, j], dtype="Int64").where(changed[:, j])
+    return runs, pd.DatetimeIndex(grid, name="date_created")
+
+
+def expand(runs, grid, cols=SPORTSBOOK_COLS):
+    """The full (team_name, date_created, cols) rows of compress()ed `runs`, oldest first."""
+    cols = list(cols)
+    if runs.empty:
+        return pd.DataFrame({"team_name": pd.Series(dtype=object),
+                             "date_created": pd.Series(dtype="datetime64[ns]"),
+                             **{col: pd.Series(dtype=np.int64) for col in cols}})
+    books = runs[cols].groupby(runs["team_name"].to_numpy(), sort=False).ffill()
+    rep = runs["run"].to_numpy(np.int64)
+    first = np.repeat(np.cumsum(rep) - rep, rep)
+    seq = np.repeat(runs["seq"].to_numpy(np.int64), rep) + np.arange(rep.sum()) - first
+    out = pd.DataFrame({"team_name": np.repeat(runs["team_name"].to_numpy(), rep),
+                        "date_created": np.asarray(grid, dtype="datetime64[ns]")[seq]})
+    for col in cols:
+        out[col] = np.repeat(books[col].to_numpy(np.int64, na_value=0), rep)
+    return out.sort_values("date_created", kind="stable").reset_index(drop=True)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Report
+# ─────────────────────────────────────────────────────────────────────────────
+def _parquet_bytes(df):
+    buf = io.BytesIO()
+    df.to_parquet(buf, index=False)
+    return buf.getvalue()
+
+
+def compression_report(df, cols=SPORTSBOOK_COLS, repeat=3):
+    """
+    Rows, stored book cells, Parquet bytes and read time of futures rows `df`
+    stored in full vs change-only, checking that the round trip is lossless.
+    Read time is the best of `repeat` reads (plus expand() for change-only).
+    """
+    cols = list(cols)
+    full = df[["team_name", "date_created", *cols]]
+    runs, grid = compress(full, cols)
+    raw_bytes = _parquet_bytes(full)
+    run_bytes = _parquet_bytes(runs)
+    grid_bytes = _parquet_bytes(grid.to_frame(index=False))
+
+    def best_of(fn):
+        times = []
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            result = fn()
+            times.append(time.perf_counter() - t0)
+        return min(times), result
+
+    raw_s, _ = best_of(lambda: pd.read_parquet(io.BytesIO(raw_bytes)))
+    run_s, back = best_of(lambda: expand(pd.read_parquet(io.BytesIO(run_bytes)),
+                                         pd.read_parquet(io.BytesIO(grid_bytes))["date_created"], cols))
+
+    expected = full.assign(date_created=pd.to_datetime(full["date_created"]))
+    expected[cols] = odds_matrix(full, cols)
+    key = ["date_created", "team_name", *cols]
+    lossless = (len(back) == len(full) and
+                expected.sort_values(key).reset_index(drop=True)[key].equals(
+                    back.sort_values(key).reset_index(drop=True)[key].astype(expected[key].dtypes.to_dict())))
+    return {"rows": len(full), "runs": len(runs), "scrapes": len(grid),
+            "row_ratio": len(full) / max(len(runs), 1),
+            "cells": len(full) * len(cols), "stored_cells": int(runs[cols].notna().sum().sum()),
+            "raw_bytes": len(raw_bytes), "change_only_bytes": len(run_bytes) + len(grid_bytes),
+            "raw_read_s": raw_s, "change_only_read_s": run_s, "lossless": lossless}
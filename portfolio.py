@@ -0,0 +1,236 @@
+import pandas as pd
+
+# ──────────────────────  PORTFOLIO DATA LAYER  ──────────────────────
+# All bets + legs of one bankroll, pulled with two flat queries and kept in memory.
+# The dashboard pages compute their aggregates from these frames with vectorised
+# groupbys instead of re-running near-identical DistinctBets CTEs on the server.
+
+BETS_QUERY = """
+SELECT WagerID, DateTimePlaced, WLCA, LegCount,
+       DollarsAtStake, PotentialPayout, NetProfit, ImpliedOdds, Sportsbook
+FROM bets
+WHERE WhichBankroll = %s
+"""
+
+LEGS_QUERY = """
+SELECT l.WagerID, l.LegID, l.LeagueName, l.EventType, l.EventLabel,
+       l.ParticipantName, l.LegDescription, l.IsFuture
+FROM legs l
+JOIN bets b ON b.WagerID = l.WagerID
+WHERE b.WhichBankroll = %s
+"""
+
+BET_COLUMNS = ["WagerID", "DateTimePlaced", "WLCA", "LegCount",
+               "DollarsAtStake", "PotentialPayout", "NetProfit", "ImpliedOdds", "Sportsbook"]
+LEG_COLUMNS = ["WagerID", "LegID", "LeagueName", "EventType", "EventLabel",
+               "ParticipantName", "LegDescription", "IsFuture"]
+
+MONEY_COLUMNS       = ["DollarsAtStake", "PotentialPayout", "NetProfit"]
+BET_CATEGORY_COLUMNS = ["WLCA", "Sportsbook"]
+LEG_CATEGORY_COLUMNS = ["LeagueName", "EventType", "EventLabel", "ParticipantName", "IsFuture"]
+
+# columns shown on the Participant Positions pages (same order as the old SELECT)
+POSITION_COLUMNS = ["LegID", "EventType", "DollarsAtStake", "PotentialPayout", "NetProfit",
+                    "ImpliedOdds", "EventLabel", "LegDescription", "Sportsbook",
+                    "DateTimePlaced", "LegCount"]
+
+
+def _frame(rows, columns, category_columns):
+    df = pd.DataFrame(rows or [], columns=columns)
+    for col in category_columns:
+        df[col] = df[col].astype("category")
+    return df
+
+
+def _plain(df):
+    """Categoricals back to object, so callers' pivots/merges never see unobserved levels."""
+    cats = [col for col in df.columns if isinstance(df[col].dtype, pd.CategoricalDtype)]
+    return df.astype({col: object for col in cats}) if cats else df
+
+
+class Portfolio:
+    """
+    One bankroll's wagers, held as two compact frames:
+
+    * `bets`  – one row per WagerID (money columns as float64, labels as categoricals)
+    * `legs`  – one row per leg, with the owning bet's fields broadcast onto it
+    """
+
+    def __init__(self, bets, legs):
+        bets = bets.drop_duplicates("WagerID").reset_index(drop=True)
+        for col in MONEY_COLUMNS:
+            bets[col] = pd.to_numeric(bets[col], errors="coerce").astype(float)
+        bets["LegCount"] = pd.to_numeric(bets["LegCount"], errors="coerce")
+        bets["DateTimePlaced"] = pd.to_datetime(bets["DateTimePlaced"], errors="coerce")
+
+        self.bets = bets
+        self.legs = legs.merge(bets, on="WagerID", how="inner")
+        # (SELECT DISTINCT WagerID, LeagueName FROM legs) joined to the bets
+        self.wager_league = (
+            self.legs[["WagerID", "LeagueName"]].drop_duplicates()
+                .merge(bets, on="WagerID")
+        )
+        self._by_league = {}   # LeagueName -> that league's legs, sliced on first use
+
+    @classmethod
+    def from_rows(cls, bet_rows, leg_rows):
+        return cls(_frame(bet_rows, BET_COLUMNS, BET_CATEGORY_COLUMNS),
+                   _frame(leg_rows, LEG_COLUMNS, LEG_CATEGORY_COLUMNS))
+
+    @classmethod
+    def load(cls, query_fn, bankroll):
+        """`query_fn(query, params)` returns a list of dict rows (e.g. ConnectionPool.query)."""
+        return cls.from_rows(query_fn(BETS_QUERY, (bankroll,)),
+                             query_fn(LEGS_QUERY, (bankroll,)))
+
+    # ───────────────  helpers  ───────────────
+    @staticmethod
+    def _sum_by(df, key, value, name):
+        out = df.groupby(key, observed=True)[value].sum()
+        return _plain(out.reset_index(name=name))
+
+    @staticmethod
+    def _with_total(df, key, name, total):
+        total_row = pd.DataFrame({key: ["Total"], name: [total]})
+        df = df.astype({key: object})
+        return pd.concat([df, total_row], ignore_index=True)
+
+    def league_legs(self, league):
+        """
+        The league's legs, sliced out of the full frame once and reused, so the
+        league pages' drill-downs only ever filter this small frame.
+        """
+        legs = self._by_league.get(league)
+        if legs is None:
+            legs = self._by_league[league] = self.legs[self.legs["LeagueName"] == league]
+        return legs
+
+    def _league_legs(self, league, wlca=None, straight=None, **filters):
+        legs = self.league_legs(league)
+        if wlca is not None:
+            legs = legs[legs["WLCA"].isin(wlca)]
+        if straight is True:
+            legs = legs[legs["LegCount"] == 1]
+        elif straight is False:
+            legs = legs[legs["LegCount"] > 1]
+        for col, value in filters.items():
+            legs = legs[legs[col] == value]
+        return legs
+
+    # ───────────────  Main Page  ───────────────
+    def active_principal_by_league(self):
+        active = self.bets[(self.bets["WLCA"] == "Active") & (self.bets["LegCount"] == 1)]
+        per_league = self.wager_league[self.wager_league["WagerID"].isin(active["WagerID"])]
+        df = self._sum_by(per_league, "LeagueName", "DollarsAtStake", "TotalDollarsAtStake")
+        df["TotalDollarsAtStake"] = df["TotalDollarsAtStake"].round()
+        return self._with_total(df, "LeagueName", "TotalDollarsAtStake",
+                                round(active["DollarsAtStake"].sum()))
+
+    def total_dollars_deployed(self):
+        """Active stake minus realised profit; None when nothing is active."""
+        active = self.bets.loc[self.bets["WLCA"] == "Active", "DollarsAtStake"]
+        if active.notna().sum() == 0:
+            return None
+        return active.sum() - self.bets["NetProfit"].sum()
+
+    def realized_profit_by_league(self):
+        straight = self.wager_league[self.wager_league["LegCount"] == 1]
+        df = self._sum_by(straight, "LeagueName", "NetProfit", "NetProfit")
+        df["NetProfit"] = df["NetProfit"].round()
+        with_legs = self.bets[self.bets["WagerID"].isin(self.legs["WagerID"])]
+        return self._with_total(df, "LeagueName", "NetProfit",
+                                round(with_legs["NetProfit"].sum()))
+
+    def realized_profit_by_month(self):
+        month = self.bets["DateTimePlaced"].dt.strftime("%Y-%m").rename("Month")
+        df = self.bets.groupby(month)["NetProfit"].sum().reset_index(name="TotalNetProfit")
+        return df.sort_values("Month").reset_index(drop=True)
+
+    # ───────────────  Betting Frequency  ───────────────
+    def bets_by_month(self):
+        month = self.bets["DateTimePlaced"].dt.strftime("%Y-%m").rename("Month")
+        df = self.bets.groupby(month)["WagerID"].count().reset_index(name="NumberOfBets")
+        return df.sort_values("Month").reset_index(drop=True)
+
+    def bets_by_league(self):
+        df = _plain(self.wager_league.groupby("LeagueName", observed=True)["WagerID"].nunique()
+                        .reset_index(name="NumberOfBets"))
+        return df.sort_values("NumberOfBets", ascending=False).reset_index(drop=True)
+
+    # ───────────────  League chart pages  ───────────────
+    def event_types(self, league):
+        legs = self._league_legs(league)
+        return sorted(legs["EventType"].dropna().unique().tolist())
+
+    def active_principal_by_event_type(self, league, straight_only=False):
+        """Active stake by EventType for one league, plus a 'Total' row."""
+        active = self.bets[self.bets["WLCA"] == "Active"]
+        if straight_only:
+            active = active[active["LegCount"] == 1]
+        legs = self._league_legs(league)
+        legs = legs[legs["WagerID"].isin(active["WagerID"])]
+        by_type = legs[["WagerID", "EventType", "DollarsAtStake"]].drop_duplicates(["WagerID", "EventType"])
+        df = self._sum_by(by_type, "EventType", "DollarsAtStake", "TotalDollarsAtStake")
+        df["TotalDollarsAtStake"] = df["TotalDollarsAtStake"].round()
+        total = legs.drop_duplicates("WagerID")["DollarsAtStake"].sum()
+        return self._with_total(df, "EventType", "TotalDollarsAtStake", round(total))
+
+    def event_labels(self, league, event_type, wlca=("Active",)):
+        legs = self._league_legs(league, wlca=wlca, EventType=event_type)
+        return sorted(legs["EventLabel"].dropna().unique().tolist())
+
+    def straight_positions(self, league, wlca=("Active",), **filters):
+        """Straight-bet stake and potential payout per participant."""
+        legs = self._league_legs(league, wlca=wlca, straight=True, **filters)
+        df = (legs.groupby("ParticipantName", observed=True)[["DollarsAtStake", "PotentialPayout"]].sum()
+                  .rename(columns={"DollarsAtStake": "TotalDollarsAtStake",
+                                   "PotentialPayout": "TotalPotentialPayout"}))
+        return _plain(df.reset_index())
+
+    def parlay_counts(self, league, event_type):
+        legs = self._league_legs(league, wlca=("Active",), straight=False, EventType=event_type)
+        df = (legs.groupby("ParticipantName", observed=True)["WagerID"].nunique()
+                  .reset_index(name="NumberOfParlays"))
+        df = _plain(df)
+        return df.sort_values("NumberOfParlays", ascending=False).reset_index(drop=True)
+
+    def parlay_dollars(self, league, event_type):
+        legs = self._league_legs(league, wlca=("Active",), straight=False, EventType=event_type)
+        df = self._sum_by(legs, "ParticipantName", "DollarsAtStake", "TotalDollarsAtStake")
+        return df.sort_values("TotalDollarsAtStake", ascending=False).reset_index(drop=True)
+
+    def breakeven(self, league, event_type):
+        legs = self._league_legs(league, straight=True, EventType=event_type)
+        wlca = legs["WLCA"]
+        return float(
+            - legs.loc[wlca == "Cashout", "NetProfit"].sum()
+            - legs.loc[wlca == "Loss", "NetProfit"].sum()
+            + legs.loc[wlca == "Active", "DollarsAtStake"].sum()
+        )
+
+    # ───────────────  Tennis futures  ───────────────
+    def futures_principal_by_event_label(self, league):
+        future_legs = self.legs[self.legs["IsFuture"] == "Yes"]
+        active = future_legs.loc[future_legs["WLCA"] == "Active", "WagerID"].unique()
+        legs = future_legs[(future_legs["LeagueName"] == league) & future_legs["WagerID"].isin(active)]
+        df = self._sum_by(legs, "EventLabel", "DollarsAtStake", "TotalDollarsAtStake")
+        df["TotalDollarsAtStake"] = df["TotalDollarsAtStake"].round()
+        return df
+
+    def futures_event_types(self, league, event_label):
+        legs = self._league_legs(league, wlca=("Active",), EventLabel=event_label, IsFuture="Yes")
+        return sorted(legs["EventType"].dropna().unique().tolist())
+
+    # ───────────────  Participant Positions  ───────────────
+    def participants(self, league):
+        legs = self._league_legs(league)
+        return sorted(legs["ParticipantName"].dropna().unique().tolist())
+
+    def participant_positions(self, league, participant, wlca="All", bet_type="All"):
+        legs = self._league_legs(
+            league,
+            wlca=None if wlca == "All" else (wlca,),
+            straight={"All": None, "Straight": True, "Parlay": False}[bet_type],
+            ParticipantName=participant,
+        )
+        return _plain(legs[POSITION_COLUMNS].reset_index(drop=True))
@@ -0,0 +1,135 @@
+import cProfile
+import io
+import json
+import os
+import pstats
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+# ──────────────────────  STAGE PROFILE  ──────────────────────
+# Named spans around the stages of a job (query, odds, allocation, assembly,
+# persist, plot). Each stage records its wall time, number of calls, rows and
+# SQL statements. Spans nest, and a stage's time is its own time with its
+# children's subtracted, so the stage times add up to the run's time. The
+# span stack is shared by all threads: statements that fetch_tables' worker
+# threads run count toward the span that started them.
+#
+#     EV_PROFILE=cprofile python ev_dashboard.py   # also wrap the run in cProfile
+
+PROFILE_ENV = "EV_PROFILE"
+
+
+class Stage:
+    def __init__(self, name):
+        self.name    = name
+        self.seconds = 0.0     # own time, children excluded
+        self.calls   = 0
+        self.rows    = 0
+        self.queries = 0
+
+    def as_dict(self):
+        return {"name": self.name, "seconds": round(self.seconds, 6), "calls": self.calls,
+                "rows": self.rows, "queries": self.queries}
+
+
+class StageProfile:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.stages  = {}    # name -> Stage, in first-use order
+            self._stack  = []    # [stage, child seconds] of the open spans
+            self.started = datetime.utcnow()
+            self._t0     = time.perf_counter()
+
+    # ───────────────  recording  ───────────────
+    @contextmanager
+    def span(self, name):
+        """Time a block as stage `name`; the yielded Stage takes `.rows += n`."""
+        with self._lock:
+            stage = self.stages.setdefault(name, Stage(name))
+            stage.calls += 1
+            frame = [stage, 0.0]
+            self._stack.append(frame)
+        t0 = time.perf_counter()
+        try:
+            yield stage
+        finally:
+            elapsed = time.perf_counter() - t0
+            with self._lock:
+                self._stack.remove(frame)
+                stage.seconds += elapsed - frame[1]
+                if self._stack:
+                    self._stack[-1][1] += elapsed
+
+    def timed(self, name, fn, rows=len):
+        """`fn` with every call recorded as a `name` span, counting rows(result)."""
+        def wrapper(*args, **kwargs):
+            with self.span(name) as stage:
+                result = fn(*args, **kwargs)
+                stage.rows += rows(result) if result is not None else 0
+                return result
+        return wrapper
+
+    def count_queries(self, engine):
+        """Count every statement `engine` runs toward the innermost open span."""
+        from sqlalchemy import event   # only the SQLAlchemy jobs need this
+
+        def on_execute(conn, cursor, statement, parameters, context, executemany):
+            with self._lock:
+                if self._stack:
+                    self._stack[-1][0].queries += 1
+        event.listen(engine, "before_cursor_execute", on_execute)
+
+    # ───────────────  reporting  ───────────────
+    def total_seconds(self):
+        return time.perf_counter() - self._t0
+
+    def as_dict(self):
+        total = self.total_seconds()
+        return {"started": self.started.isoformat(timespec="seconds"),
+                "total_seconds": round(total, 6),
+                "unattributed_seconds": round(total - sum(s.seconds for s in self.stages.values()), 6),
+                "stages": [stage.as_dict() for stage in self.stages.values()]}
+
+    def write_json(self, path):
+        with open(path, "w") as fh:
+            json.dump(self.as_dict(), fh, indent=2)
+
+    def summary(self):
+        """Fixed-width table of the stages, slowest first."""
+        total = self.total_seconds()
+        lines = [f"{'stage':<12} {'seconds':>9} {'share':>6} {'calls':>6} {'rows':>9} {'queries':>8}"]
+        for s in sorted(self.stages.values(), key=lambda s: -s.seconds):
+            lines.append(f"{s.name:<12} {s.seconds:>9.3f} {s.seconds / max(total, 1e-9):>6.0%} "
+                         f"{s.calls:>6} {s.rows:>9,} {s.queries:>8}")
+        other = total - sum(s.seconds for s in self.stages.values())
+        lines.append(f"{'(other)':<12} {other:>9.3f} {other / max(total, 1e-9):>6.0%}")
+        lines.append(f"{'total':<12} {total:>9.3f}")
+        return "\n".join(lines)
+
+    def one_line(self):
+        return " · ".join(f"{s.name} {s.seconds:.2f}s" for s in self.stages.values())
+
+
+def run_profiled(fn, out="ev_profile.prof", top=25):
+    """
+    fn(), wrapped in cProfile when the EV_PROFILE env var is "cprofile": the
+    stats are dumped to `out` (snakeviz / pstats) and the `top` entries by
+    cumulative time printed.
+    """
+    if os.environ.get(PROFILE_ENV, "").lower() != "cprofile":
+        return fn()
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(fn)
+    finally:
+        profiler.dump_stats(out)
+        buf = io.StringIO()
+        pstats.Stats(profiler, stream=buf).sort_stats("cumulative").print_stats(top)
+        print(buf.getvalue())
+        print(f"📊  cProfile stats written to {out}")
@@ -0,0 +1,42 @@
+import os
+import sqlite3
+import sys
+
+import pytest
+
+# the modules live at the repository root, next to the scripts that import them
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class SqliteDB:
+    """
+    In-memory stand-in for the MySQL databases: takes the repo's %s / INSERT
+    IGNORE statements and returns dict rows, like the scripts' query_fn.
+    """
+
+    def __init__(self):
+        self.conn = sqlite3.connect(":memory:", check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+
+    @staticmethod
+    def _sql(query):
+        return query.replace("%s", "?").replace("INSERT IGNORE", "INSERT OR IGNORE")
+
+    @staticmethod
+    def _param(value):
+        return value.isoformat(sep=" ") if hasattr(value, "isoformat") else value
+
+    def query(self, query, params=None):
+        params = tuple(self._param(p) for p in params or ())
+        return [dict(r) for r in self.conn.execute(self._sql(query), params)]
+
+    def execute(self, query, rows=None):
+        if rows is None:
+            self.conn.execute(self._sql(query))
+        else:
+            self.conn.executemany(self._sql(query), [tuple(self._param(v) for v in r) for r in rows])
+
+
+@pytest.fixture
+def db():
+    return SqliteDB()
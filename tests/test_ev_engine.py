@@ -0,0 +1,117 @@
+import math
+import random
+
+import pytest
+
+from ev_engine import EVEngine
+
+MARKETS = [("Championship", "NBA Championship"), ("MVP", "MVP"), ("Conference", "Eastern Conference")]
+TEAMS = [f"Team {i}" for i in range(6)]
+
+
+@pytest.fixture
+def book(db):
+    db.conn.executescript("""
+        CREATE TABLE bets (WagerID INTEGER, WhichBankroll TEXT, WLCA TEXT,
+                           PotentialPayout REAL, DollarsAtStake REAL, NetProfit REAL);
+        CREATE TABLE legs (WagerID INTEGER, LeagueName TEXT, EventType TEXT,
+                           EventLabel TEXT, ParticipantName TEXT);
+    """)
+    rng = random.Random(7)
+    for wid in range(80):
+        wlca = rng.choice(["Active", "Active", "Win", "Loss", "Cashout"])
+        net = 0.0 if wlca == "Active" else rng.uniform(-20, 200)
+        db.conn.execute("INSERT INTO bets VALUES (?, 'GreenAleph', ?, ?, ?, ?)",
+                        (wid, wlca, rng.uniform(50, 500), rng.uniform(5, 50), net))
+        for _ in range(rng.randint(1, 3)):
+            et, el = rng.choice(MARKETS)
+            db.conn.execute("INSERT INTO legs VALUES (?, 'NBA', ?, ?, ?)", (wid, et, el, rng.choice(TEAMS)))
+    return db
+
+
+class Lines:
+    """A futures book: (dec, prob) per leg, Team 0 never quoted."""
+
+    def __init__(self, seed):
+        self.rng = random.Random(seed)
+        self.quotes = {}
+
+    def __call__(self, legs):
+        return {leg: self.quote(leg) for leg in legs}
+
+    def quote(self, leg):
+        if leg[2] == "Team 0":
+            return (1.0, 0.0)
+        if leg not in self.quotes:
+            self.quotes[leg] = self.move(leg)
+        return self.quotes[leg]
+
+    def move(self, leg):
+        dec = self.rng.choice([2.5, 4.0, 6.0, 11.0])
+        self.quotes[leg] = (dec, 0.95 / dec)
+        return self.quotes[leg]
+
+
+def assert_same_totals(engine, oracle):
+    for got, want in zip(engine.totals(), oracle.totals()):
+        assert got.keys() == want.keys()
+        for market in want:
+            assert math.isclose(got[market], want[market], rel_tol=1e-9, abs_tol=1e-9)
+
+
+def test_incremental_refresh_matches_a_fresh_engine(book):
+    live, settled = Lines(1), Lines(2)
+    resolve_settled = lambda legs: (settled(legs), set())
+    engine = EVEngine(rebuild_fraction=1.0)
+    engine.refresh(book.query, live, book.execute, resolve_settled)
+
+    rng = random.Random(3)
+    for _ in range(8):
+        wid = rng.randrange(80)
+        book.conn.execute("UPDATE bets SET DollarsAtStake = DollarsAtStake + 1 WHERE WagerID = ?", (wid,))
+        book.conn.execute("UPDATE bets SET WLCA = 'Win', NetProfit = 75 WHERE WagerID = ?", (rng.randrange(80),))
+        book.conn.execute("DELETE FROM bets WHERE WagerID = ?", (rng.randrange(80),))
+        live.move(rng.choice(list(live.quotes)))
+        engine.refresh(book.query, live, book.execute, resolve_settled)
+        assert engine.last_refresh["mode"] == "incremental"
+
+        oracle = EVEngine().refresh(book.query, live, book.execute, resolve_settled)
+        assert_same_totals(engine, oracle)
+
+
+def test_settled_wagers_are_frozen_once_even_without_quotes(book):
+    engine = EVEngine().refresh(book.query, Lines(1), book.execute, lambda legs: (Lines(2)(legs), set()))
+    assert engine.last_refresh["pending"] == 0
+    n_settled = book.query("SELECT COUNT(*) AS n FROM bets WHERE WLCA <> 'Active'")[0]["n"]
+    n_frozen = book.query("SELECT COUNT(DISTINCT WagerID) AS n FROM settled_allocation")[0]["n"]
+    assert n_frozen == n_settled
+
+    # the next refresh reuses the stored weights instead of pricing settled legs
+    engine.refresh(book.query, Lines(1), book.execute, lambda legs: pytest.fail("settled legs priced again"))
+
+
+def test_wagers_on_unread_tables_stay_pending(book):
+    unread = ("MVP", "MVP")
+    settled = Lines(2)
+
+    def partial(legs):
+        return settled(legs), {leg for leg in legs if leg[:2] == unread}
+
+    engine = EVEngine().refresh(book.query, Lines(1), book.execute, partial)
+    waiting = engine.last_refresh["pending"]
+    assert waiting > 0
+    frozen = {r["WagerID"] for r in book.query("SELECT DISTINCT WagerID FROM settled_allocation")}
+    assert not any(leg[:2] == unread for wid in frozen for leg in engine._legs[wid])
+
+    engine.refresh(book.query, Lines(1), book.execute, lambda legs: (settled(legs), set()))
+    assert engine.last_refresh["frozen_now"] == waiting
+    assert engine.last_refresh["pending"] == 0
+
+
+def test_frozen_weights_do_not_depend_on_the_live_rule(book):
+    # two processes with different active-book rules share settled_allocation
+    settled = Lines(2)
+    resolve_settled = lambda legs: (settled(legs), set())
+    first = EVEngine().refresh(book.query, Lines(1), None, resolve_settled)
+    second = EVEngine().refresh(book.query, Lines(99), None, resolve_settled)
+    assert first.totals()[2] == pytest.approx(second.totals()[2])
@@ -0,0 +1,59 @@
+from datetime import datetime, timedelta
+
+import pandas as pd
+import pytest
+
+from futures_mirror import FuturesMirror
+from odds import odds_matrix
+from odds_series import SPORTSBOOK_COLS
+
+TABLE = "nba_championship"
+
+
+@pytest.fixture
+def futures(db):
+    db.conn.execute(f"CREATE TABLE {TABLE} (team_name TEXT, date_created TEXT, "
+                    + ", ".join(f"{c} TEXT" for c in SPORTSBOOK_COLS) + ")")
+    start = datetime(2025, 1, 30, 9)
+    # 3 teams per scrape, except one scrape of 12 that no chunk of 5 can hold
+    for i, n_teams in enumerate([3, 3, 12, 3, 3, 3]):
+        stamp = (start + timedelta(days=i)).isoformat(sep=" ")
+        for t in range(n_teams):
+            books = [f"+{100 * (t + 1) + 10 * i + j}" if (t + j) % 4 else None for j in range(len(SPORTSBOOK_COLS))]
+            db.conn.execute(f"INSERT INTO {TABLE} VALUES ({', '.join(['?'] * (2 + len(books)))})",
+                            (f"Team {t}", stamp, *books))
+    return db
+
+
+def full_read(db):
+    df = pd.DataFrame(db.query(f"SELECT * FROM {TABLE}"))
+    df["date_created"] = pd.to_datetime(df["date_created"])
+    return df
+
+
+def by_scrape(df):
+    return df.sort_values(["date_created", "team_name"]).reset_index(drop=True)
+
+
+def test_sync_keeps_snapshots_cut_by_the_limit_whole(futures, tmp_path):
+    mirror = FuturesMirror(str(tmp_path))
+    added = mirror.sync_table(futures.query, TABLE, chunk_rows=5)
+
+    expected = full_read(futures)
+    assert added == len(expected)
+    got = mirror.read(TABLE)
+    assert by_scrape(got[expected.columns]).equals(by_scrape(expected))
+    assert mirror.sync_table(futures.query, TABLE, chunk_rows=5) == 0
+
+
+def test_change_only_sync_matches_a_full_read(futures, tmp_path):
+    mirror = FuturesMirror(str(tmp_path))
+    mirror.compact(TABLE)
+    mirror.sync_table(futures.query, TABLE, chunk_rows=5)
+
+    expected = full_read(futures)
+    got = by_scrape(mirror.read(TABLE))
+    expected = by_scrape(expected)
+    assert got["team_name"].tolist() == expected["team_name"].tolist()
+    assert (got["date_created"] == expected["date_created"]).all()
+    assert (odds_matrix(got, SPORTSBOOK_COLS) == odds_matrix(expected, SPORTSBOOK_COLS)).all()
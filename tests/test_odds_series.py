@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+
+from odds import odds_matrix
+from odds_series import SPORTSBOOK_COLS, compress, compression_report, expand
+
+
+def scrapes(seed=0, n_scrapes=40, n_teams=5):
+    """Futures rows whose lines mostly repeat, with quote gaps and teams skipping scrapes."""
+    rng = np.random.default_rng(seed)
+    grid = pd.date_range("2025-01-01", periods=n_scrapes, freq="6h")
+    lines = rng.choice([-150, 120, 250, 600], size=(n_teams, len(SPORTSBOOK_COLS)))
+    rows = []
+    for ts in grid:
+        moved = rng.random(lines.shape) < 0.1
+        lines = np.where(moved, rng.choice([-150, 120, 250, 600], size=lines.shape), lines)
+        for t in range(n_teams):
+            if rng.random() < 0.1:
+                continue   # not scraped this time
+            books = [f"{v:+d}" if rng.random() > 0.05 else None for v in lines[t]]
+            rows.append({"team_name": f"Team {t}", "date_created": ts, **dict(zip(SPORTSBOOK_COLS, books))})
+    return pd.DataFrame(rows)
+
+
+def test_round_trip_is_lossless():
+    df = scrapes()
+    report = compression_report(df, repeat=1)
+    assert report["lossless"]
+    assert report["runs"] < report["rows"]
+
+
+def test_expand_gives_back_the_rows():
+    df = scrapes(seed=1)
+    back = expand(*compress(df))
+    assert len(back) == len(df)
+    order = lambda frame: frame.sort_values(["date_created", "team_name"]).reset_index(drop=True)
+    back, df = order(back), order(df)
+    assert back["team_name"].tolist() == df["team_name"].tolist()
+    assert (back["date_created"] == df["date_created"]).all()
+    assert (back[SPORTSBOOK_COLS].to_numpy() == odds_matrix(df, SPORTSBOOK_COLS)).all()
+
+
+def test_empty_runs_expand_to_no_rows():
+    runs, grid = compress(scrapes().iloc[:0])
+    assert expand(runs, grid).empty
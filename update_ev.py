@@ -1,8 +1,6 @@
 #!/usr/bin/env python3
 
 import os
-import re
-from collections import defaultdict
 from datetime import datetime, date
 
 import pandas as pd
@@ -11,6 +9,12 @@ from urllib.parse import quote_plus
 import pymysql
 import sqlalchemy
 
+from ev_engine import EVEngine
+from ev_history import write_market_snapshot
+from futures_loader import READ_TIMEOUT
+from futures_mirror import FuturesMirror
+from odds_index import OddsIndex, OddsResolver
+
 # ─────────────────────────────────────────────────────────────────────────────
 # 1) Database credentials (from environment variables)
 # ─────────────────────────────────────────────────────────────────────────────
@@ -31,34 +35,13 @@ engine_bet = sqlalchemy.create_engine(
 )
 fut_pw_escaped = quote_plus(FUT_PW)
 engine_fut = sqlalchemy.create_engine(
-    f"mysql+pymysql://{FUT_USER}:{fut_pw_escaped}@{FUT_HOST}/{FUT_DB}"
+    f"mysql+pymysql://{FUT_USER}:{fut_pw_escaped}@{FUT_HOST}/{FUT_DB}",
+    connect_args={"read_timeout": READ_TIMEOUT},   # a hung futures read ends (futures_loader.py)
 )
 
 # ─────────────────────────────────────────────────────────────────────────────
 # 2) Odds‐conversion & mapping helpers
 # ─────────────────────────────────────────────────────────────────────────────
-def american_odds_to_decimal(o: int) -> float:
-    if o > 0:
-        return 1.0 + o/100.0
-    if o < 0:
-        return 1.0 + 100.0/abs(o)
-    return 1.0
-
-def american_odds_to_prob(o: int) -> float:
-    if o > 0:
-        return 100.0/(o + 100.0)
-    if o < 0:
-        return abs(o)/(abs(o) + 100.0)
-    return 0.0
-
-def cast_odds(v) -> int:
-    if v in (None, "", 0):
-        return 0
-    if isinstance(v, (int, float)):
-        return int(v)
-    m = re.search(r"[-+]?\d+", str(v))
-    return int(m.group()) if m else 0
-
 futures_table_map = {
     ("Championship","NBA Championship"): "NBAChampionship",
     ("Conference Winner","Eastern Conference"): "NBAEasternConference",
@@ -91,40 +74,56 @@ team_alias_map = {
 
 sportsbook_cols = ["BetMGM","DraftKings","Caesars","ESPNBet","FanDuel","BallyBet","RiversCasino","Bet365"]
 
-def best_odds_decimal_prob(event_type, event_label, participant, cutoff_dt, vig_map):
-    tbl = futures_table_map.get((event_type, event_label))
-    if tbl is None:
-        return 1.0, 0.0
+def _fut_query(query, params):
+    # one connection per call: OddsIndex.load runs these on worker threads
+    with engine_fut.connect() as conn:
+        return conn.exec_driver_sql(query, params).mappings().all()
 
-    alias = team_alias_map.get(participant, participant)
-    target_date = cutoff_dt.date()
+def _bet_query(query, params):
+    with engine_bet.connect() as conn:
+        return conn.exec_driver_sql(query, params).mappings().all()
 
-    with engine_fut.connect() as conn:
-        rows = conn.execute(
-            sqlalchemy.text(f"""
-                SELECT {','.join(sportsbook_cols)}, DATE(date_created) as dt
-                  FROM {tbl}
-                 WHERE team_name = :alias
-                   AND DATE(date_created) = :target_date
-              ORDER BY date_created DESC
-                 LIMIT 100
-            """), {"alias": alias, "target_date": target_date}
-        ).mappings().all()
+def _bet_execute(query, rows):
+    # rows=None runs the statement once, a list of tuples runs it per row
+    with engine_bet.begin() as conn:
+        conn.exec_driver_sql(query, rows)
+
+def load_odds_index(start, end):
+    """
+    As-of index of every tracked NBA market over [start, end], tables read
+    concurrently, from the local futures mirror when $FUTURES_MIRROR is set.
+    """
+    mirror = FuturesMirror.from_env()
+    if mirror is not None:
+        return OddsIndex.from_mirror(
+            mirror, futures_table_map.values(),
+            sportsbook_cols, start, end, highest_prob=True
+        )
+    return OddsIndex.load(
+        _fut_query, futures_table_map.values(),
+        sportsbook_cols, start, end, highest_prob=True
+    )
+
+# same-day rule, shortest price (as the as-of index above)
+ODDS = OddsResolver(_fut_query, futures_table_map, team_alias_map, sportsbook_cols,
+                    same_day=True, highest_prob=True)
 
-    for r in rows:
-        quotes = [cast_odds(r[c]) for c in sportsbook_cols]
-        valid_quotes = [q for q in quotes if q]
+def resolve_best_odds(legs, cutoff_dt, vig_map, index=None):
+    """
+    (decimal, prob) for every (EventType, EventLabel, ParticipantName) leg from
+    the best line of cutoff_dt's day; see odds_index.OddsResolver.
+    """
+    return ODDS.resolve(legs, cutoff_dt, vig_map, index=index)
 
-        if not valid_quotes:
-            continue  # All zero or None; try next row (same day, newer timestamp)
+# settled wagers are frozen under the rule every writer of settled_allocation shares
+SETTLED_ODDS = ODDS.settlement()
 
-        best = max(valid_quotes, key=american_odds_to_prob)
-        dec = american_odds_to_decimal(best)
-        prob = american_odds_to_prob(best) * (1 - vig_map.get((event_type, event_label), 0.05))
-        return dec, prob
+def resolve_settled_odds(legs, cutoff_dt, vig_map):
+    """({leg: (dec, prob)}, no missing legs) for freezing settled wagers; raises on a partial read."""
+    return SETTLED_ODDS.resolve(legs, cutoff_dt, vig_map), set()
 
-    # No valid odds found on that date
-    return 1.0, 0.0
+# per-wager contributions survive between builds in this process
+EV_ENGINE = EVEngine()
 
 # ─────────────────────────────────────────────────────────────────────────────
 # 3) Build full EV table (same logic as your Streamlit app)
@@ -132,73 +131,14 @@ def best_odds_decimal_prob(event_type, event_label, participant, cutoff_dt, vig_
 def build_ev_table():
     now    = datetime.utcnow()
     vig    = {k:0.05 for k in futures_table_map}   # flat 5%
-    active_stake, active_exp = defaultdict(float), defaultdict(float)
-    realized_np = defaultdict(float)
-
-    # --- ACTIVE NBA FUTURES ---
-    df_active = pd.read_sql("""
-        SELECT b.WagerID, b.PotentialPayout, b.DollarsAtStake,
-               l.EventType, l.EventLabel, l.ParticipantName
-          FROM bets b JOIN legs l ON b.WagerID=l.WagerID
-         WHERE b.WhichBankroll='GreenAleph'
-           AND b.WLCA='Active'
-           AND l.LeagueName='NBA'
-    """, engine_bet)
-
-    gb = df_active.groupby("WagerID", as_index=False)
-    bets = {}
-    for wid, grp in gb:
-        bets[wid] = {
-            "pot":   float(grp.PotentialPayout.iloc[0] or 0),
-            "stake": float(grp.DollarsAtStake.iloc[0] or 0),
-            "legs":  list(grp[["EventType","EventLabel","ParticipantName"]]
-                          .itertuples(index=False, name=None))
-        }
 
-    for b in bets.values():
-        decs, prob = [], 1.0
-        for et, el, pn in b["legs"]:
-            dec, p = best_odds_decimal_prob(et, el, pn, now, vig)
-            if p == 0:
-                prob = 0
-                break
-            decs.append(dec)
-            prob *= p
-        if prob == 0:
-            continue
-        expected = b["pot"] * prob
-        exc_sum  = sum(d - 1 for d in decs)
-        if exc_sum <= 0:
-            continue
-        for d in decs:
-            w = (d - 1) / exc_sum
-            active_stake[(et, el)] += w * b["stake"]
-            active_exp  [(et, el)] += w * expected
-
-    # --- REALIZED NBA FUTURES ---
-    df_real = pd.read_sql("""
-        SELECT b.WagerID, b.NetProfit,
-               l.EventType, l.EventLabel, l.ParticipantName
-          FROM bets b JOIN legs l ON b.WagerID=l.WagerID
-         WHERE b.WhichBankroll='GreenAleph'
-           AND b.WLCA IN ('Win','Loss','Cashout')
-           AND l.LeagueName='NBA'
-    """, engine_bet)
-
-    net       = df_real.groupby("WagerID").NetProfit.first().to_dict()
-    legs_map  = df_real.groupby("WagerID")[["EventType","EventLabel","ParticipantName"]] \
-                      .apply(lambda df: list(df.itertuples(index=False, name=None))) \
-                      .to_dict()
-
-    for wid, legs in legs_map.items():
-        npv    = float(net.get(wid, 0))
-        decs   = [best_odds_decimal_prob(et, el, pn, now, vig)[0]
-                  for et, el, pn in legs]
-        exc_sum = sum(d - 1 for d in decs)
-        if exc_sum <= 0:
-            continue
-        for d, (et, el, _) in zip(decs, legs):
-            realized_np[(et, el)] += npv * ((d - 1) / exc_sum)
+    # --- ACTIVE + REALIZED NBA FUTURES ---
+    # Only wagers that are new, changed status/NetProfit or have a leg whose
+    # best line moved are re-allocated; settled wagers reuse the weights frozen
+    # in settled_allocation and are never priced again (see ev_engine.py)
+    EV_ENGINE.refresh(_bet_query, lambda legs: resolve_best_odds(legs, now, vig), _bet_execute,
+                      lambda legs: resolve_settled_odds(legs, now, vig))
+    active_stake, active_exp, realized_np = EV_ENGINE.totals()
 
     # --- COMPLETED OTHER SPORTS ---
     df_other = pd.read_sql("""
@@ -280,6 +220,11 @@ if __name__ == "__main__":
         )
     print("✅  ev_history updated.")
 
+    # the per-market breakdown of this snapshot, in one batched write
+    snapshot_ts = datetime.utcnow().replace(microsecond=0)
+    n_rows = write_market_snapshot(engine_bet, ev_df, snapshot_ts)
+    print(f"✅  {n_rows} ev_market_snapshots rows written at {snapshot_ts:%Y-%m-%d %H:%M:%S} UTC.")
+
     # Load complete history and plot
     hist = pd.read_sql("""
         SELECT snapshot_date AS date, expected_value AS ev
@@ -0,0 +1,130 @@
+import threading
+
+import pandas as pd
+
+# ──────────────────────  DAILY VOLUME ROLLUP  ──────────────────────
+# Stake and bet count per (bankroll, league, day, WLCA), kept in memory and
+# refreshed incrementally: a refresh re-reads only the days from the newest day
+# already rolled up (it may have been partial) onwards. Older days only change
+# when a bet is settled/cashed out or edited, which a cheap per-(bankroll, WLCA)
+# fingerprint of the rolled-up range detects; then the whole rollup is rebuilt.
+# The Principal Volume views (month, ISO week, day, league) are grouped from
+# this small frame instead of scanning bets ⨝ legs once per chart.
+
+ROLLUP_QUERY = """
+SELECT Bankroll, LeagueName, DATE(DateTimePlaced) AS Day, WLCA,
+       SUM(DollarsAtStake) AS TotalDollarsAtStake,
+       COUNT(*) AS NumberOfBets
+FROM (
+    SELECT DISTINCT b.WagerID, b.WhichBankroll AS Bankroll, l.LeagueName,
+           b.DateTimePlaced, b.WLCA, b.DollarsAtStake
+    FROM bets b
+    JOIN legs l ON l.WagerID = b.WagerID
+    WHERE b.DateTimePlaced >= %s
+) wager_league
+GROUP BY Bankroll, LeagueName, DATE(DateTimePlaced), WLCA
+"""
+
+# bet-level state of everything placed before the incremental window
+FINGERPRINT_QUERY = """
+SELECT WhichBankroll AS Bankroll, WLCA, COUNT(*) AS NumberOfBets,
+       SUM(DollarsAtStake) AS TotalDollarsAtStake
+FROM bets
+WHERE DateTimePlaced < %s
+GROUP BY WhichBankroll, WLCA
+"""
+
+ROLLUP_COLUMNS = ["Bankroll", "LeagueName", "Day", "WLCA", "TotalDollarsAtStake", "NumberOfBets"]
+EPOCH = pd.Timestamp("1900-01-01")
+
+
+def _fingerprint(rows):
+    return {(r["Bankroll"], r["WLCA"]): (int(r["NumberOfBets"]), round(float(r["TotalDollarsAtStake"] or 0), 2))
+            for r in rows}
+
+
+def _rollup_frame(rows):
+    df = pd.DataFrame(rows or [], columns=ROLLUP_COLUMNS)
+    df["Day"] = pd.to_datetime(df["Day"])
+    df["TotalDollarsAtStake"] = pd.to_numeric(df["TotalDollarsAtStake"], errors="coerce").fillna(0.0)
+    df["NumberOfBets"] = pd.to_numeric(df["NumberOfBets"]).astype(int)
+    return df
+
+
+class DailyVolumeRollup:
+    """
+    Daily principal volume of every bankroll. Share one instance per process
+    (app.py wraps it in st.cache_resource) and call `refresh()` before reading.
+    """
+
+    def __init__(self):
+        self.daily        = _rollup_frame([])
+        self._fingerprint = None   # FINGERPRINT_QUERY result for days before the newest day
+        self._version     = None   # data version the rollup was last refreshed at
+        self._lock        = threading.Lock()
+        self.last_refresh = {"mode": None, "rows_read": 0}
+
+    # ───────────────  refreshing  ───────────────
+    def _read(self, query_fn, since):
+        return _rollup_frame(query_fn(ROLLUP_QUERY, (since.to_pydatetime(),)))
+
+    def refresh(self, query_fn, data_version=None):
+        """
+        Bring the rollup up to date. `query_fn(query, params)` returns a list of
+        dict rows (e.g. ConnectionPool.query). When `data_version` is given and
+        unchanged since the last refresh, nothing is read.
+        """
+        with self._lock:
+            if data_version is not None and data_version == self._version:
+                self.last_refresh = {"mode": "cached", "rows_read": 0}
+                return self
+
+            since = self.daily["Day"].max() if not self.daily.empty else None
+            before = None
+            if since is not None:
+                before = _fingerprint(query_fn(FINGERPRINT_QUERY, (since.to_pydatetime(),)) or [])
+                if before != self._fingerprint:
+                    since = None   # a bet in the rolled-up range was settled or edited
+
+            fresh = self._read(query_fn, since if since is not None else EPOCH)
+            if since is None:
+                daily = fresh
+            else:
+                daily = pd.concat([self.daily[self.daily["Day"] < since], fresh], ignore_index=True)
+            self.daily = daily.sort_values(["Day", "Bankroll", "LeagueName"]).reset_index(drop=True)
+
+            newest = self.daily["Day"].max() if not self.daily.empty else EPOCH
+            if since is None or newest != since:
+                before = _fingerprint(query_fn(FINGERPRINT_QUERY, (newest.to_pydatetime(),)) or [])
+            self._fingerprint = before
+            self._version = data_version
+            self.last_refresh = {"mode": "full" if since is None else "incremental",
+                                 "rows_read": len(fresh)}
+        return self
+
+    # ───────────────  Principal Volume views  ───────────────
+    def principal_volume(self, bankroll, period):
+        """
+        Stake by (period, LeagueName) for non-cashout bets, counting each wager
+        once per league. `period` is "Month", "WeekStart", "Day" or "League".
+        """
+        df = self.daily
+        df = df[(df["Bankroll"] == bankroll) & df["WLCA"].notna() & (df["WLCA"] != "Cashout")]
+        if period == "League":
+            out = df.groupby("LeagueName")["TotalDollarsAtStake"].sum().reset_index()
+            return out.sort_values("TotalDollarsAtStake", ascending=False).reset_index(drop=True)
+
+        day = df["Day"]
+        if period == "Month":
+            key = day.dt.strftime("%Y-%m")
+        elif period == "WeekStart":
+            key = day - pd.to_timedelta(day.dt.weekday, unit="D")   # Monday of the ISO week
+        elif period == "Day":
+            key = day.dt.strftime("%Y-%m-%d")
+        else:
+            raise ValueError(f"Unknown period {period!r}")
+
+        out = (df.assign(**{period: key})
+                 .groupby([period, "LeagueName"])["TotalDollarsAtStake"].sum()
+                 .reset_index())
+        return out.sort_values([period, "LeagueName"]).reset_index(drop=True)
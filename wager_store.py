@@ -0,0 +1,170 @@
+import numpy as np
+import pandas as pd
+
+# ──────────────────────  WAGER STORE  ──────────────────────
+# Wagers and their legs in CSR form instead of a dict of lists of tuples or a
+# DataFrame per WagerID. Wager fields are contiguous NumPy arrays; the legs of
+# wager i are rows leg_offsets[i]:leg_offsets[i + 1] of the per-leg arrays,
+# whose market / participant columns are integer codes into `markets` and
+# `participants`. Building is a factorize + stable argsort, so time and memory
+# grow linearly with the number of legs (~12 bytes per leg, ~50 per wager).
+
+STATUS_CODES = {"Active": 0, "Win": 1, "Loss": 2, "Cashout": 3}
+ACTIVE, WIN, LOSS, CASHOUT = 0, 1, 2, 3
+SETTLED = (WIN, LOSS, CASHOUT)
+UNKNOWN = -1
+
+MARKET_COLS = ("EventType", "EventLabel")
+
+
+def first_rows(codes):
+    """Row index of each code's first occurrence (pd.factorize codes appear in order)."""
+    if len(codes) == 0:
+        return np.zeros(0, dtype=np.int64)
+    high = np.maximum.accumulate(codes)
+    return np.flatnonzero(np.r_[True, high[1:] > high[:-1]])
+
+
+def factorize_rows(df, cols):
+    """
+    (codes, keys): an integer code per row for the distinct `cols` tuples, and
+    those tuples in code order. Column codes are combined arithmetically, so no
+    per-row tuples are ever built.
+    """
+    combined = np.zeros(len(df), dtype=np.int64)
+    for col in cols:
+        codes, uniques = pd.factorize(df[col], use_na_sentinel=False)
+        combined = combined * len(uniques) + codes
+    codes, _ = pd.factorize(combined)
+    return codes, list(df[list(cols)].iloc[first_rows(codes)].itertuples(index=False, name=None))
+
+
+def _money(df, col, first):
+    if col not in df:
+        return np.zeros(len(first))
+    return np.nan_to_num(pd.to_numeric(df[col], errors="coerce").to_numpy(float)[first])
+
+
+class WagerStore:
+    """
+    Per wager (length n_wagers): `wager_id`, `stake`, `payout`, `net_profit`,
+    `status` (STATUS_CODES, UNKNOWN otherwise), `placed` (datetime64, NaT if
+    not loaded) and `leg_offsets` (length n_wagers + 1).
+
+    Per leg (length n_legs, grouped by wager): `leg_market`, `leg_participant`
+    and `leg_key`, the code of the distinct (market, participant) pair, so
+    odds are looked up once per distinct leg rather than once per leg.
+    """
+
+    def __init__(self, wager_id, stake, payout, net_profit, status, placed,
+                 leg_offsets, leg_market, leg_participant, markets, participants):
+        self.wager_id        = wager_id
+        self.stake           = stake
+        self.payout          = payout
+        self.net_profit      = net_profit
+        self.status          = status
+        self.placed          = placed
+        self.leg_offsets     = leg_offsets
+        self.leg_market      = leg_market
+        self.leg_participant = leg_participant
+        self.markets         = markets        # market code -> (EventType, EventLabel, ...)
+        self.participants    = participants   # participant code -> ParticipantName
+
+        pair = leg_market.astype(np.int64) * max(len(participants), 1) + leg_participant
+        self.leg_key, self._pairs = pd.factorize(pair)
+        self.leg_key = self.leg_key.astype(np.int32)
+        self._seg = None
+
+    # ───────────────  building  ───────────────
+    @classmethod
+    def from_frame(cls, df, market_cols=MARKET_COLS):
+        """
+        One row per leg with WagerID, the `market_cols`, ParticipantName and any
+        of DollarsAtStake, PotentialPayout, NetProfit, WLCA, DateTimePlaced
+        (bet-level columns repeat on every leg; the first row of a wager wins).
+        """
+        market_cols = list(market_cols)
+        if df.empty:
+            df = pd.DataFrame(columns=["WagerID", "ParticipantName", *market_cols])
+        wager_code, wager_ids = pd.factorize(df["WagerID"])
+        first = first_rows(wager_code)
+        order = np.argsort(wager_code, kind="stable")
+
+        market, markets = factorize_rows(df, market_cols)
+        participant, participants = pd.factorize(df["ParticipantName"], use_na_sentinel=False)
+        counts = np.bincount(wager_code, minlength=len(wager_ids))
+
+        status = (df["WLCA"].map(STATUS_CODES).fillna(UNKNOWN).to_numpy(np.int8)[first]
+                  if "WLCA" in df else np.full(len(first), UNKNOWN, dtype=np.int8))
+        placed = (pd.to_datetime(df["DateTimePlaced"]).to_numpy("datetime64[ns]")[first]
+                  if "DateTimePlaced" in df else np.full(len(first), np.datetime64("NaT"), "datetime64[ns]"))
+        return cls(
+            wager_id        = np.asarray(wager_ids),
+            stake           = _money(df, "DollarsAtStake", first),
+            payout          = _money(df, "PotentialPayout", first),
+            net_profit      = _money(df, "NetProfit", first),
+            status          = status,
+            placed          = placed,
+            leg_offsets     = np.r_[0, np.cumsum(counts)].astype(np.int64),
+            leg_market      = market[order].astype(np.int32),
+            leg_participant = participant[order].astype(np.int32),
+            markets         = markets,
+            participants    = list(participants),
+        )
+
+    @classmethod
+    def from_rows(cls, rows, market_cols=MARKET_COLS):
+        """Same as from_frame, for dict rows (pymysql DictCursor, ConnectionPool.query, ...)."""
+        return cls.from_frame(pd.DataFrame(list(rows)), market_cols=market_cols)
+
+    # ───────────────  shape  ───────────────
+    @property
+    def n_wagers(self):
+        return len(self.wager_id)
+
+    @property
+    def n_legs(self):
+        return len(self.leg_market)
+
+    @property
+    def seg(self):
+        """Wager index of every leg (the segment id for the allocation kernel)."""
+        if self._seg is None:
+            self._seg = np.repeat(np.arange(self.n_wagers, dtype=np.int32), np.diff(self.leg_offsets))
+        return self._seg
+
+    def legs(self, i):
+        """[(market, participant), ...] of wager i, for debugging and small views."""
+        lo, hi = self.leg_offsets[i], self.leg_offsets[i + 1]
+        return [(self.markets[m], self.participants[p])
+                for m, p in zip(self.leg_market[lo:hi], self.leg_participant[lo:hi])]
+
+    def has_status(self, *codes):
+        return np.isin(self.status, codes)
+
+    def nbytes(self):
+        arrays = (self.wager_id, self.stake, self.payout, self.net_profit, self.status, self.placed,
+                  self.leg_offsets, self.leg_market, self.leg_participant, self.leg_key)
+        return sum(getattr(a, "nbytes", 0) for a in arrays)
+
+    # ───────────────  per distinct leg  ───────────────
+    def distinct_legs(self):
+        """[(market tuple, participant), ...] in leg_key order."""
+        n_part = max(len(self.participants), 1)
+        return [(self.markets[int(pair // n_part)], self.participants[int(pair % n_part)])
+                for pair in self._pairs]
+
+    def leg_values(self, fn, width=1):
+        """
+        Evaluate `fn(market, participant)` once per distinct leg and broadcast
+        to every leg: float array (n_legs,) or (n_legs, width).
+        """
+        values = np.array([fn(market, participant) for market, participant in self.distinct_legs()],
+                          dtype=float).reshape(-1, width)
+        out = values[self.leg_key]
+        return out[:, 0] if width == 1 else out
+
+    def leg_odds(self, odds):
+        """(dec, prob) per leg from resolved odds keyed by (*market, participant)."""
+        quotes = self.leg_values(lambda market, participant: odds[(*market, participant)], width=2)
+        return quotes[:, 0], quotes[:, 1]